@@ -3,6 +3,8 @@ from .models import Application, ApplicationEvent
 @admin.register(ApplicationEvent)
 class ApplicationEventAdmin(admin.ModelAdmin):
     list_display = ("application", "event", "created_at")
+    # Application.__str__ reads the applicant's email and the job title.
+    list_select_related = ("application__applicant", "application__job")
     list_filter = ("event", "created_at")
     search_fields = ("application__job__title", "application__applicant__email", "event", "note")
     ordering = ("-created_at",)
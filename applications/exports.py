@@ -0,0 +1,26 @@
+from accounts.models import User
+from common.exports import QuerysetExport
+from jobs.models import Job
+
+
+class ApplicationExport(QuerysetExport):
+    fields = ("id", "job_id", "applicant_id", "status", "cover_letter", "resume_snapshot", "created_at", "updated_at")
+    columns = (
+        "id", "job_id", "job_title", "company_id", "applicant_id", "applicant_email",
+        "status", "cover_letter", "resume_snapshot", "created_at", "updated_at",
+    )
+
+    def resolve(self, rows):
+        jobs = {
+            pk: (title, company_id)
+            for pk, title, company_id in Job.objects.filter(pk__in={row["job_id"] for row in rows})
+            .values_list("pk", "title", "company_id")
+        }
+        emails = dict(
+            User.objects.filter(pk__in={row["applicant_id"] for row in rows}).values_list("pk", "email")
+        )
+        for row in rows:
+            row["job_title"], row["company_id"] = jobs.get(row["job_id"], (None, None))
+            row["applicant_email"] = emails.get(row["applicant_id"])
+            row["resume_snapshot"] = row["resume_snapshot"] or None
+        return [{column: row[column] for column in self.columns} for row in rows]
@@ -0,0 +1,164 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import User
+from applications import pipeline
+from applications.models import Application
+from applications.ranking import DEGREE_LEVELS, REQUIRED_YEARS, TOP_DEGREE_LEVEL, WEIGHTS, rank_applicants
+from common.choices import EmploymentType, ExperienceLevel, LocationType
+from companies.models import Company
+from jobs.models import Job, Skill
+from jobs.recommendations import RecommendationIndex
+from profiles.models import Education, Experience, Profile
+
+CITIES = ["Berlin, Germany", "Munich, Germany", "Paris, France", "Remote", "", "berlin"]
+DEGREES = ["BSc Computer Science", "Master of Science", "PhD", "MBA", "Diploma", "High school"]
+
+
+class Command(BaseCommand):
+    help = "Rank a job's applicants with NumPy and compare against scoring them one applicant at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applicants", type=int, default=50000, help="Applicants the bench job should have.")
+        parser.add_argument("--sample", type=int, default=500,
+                            help="Applicants scored one at a time for the parity check and the per-applicant timing.")
+        parser.add_argument("--repeat", type=int, default=3, help="Rankings to time; the best is reported.")
+        parser.add_argument("--seed", action="store_true", help="Insert synthetic applicants until the job has enough.")
+
+    def handle(self, *args, **options):
+        job = self.bench_job()
+        have = Application.objects.filter(job=job).count()
+        if have < options["applicants"]:
+            if not options["seed"]:
+                raise CommandError(f"The bench job has {have} applicants; re-run with --seed to add more.")
+            self.seed(job, options["applicants"] - have, offset=have)
+
+        timings, queries = [], 0
+        for _ in range(options["repeat"]):
+            queries = 0
+
+            def count(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                ranking = rank_applicants(job)
+                ranking.order("-score")
+                timings.append((time.perf_counter() - started) * 1000)
+
+        sample = random.sample(range(len(ranking)), min(options["sample"], len(ranking)))
+        started = time.perf_counter()
+        expected = [self.score_one(job, ranking.application_ids[i]) for i in sample]
+        one_ms = (time.perf_counter() - started) * 1000 / max(len(sample), 1)
+        mismatched = [i for i, score in zip(sample, expected) if abs(score - ranking.score[i]) > 1e-6]
+        if mismatched:
+            raise CommandError(f"{len(mismatched)} of {len(sample)} sampled scores differ from the per-applicant scoring.")
+        self.stdout.write(self.style.SUCCESS(f"{len(sample)} sampled scores match the per-applicant scoring."))
+
+        self.stdout.write(f"{'applicants':>10} {'numpy ms':>10} {'queries':>8} {'per-applicant ms (est.)':>24} {'speedup':>8}")
+        best, estimate = min(timings), one_ms * len(ranking)
+        self.stdout.write(f"{len(ranking):>10} {best:>10.1f} {queries:>8} {estimate:>24.1f} {estimate / best:>7.1f}x")
+
+    def score_one(self, job, application_id):
+        """The same blend for a single application, with plain Python and per-applicant queries."""
+        application = Application.objects.select_related("applicant__profile").get(pk=application_id)
+        profile = getattr(application.applicant, "profile", None)
+        job_skills = set(job.skills.values_list("pk", flat=True))
+        if profile is None:
+            skills, days, level, location = set(), 0, 0, ""
+        else:
+            skills = set(profile.skills.values_list("pk", flat=True))
+            # Merge overlapping ranges so concurrent positions count once.
+            days, reach, today = 0, None, date.today()
+            for start, end in sorted(profile.experiences.values_list("start_date", "end_date")):
+                end = max(end or today, start)
+                if reach is None or start > reach:
+                    days += (end - start).days
+                    reach = end
+                elif end > reach:
+                    days += (end - reach).days
+                    reach = end
+            level = 0
+            for degree in profile.education.values_list("degree", flat=True):
+                words = next((lvl for lvl, keys in DEGREE_LEVELS if any(k in degree.lower() for k in keys)), 1)
+                level = max(level, words)
+            location = (profile.location or "").strip().lower()
+
+        years = days / 365.25
+        required = REQUIRED_YEARS.get(job.experience_level, 0)
+        features = {
+            "skills": len(skills & job_skills) / len(job_skills) if job_skills else 1.0,
+            "experience": min(years / required, 1.0) if required else 1.0,
+            "education": level / TOP_DEGREE_LEVEL,
+            "location": RecommendationIndex().location_score(
+                job.location_type, (job.city or "").lower(), (job.country or "").lower(), location
+            ),
+        }
+        return sum(weight * features[name] for name, weight in WEIGHTS.items())
+
+    def bench_job(self):
+        owner, _ = User.objects.get_or_create(email="bench-owner@example.com")
+        company, _ = Company.objects.get_or_create(slug="bench-company", defaults={"owner": owner, "name": "Bench Company"})
+        job, created = Job.objects.get_or_create(
+            company=company,
+            slug="bench-ranking-job",
+            defaults={
+                "title": "Bench ranking job",
+                "description": "Synthetic job used by bench_applicant_ranking.",
+                "experience_level": ExperienceLevel.SENIOR,
+                "employment_type": EmploymentType.FULL_TIME,
+                "location_type": LocationType.HYBRID,
+                "city": "Berlin",
+                "country": "Germany",
+                "application_deadline": timezone.now().date() + timedelta(days=30),
+            },
+        )
+        if created:
+            skills = list(Skill.objects.values_list("pk", flat=True)[:200])
+            if len(skills) < 20:
+                skills += [s.pk for s in Skill.objects.bulk_create(
+                    Skill(name=f"Bench ranking skill {i}") for i in range(20 - len(skills))
+                )]
+            job.skills.set(random.sample(skills, 8))
+        return job
+
+    def seed(self, job, count, offset=0, batch_size=2000):
+        skills = list(Skill.objects.values_list("pk", flat=True)[:200])
+        today = date.today()
+        for first in range(0, count, batch_size):
+            n = min(batch_size, count - first)
+            users = User.objects.bulk_create(
+                User(email=f"bench-applicant-{offset + first + i}@example.com", password="!") for i in range(n)
+            )
+            profiles = Profile.objects.bulk_create(
+                Profile(user=user, location=random.choice(CITIES)) for user in users
+            )
+            through = Profile.skills.through
+            through.objects.bulk_create(
+                through(profile_id=profile.pk, skill_id=skill_id)
+                for profile in profiles
+                for skill_id in random.sample(skills, random.randint(0, min(10, len(skills))))
+            )
+            experiences, education = [], []
+            for profile in profiles:
+                for _ in range(random.randint(0, 4)):
+                    start = today - timedelta(days=random.randint(30, 6000))
+                    end = None if random.random() < 0.2 else start + timedelta(days=random.randint(0, 2000))
+                    experiences.append(Experience(profile=profile, company="Bench", title="Engineer",
+                                                  start_date=start, end_date=end and min(end, today)))
+                for _ in range(random.randint(0, 2)):
+                    education.append(Education(profile=profile, institution="Bench University",
+                                               degree=random.choice(DEGREES), start_year=2010))
+            Experience.objects.bulk_create(experiences)
+            Education.objects.bulk_create(education)
+            Application.objects.bulk_create(Application(job=job, applicant=user) for user in users)
+            self.stdout.write(f"Seeded {first + n}/{count} applicants")
+        # bulk_create skips the signals that keep the pipeline board current.
+        pipeline.rebuild([job.pk])
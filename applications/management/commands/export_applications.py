@@ -0,0 +1,35 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications.exports import ApplicationExport
+from applications.models import Application
+from common.exports import EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Stream every application to a CSV or NDJSON file (or stdout) with a server-side cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="-", help="File to write; '-' for stdout.")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--chunk-size", type=int, default=ApplicationExport.chunk_size)
+        parser.add_argument("--job", help="Only export applications to this job (id).")
+        parser.add_argument("--status", help="Only export applications in this status.")
+
+    def handle(self, *args, **options):
+        qs = Application.objects.order_by("pk")
+        if options["job"]:
+            qs = qs.filter(job_id=options["job"])
+        if options["status"]:
+            qs = qs.filter(status=options["status"])
+        export = ApplicationExport(qs, chunk_size=options["chunk_size"])
+
+        started = time.perf_counter()
+        if options["output"] == "-":
+            written = export.write(options["format"], sys.stdout.buffer)
+        else:
+            with open(options["output"], "wb") as fh:
+                written = export.write(options["format"], fh)
+        self.stderr.write(f"Wrote {written:,} bytes in {time.perf_counter() - started:.1f}s.")
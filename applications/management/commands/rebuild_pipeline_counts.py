@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications import pipeline
+from applications.models import ApplicationStatusCount
+
+
+class Command(BaseCommand):
+    help = "Recompute the pipeline board's per-job, per-status application counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", action="append", dest="jobs", help="Only rebuild this job (repeatable).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pipeline.rebuild(options["jobs"])
+        self.stdout.write(
+            f"Rebuilt {ApplicationStatusCount.objects.count():,} counters in {time.perf_counter() - started:.1f}s."
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:39
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        ('jobs', '0003_savedsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusCount',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('status', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('UNDER_REVIEW', 'Under review'), ('INTERVIEW', 'Interview'), ('OFFER', 'Offer extended'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('newest', models.JSONField(blank=True, default=list, help_text='[created_at, application id] of the newest applications in this status, newest first.')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='jobs.job')),
+            ],
+            options={
+                'verbose_name': 'application status count',
+                'verbose_name_plural': 'application status counts',
+                'constraints': [models.UniqueConstraint(fields=('job', 'status'), name='unique_job_status_count')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0002_applicationstatuscount'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='resume_snapshot',
+            field=models.FileField(blank=True, help_text='Optional resume copy uploaded specifically for this application.', null=True, storage=common.storage.resume_storage, upload_to='applications/%Y/%m/'),
+        ),
+    ]
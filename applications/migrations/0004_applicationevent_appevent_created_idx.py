@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_alter_application_resume_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicationevent',
+            index=models.Index(fields=['created_at'], name='appevent_created_idx'),
+        ),
+    ]
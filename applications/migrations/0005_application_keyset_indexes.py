@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_applicationevent_appevent_created_idx'),
+        ('jobs', '0004_jobcategory_jobcategory_name_ci_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-created_at', '-id'], name='app_job_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'status', '-created_at', '-id'], name='app_job_status_created_idx'),
+        ),
+        # Dropped last: the new status index serves its lookups from then on.
+        migrations.RemoveIndex(
+            model_name='application',
+            name='app_job_status_idx',
+        ),
+    ]
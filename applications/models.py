@@ -2,6 +2,7 @@ from django.db import models
 from django.db.models import Q
 from common.models import UUIDModel, TimeStampedModel
 from common.choices import ApplicationStatus
+from common.storage import resume_storage
 from accounts.models import User
 from jobs.models import Job
 
@@ -20,6 +21,7 @@ class Application(UUIDModel, TimeStampedModel):
         help_text="User who submitted the application.")
     resume_snapshot = models.FileField(
         upload_to="applications/%Y/%m/",
+        storage=resume_storage,
         blank=True, 
         null=True, 
         help_text="Optional resume copy uploaded specifically for this application.")
@@ -37,7 +39,10 @@ class Application(UUIDModel, TimeStampedModel):
             models.UniqueConstraint(fields=["job", "applicant"], name="unique_job_applicant"),
         ]
         indexes = [
-            models.Index(fields=["job", "status"], name="app_job_status_idx"),
+            # A job's applications (optionally one status) in keyset order, so a page
+            # reads only its rows; (job, status) lookups use the status index's prefix.
+            models.Index(fields=["job", "-created_at", "-id"], name="app_job_created_idx"),
+            models.Index(fields=["job", "status", "-created_at", "-id"], name="app_job_status_created_idx"),
             models.Index(fields=["applicant", "created_at"], name="app_applicant_created_idx"),
         ]
 
@@ -57,4 +62,29 @@ class ApplicationEvent(UUIDModel, TimeStampedModel):
     class Meta:
         verbose_name = "application event"
         verbose_name_plural = "application events"
-        indexes = [models.Index(fields=["application", "created_at"], name="appevent_app_created_idx")]
+        indexes = [
+            models.Index(fields=["application", "created_at"], name="appevent_app_created_idx"),
+            # Finds the rows old enough for common.archive to move out.
+            models.Index(fields=["created_at"], name="appevent_created_idx"),
+        ]
+
+
+class ApplicationStatusCount(UUIDModel, TimeStampedModel):
+    """Applications per (job, status) for the pipeline board, kept current by applications.pipeline."""
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name="status_counts")
+    status = models.CharField(max_length=20, choices=ApplicationStatus.choices)
+    count = models.PositiveIntegerField(default=0)
+    newest = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="[created_at, application id] of the newest applications in this status, newest first.")
+
+    class Meta:
+        verbose_name = "application status count"
+        verbose_name_plural = "application status counts"
+        constraints = [
+            models.UniqueConstraint(fields=["job", "status"], name="unique_job_status_count"),
+        ]
@@ -0,0 +1,172 @@
+"""
+Per-job, per-status application counts for the recruiter pipeline board.
+
+`ApplicationStatusCount` holds one row per (job, status) with the number of
+applications in it and the ids of the newest few. Signals keep it current
+as applications are created, moved between statuses and deleted, so the
+board reads a company's rows instead of grouping its applications. Code
+that writes applications in bulk calls `move()` itself; `rebuild()`
+recomputes the table from a single grouped query over Application(job, status).
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from common.choices import ApplicationStatus
+
+
+def newest_size():
+    return getattr(settings, "PIPELINE_NEWEST_PER_STATUS", 5)
+
+
+def _entry(application):
+    return [application.created_at.isoformat(), str(application.pk)]
+
+
+def _newest_in(job_id, status):
+    """Read the newest applications of one column from app_job_status_created_idx."""
+    from .models import Application
+
+    rows = (
+        Application.objects.filter(job_id=job_id, status=status)
+        .order_by("-created_at", "-id")
+        .values_list("created_at", "id")[:newest_size()]
+    )
+    return [[created_at.isoformat(), str(pk)] for created_at, pk in rows]
+
+
+def _apply(job_id, status, delta, added=(), removed=()):
+    from .models import ApplicationStatusCount
+
+    rows = ApplicationStatusCount.objects.select_for_update()
+    with transaction.atomic():
+        if delta > 0:
+            row, _ = rows.get_or_create(job_id=job_id, status=status)
+        else:
+            # Never create rows on the way down: the job itself may be mid-delete.
+            row = rows.filter(job_id=job_id, status=status).first()
+            if row is None:
+                return
+        row.count = max(row.count + delta, 0)
+        gone = {str(pk) for pk in removed}
+        newest = [entry for entry in row.newest if entry[1] not in gone]
+        newest.extend(_entry(application) for application in added)
+        newest.sort(reverse=True)
+        if gone and len(newest) < min(row.count, newest_size()):
+            newest = _newest_in(job_id, status)
+        # update(), not save(): the same columns, without pre_save/post_save
+        # dispatch on every status change.
+        ApplicationStatusCount.objects.filter(pk=row.pk).update(
+            count=row.count, newest=newest[:newest_size()], updated_at=timezone.now()
+        )
+
+
+def move(applications, previous=None):
+    """
+    Account for `applications` now being in their current (job, status).
+    `previous` maps application pk to its earlier (job_id, status); an
+    application missing from it is new. Pass `applications=()` with
+    `previous` to account for deletions.
+    """
+    previous = previous or {}
+    arrivals, departures = defaultdict(list), defaultdict(list)
+    for application in applications:
+        key = (application.job_id, application.status)
+        before = previous.get(application.pk)
+        if before == key:
+            continue
+        arrivals[key].append(application)
+        if before is not None:
+            departures[before].append(application.pk)
+    current = {application.pk for application in applications}
+    for pk, before in previous.items():
+        if pk not in current:
+            departures[before].append(pk)
+
+    # Lock rows in a fixed order so concurrent moves cannot deadlock.
+    for key in sorted(set(arrivals) | set(departures), key=str):
+        delta = len(arrivals.get(key, ())) - len(departures.get(key, ()))
+        _apply(*key, delta, added=arrivals.get(key, ()), removed=departures.get(key, ()))
+
+
+@transaction.atomic
+def rebuild(job_ids=None):
+    """Recompute the counts (for `job_ids`, or every job) from the applications table."""
+    from .models import Application, ApplicationStatusCount
+
+    applications = Application.objects.all()
+    counts = ApplicationStatusCount.objects.all()
+    if job_ids is not None:
+        applications = applications.filter(job_id__in=job_ids)
+        counts = counts.filter(job_id__in=job_ids)
+    grouped = applications.values_list("job_id", "status").annotate(n=Count("id")).order_by()
+    counts.delete()
+    ApplicationStatusCount.objects.bulk_create(
+        [
+            ApplicationStatusCount(job_id=job_id, status=status, count=n, newest=_newest_in(job_id, status))
+            for job_id, status, n in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+def board(company_id, newest=None):
+    """
+    The pipeline of every job of a company: per-job counts by status, company
+    totals, and the newest applications in each status across its jobs.
+    """
+    from jobs.models import Job
+    from .models import Application
+
+    newest = newest_size() if newest is None else newest
+    statuses = list(ApplicationStatus.values)
+    rows = (
+        Job.objects.filter(company_id=company_id)
+        .order_by("-created_at", "-id")
+        .values_list("id", "title", "is_active", "status_counts__status",
+                     "status_counts__count", "status_counts__newest")
+    )
+    jobs, totals, columns = {}, Counter(), defaultdict(list)
+    for job_id, title, is_active, status, count, entries in rows:
+        job = jobs.get(job_id)
+        if job is None:
+            job = jobs[job_id] = {
+                "id": str(job_id), "title": title, "is_active": is_active,
+                "counts": dict.fromkeys(statuses, 0), "total": 0,
+            }
+        if status is None:
+            continue
+        job["counts"][status] = count
+        job["total"] += count
+        totals[status] += count
+        columns[status].extend(entries)
+
+    picked = {status: sorted(entries, reverse=True)[:newest] for status, entries in columns.items()}
+    found = {
+        str(application["id"]): application
+        for application in Application.objects.filter(
+            pk__in=[pk for entries in picked.values() for _, pk in entries]
+        ).values("id", "job_id", "applicant_id", "applicant__email", "created_at")
+    }
+    return {
+        "statuses": statuses,
+        "totals": {status: totals[status] for status in statuses},
+        "newest": {
+            status: [
+                {
+                    "id": pk,
+                    "job": str(found[pk]["job_id"]),
+                    "applicant": str(found[pk]["applicant_id"]),
+                    "applicant_email": found[pk]["applicant__email"],
+                    "created_at": found[pk]["created_at"],
+                }
+                for _, pk in picked.get(status, ())
+                if pk in found
+            ]
+            for status in statuses
+        },
+        "jobs": list(jobs.values()),
+    }
@@ -0,0 +1,215 @@
+"""
+Applicant ranking for a job posting.
+
+`rank_applicants` loads a job's applicants with a handful of grouped
+queries (matched skill counts, experience date ranges, highest degree) and
+scores them all at once as NumPy arrays rather than building features one
+applicant at a time. An applicant's score blends the share of the job's
+skills they have, how close their years of experience come to the job's
+level, their highest education level, and whether their location suits
+the job.
+"""
+import uuid
+from datetime import date
+
+import numpy as np
+from django.db.models import Case, CharField, Count, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Cast
+
+from common.choices import LocationType
+from jobs.recommendations import LEVEL_YEARS
+
+WEIGHTS = {"skills": 0.5, "experience": 0.25, "education": 0.1, "location": 0.15}
+
+# Years of experience a job's level asks for; ENTRY asks for none.
+REQUIRED_YEARS = {level.value: years for years, level in LEVEL_YEARS}
+
+# Highest degree first; any other education row counts as level 1.
+DEGREE_LEVELS = [
+    (4, ("phd", "ph.d", "doctor")),
+    (3, ("master", "mba", "msc", "m.sc", "mtech", "m.tech")),
+    (2, ("bachelor", "bsc", "b.sc", "btech", "b.tech", "bca", "bba")),
+]
+TOP_DEGREE_LEVEL = 4
+
+SORT_KEYS = ("score", "skills", "experience", "education", "location", "years", "created_at")
+
+# Keeps each applicant's experience ranges apart when they are merged in one pass.
+_DAY_SPAN = 10 ** 7
+
+
+def degree_level():
+    whens = []
+    for level, words in DEGREE_LEVELS:
+        match = Q()
+        for word in words:
+            match |= Q(degree__icontains=word)
+        whens.append(When(match, then=Value(level)))
+    return Case(*whens, default=Value(1), output_field=IntegerField())
+
+
+def _text(field):
+    # Keys are only compared with each other, so skip building a UUID per row.
+    return Cast(field, output_field=CharField())
+
+
+def _positions(keys, sorter, wanted):
+    """Index into `keys` (sorted by `sorter`) of each of `wanted`, all of which must be present."""
+    return sorter[np.searchsorted(keys, np.array(wanted, dtype=keys.dtype), sorter=sorter)]
+
+
+def experience_days(groups, starts, ends, size):
+    """
+    Days worked per group, counting overlapping ranges once. `starts` and
+    `ends` are datetime64[D] arrays with NaT ends for current positions.
+    """
+    today = np.datetime64(date.today(), "D")
+    starts = starts.astype("int64")
+    ends = np.where(np.isnat(ends), today, ends).astype("int64")
+    ends = np.maximum(ends, starts)
+    order = np.lexsort((starts, groups))
+    groups, starts, ends = groups[order], starts[order], ends[order]
+    # Shift each group onto its own stretch of the number line, so a running
+    # maximum of the ends never carries over from the previous group.
+    starts = starts + groups * _DAY_SPAN
+    ends = ends + groups * _DAY_SPAN
+    reach = np.maximum.accumulate(ends)
+    covered = np.empty_like(reach)
+    covered[0] = starts[0]
+    covered[1:] = reach[:-1]
+    days = np.clip(ends - np.maximum(starts, covered), 0, None)
+    return np.bincount(groups, weights=days, minlength=size)
+
+
+def location_scores(locations, location_type, city, country):
+    """Vectorized RecommendationIndex.location_score over lowercased candidate locations."""
+    if location_type == LocationType.REMOTE:
+        return np.ones(len(locations))
+    scores = np.zeros(len(locations))
+    if not len(locations):
+        return scores
+    known = np.char.str_len(locations) > 0
+    if country:
+        in_country = known & (np.char.find(locations, country.lower()) >= 0)
+        scores[in_country] = 0.5 if location_type == LocationType.ONSITE else 0.75
+    if city:
+        scores[known & (np.char.find(locations, city.lower()) >= 0)] = 1.0
+    return scores
+
+
+class Ranking:
+    """A job's applicants as parallel arrays: ids, statuses, features, and the blended score."""
+
+    def __init__(self, application_ids, applicant_ids, statuses, created_at, years, features):
+        self.application_ids = application_ids
+        self.applicant_ids = applicant_ids
+        self.statuses = statuses
+        self.created_at = created_at
+        self.years = years
+        self.features = features
+        self.score = sum(weight * features[name] for name, weight in WEIGHTS.items())
+
+    def __len__(self):
+        return len(self.application_ids)
+
+    def column(self, key):
+        if key == "score":
+            return self.score
+        if key == "years":
+            return self.years
+        if key == "created_at":
+            return self.created_at.astype("int64")
+        return self.features[key]
+
+    def order(self, sort="-score", status=None):
+        """Row indices filtered to `status` and sorted by `sort` (prefix "-" for descending)."""
+        key = sort.lstrip("-")
+        if key not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        rows = np.arange(len(self)) if status is None else np.flatnonzero(self.statuses == status)
+        values = self.column(key)[rows]
+        if sort.startswith("-"):
+            values = -values
+        # Ties fall back to the overall score, best first.
+        return rows[np.lexsort((-self.score[rows], values))]
+
+    def rows(self, indices):
+        return [
+            {
+                "application": str(uuid.UUID(self.application_ids[i])),
+                "applicant": str(uuid.UUID(self.applicant_ids[i])),
+                "status": str(self.statuses[i]),
+                "created_at": str(np.datetime_as_string(self.created_at[i], unit="us")) + "Z",
+                "score": round(float(self.score[i]), 4),
+                "years": round(float(self.years[i]), 2),
+                **{name: round(float(values[i]), 4) for name, values in self.features.items()},
+            }
+            for i in indices
+        ]
+
+
+def rank_applicants(job):
+    """Score every application to `job`; see the module docstring for the blend."""
+    from profiles.models import Education, Experience, Profile
+    from .models import Application
+
+    applications = Application.objects.filter(job_id=job.pk).order_by("created_at", "pk")
+    rows = list(applications.values_list(
+        _text("pk"), _text("applicant_id"), "status", "created_at",
+        _text("applicant__profile__id"), "applicant__profile__location",
+    ))
+    size = len(rows)
+    if rows:
+        application_ids, applicant_ids, statuses, created_at, profile_ids, locations = zip(*rows)
+    else:
+        application_ids = applicant_ids = statuses = created_at = profile_ids = locations = ()
+    keys = np.array([key or "" for key in profile_ids], dtype=str)
+    sorter = np.argsort(keys)
+    profiles = Profile.objects.filter(user__applications__job_id=job.pk).values("pk")
+
+    job_skills = list(job.skills.values_list("pk", flat=True))
+    matched = np.zeros(size)
+    if job_skills:
+        counts = list(
+            Profile.skills.through.objects.filter(profile_id__in=profiles, skill_id__in=job_skills)
+            .values("profile_id").annotate(n=Count("skill_id")).values_list(_text("profile_id"), "n")
+        )
+        if counts:
+            ids, n = zip(*counts)
+            matched[_positions(keys, sorter, ids)] = n
+    skills = matched / len(job_skills) if job_skills else np.ones(size)
+
+    ranges = list(Experience.objects.filter(profile_id__in=profiles).values_list(
+        _text("profile_id"), "start_date", "end_date"
+    ))
+    if ranges:
+        ids, starts, ends = zip(*ranges)
+        groups = _positions(keys, sorter, ids)
+        days = experience_days(groups, np.array(starts, dtype="datetime64[D]"), np.array(ends, dtype="datetime64[D]"), size)
+    else:
+        days = np.zeros(size)
+    years = days / 365.25
+    required = REQUIRED_YEARS.get(job.experience_level, 0)
+    experience = np.minimum(years / required, 1.0) if required else np.ones(size)
+
+    education = np.zeros(size)
+    levels = list(
+        Education.objects.filter(profile_id__in=profiles)
+        .values("profile_id").annotate(level=Max(degree_level())).values_list(_text("profile_id"), "level")
+    )
+    if levels:
+        ids, level = zip(*levels)
+        education[_positions(keys, sorter, ids)] = np.array(level) / TOP_DEGREE_LEVEL
+
+    location = location_scores(
+        np.char.lower(np.array([loc or "" for loc in locations], dtype=str)),
+        job.location_type, job.city, job.country,
+    )
+    return Ranking(
+        list(application_ids),
+        list(applicant_ids),
+        np.array(statuses, dtype=str),
+        np.array([ts.replace(tzinfo=None) for ts in created_at], dtype="datetime64[us]"),
+        years,
+        {"skills": skills, "experience": experience, "education": education, "location": location},
+    )
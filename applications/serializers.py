@@ -1,11 +1,25 @@
 from rest_framework import serializers
 from .models import Application
+from common.choices import ApplicationStatus
+from common.serializers import SparseFieldsetMixin
+
+class ApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    job_title = serializers.CharField(source="job.title", read_only=True)
+    applicant_email = serializers.EmailField(source="applicant.email", read_only=True)
+    expandable_fields = {
+        "job": ("jobs.serializers.JobSerializer", {}),
+    }
 
-class ApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Application
         fields = [
-            "id", "job", "applicant", "resume_snapshot",
+            "id", "job", "job_title", "applicant", "applicant_email", "resume_snapshot",
             "cover_letter", "status", "created_at", "updated_at"
         ]
         read_only_fields = ["id", "status", "created_at", "updated_at"]
+
+
+class ApplicationTransitionSerializer(serializers.Serializer):
+    applications = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=ApplicationStatus.choices)
+    note = serializers.CharField(required=False, allow_blank=True, default="")
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from common.storage import track_references
+from . import pipeline
+from .models import Application
+
+track_references(Application, "resume_snapshot")
+
+
+@receiver(pre_save, sender=Application)
+def remember_pipeline_column(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"job", "job_id", "status"} & set(update_fields):
+        return
+    instance._pipeline_column = (
+        Application.objects.filter(pk=instance.pk).values_list("job_id", "status").first()
+    )
+
+
+@receiver(post_save, sender=Application)
+def update_pipeline_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        pipeline.move([instance])
+    elif hasattr(instance, "_pipeline_column"):
+        before = instance.__dict__.pop("_pipeline_column")
+        pipeline.move([instance], {instance.pk: before} if before else None)
+
+
+@receiver(post_delete, sender=Application)
+def update_pipeline_on_delete(sender, instance, **kwargs):
+    pipeline.move((), {instance.pk: (instance.job_id, instance.status)})
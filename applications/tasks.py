@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .transitions import send_status_notifications
+
+
+@shared_task
+def notify_status_change(application_ids, status):
+    """Notify the applicants of a batch of applications moved to `status`."""
+    return send_status_notifications(application_ids, status)
@@ -1,3 +1,241 @@
+import json
+import sys
+from datetime import date, timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from auditlog.models import AuditLog
+from common.choices import ApplicationStatus, NotificationType
+from common.testing import assert_query_budget
+from companies.models import Company
+from jobs.models import Job, Skill
+from notifications.models import Notification
+from profiles.models import Education, Experience, Profile
+from . import pipeline, tasks
+from .models import Application, ApplicationEvent, ApplicationStatusCount
+
+
+class ApplicationTestCase(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=self.recruiter, name="Acme", slug="acme")
+        self.job = self.create_job("Backend developer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def create_job(self, title, **fields):
+        fields = {
+            "experience_level": "MID", "employment_type": "FULL_TIME", "location_type": "REMOTE",
+            "application_deadline": (timezone.now() + timedelta(days=30)).date(), **fields,
+        }
+        return Job.objects.create(company=self.company, title=title, description="Build APIs.", **fields)
+
+    def apply(self, count, job=None, status=ApplicationStatus.SUBMITTED):
+        start = User.objects.count()
+        return [
+            Application.objects.create(
+                job=job or self.job, status=status,
+                applicant=User.objects.create_user(email=f"seeker{start + i}@example.com", password="x"),
+            )
+            for i in range(count)
+        ]
+
+    def counts(self, job=None):
+        return dict(ApplicationStatusCount.objects.filter(job=job or self.job).values_list("status", "count"))
+
+
+class BulkTransitionTests(ApplicationTestCase):
+    def transition(self, applications, new_status, **extra):
+        kafka = mock.Mock()
+        # No broker in tests: run the notification task in-process and stand in for the Kafka producer.
+        with mock.patch.object(tasks.notify_status_change, "delay", side_effect=tasks.notify_status_change), \
+                mock.patch.dict(sys.modules, {"auditlog.kafka_producer": kafka}), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("application-transition"),
+                {"applications": [str(application.pk) for application in applications], "status": new_status,
+                 **extra},
+                format="json",
+            )
+        return response, kafka
+
+    def test_moves_applications_with_their_side_effects(self):
+        waiting = self.apply(2)
+        reviewed = self.apply(1, status=ApplicationStatus.UNDER_REVIEW)
+        response, kafka = self.transition(waiting + reviewed, ApplicationStatus.UNDER_REVIEW, note="Shortlisted")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data["updated"], response.data["unchanged"]), (2, 1))
+
+        self.assertEqual(Application.objects.filter(status=ApplicationStatus.UNDER_REVIEW).count(), 3)
+        self.assertEqual(self.counts(), {ApplicationStatus.SUBMITTED: 0, ApplicationStatus.UNDER_REVIEW: 3})
+        events = ApplicationEvent.objects.filter(application__in=waiting)
+        self.assertEqual(events.count(), 2)
+        self.assertEqual(events.first().note, "SUBMITTED -> UNDER_REVIEW\nShortlisted")
+        logs = AuditLog.objects.filter(model_name="Application", action="UPDATE")
+        self.assertEqual({log.object_id for log in logs}, {str(application.pk) for application in waiting})
+        self.assertEqual(logs.first().old_data, {"status": ApplicationStatus.SUBMITTED})
+        self.assertEqual(len(kafka.publish_audit_logs.call_args.args[0]), 2)
+        notified = Notification.objects.filter(type=NotificationType.APPLICATION)
+        self.assertEqual(
+            set(notified.values_list("recipient_id", flat=True)), {application.applicant_id for application in waiting}
+        )
+
+    def test_one_disallowed_move_changes_nothing(self):
+        submitted = self.apply(1)
+        rejected = self.apply(1, status=ApplicationStatus.REJECTED)
+        response, kafka = self.transition(submitted + rejected, ApplicationStatus.INTERVIEW)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["applications"]), [str(rejected[0].pk)])
+        self.assertEqual(Application.objects.get(pk=submitted[0].pk).status, ApplicationStatus.SUBMITTED)
+        self.assertFalse(ApplicationEvent.objects.exists())
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual(self.counts(), {ApplicationStatus.SUBMITTED: 1, ApplicationStatus.REJECTED: 1})
+        kafka.publish_audit_logs.assert_not_called()
+
+
+class ApplicationExportTests(ApplicationTestCase):
+    def test_ndjson_export_filters_and_resolves(self):
+        self.apply(2)
+        self.apply(1, status=ApplicationStatus.REJECTED)
+        self.client.force_authenticate(User.objects.create_user(email="admin@example.com", password="x", is_staff=True))
+        response = self.client.get(reverse("application-export"), {"status": ApplicationStatus.SUBMITTED})
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["job_title"] for row in rows}, {"Backend developer"})
+        self.assertEqual({row["company_id"] for row in rows}, {str(self.company.pk)})
+        self.assertTrue(all(row["applicant_email"].endswith("@example.com") for row in rows))
+
+
+class ApplicationListTests(ApplicationTestCase):
+    def setUp(self):
+        super().setUp()
+        self.applications = self.apply(5)
+        self.apply(2, job=self.create_job("Designer"))
+        # Two share a timestamp, so the id has to break the tie.
+        Application.objects.filter(pk__in=[a.pk for a in self.applications[1:3]]).update(
+            created_at=self.applications[1].created_at
+        )
+        self.newest_first = list(
+            Application.objects.filter(job=self.job).order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def walk(self, params):
+        ids, url, pages = [], reverse("application-list-create"), []
+        response = assert_query_budget(self.client, "get", url, params)
+        while True:
+            self.assertEqual(response.status_code, 200, response.data)
+            pages.append(response.data)
+            ids.extend(row["id"] for row in response.data["results"])
+            if not response.data["next"]:
+                return ids, pages
+            response = assert_query_budget(self.client, "get", response.data["next"])
+
+    def test_pages_cover_a_jobs_applications_once_in_order(self):
+        ids, pages = self.walk({"job": str(self.job.pk), "size": 2})
+        self.assertEqual(ids, [str(pk) for pk in self.newest_first])
+        self.assertEqual(len(pages), 3)
+        back = self.client.get(pages[2]["previous"]).data
+        self.assertEqual(back["results"], pages[1]["results"])
+
+    def test_status_filter(self):
+        Application.objects.filter(pk=self.applications[0].pk).update(status=ApplicationStatus.REJECTED)
+        ids, _ = self.walk({"job": str(self.job.pk), "status": ApplicationStatus.REJECTED})
+        self.assertEqual(ids, [str(self.applications[0].pk)])
+
+    def test_applicants_only_see_their_own(self):
+        applicant = self.applications[0].applicant
+        self.client.force_authenticate(applicant)
+        ids, _ = self.walk({})
+        self.assertEqual(ids, [str(self.applications[0].pk)])
+        response = self.client.get(reverse("application-list-create"), {"job": str(self.job.pk)})
+        self.assertEqual(response.status_code, 403)
+
+
+class PipelineTests(ApplicationTestCase):
+    def rows(self):
+        return sorted(ApplicationStatusCount.objects.values_list("job_id", "status", "count", "newest"))
+
+    def test_signals_keep_counts_that_match_a_rebuild(self):
+        applications = self.apply(3)
+        other = self.apply(1, job=self.create_job("Designer"))
+        applications[0].status = ApplicationStatus.INTERVIEW
+        applications[0].save()
+        applications[1].delete()
+        other[0].job = self.job
+        other[0].save()
+        self.assertEqual(self.counts(), {ApplicationStatus.SUBMITTED: 2, ApplicationStatus.INTERVIEW: 1})
+        kept = [(job, status, count, newest) for job, status, count, newest in self.rows() if count]
+        pipeline.rebuild()
+        self.assertEqual(self.rows(), kept)
+
+    def test_board(self):
+        applications = self.apply(3)
+        self.apply(1, job=self.create_job("Designer"), status=ApplicationStatus.OFFER)
+        response = assert_query_budget(self.client, "get", reverse("company-pipeline", args=[self.company.pk]),
+                                       {"newest": 2})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["totals"][ApplicationStatus.SUBMITTED], 3)
+        self.assertEqual(response.data["totals"][ApplicationStatus.OFFER], 1)
+        self.assertEqual([row["id"] for row in response.data["newest"][ApplicationStatus.SUBMITTED]],
+                         [str(applications[2].pk), str(applications[1].pk)])
+        jobs = {job["title"]: job for job in response.data["jobs"]}
+        self.assertEqual((jobs["Backend developer"]["total"], jobs["Designer"]["total"]), (3, 1))
+
+        self.client.force_authenticate(applications[0].applicant)
+        self.assertEqual(self.client.get(reverse("company-pipeline", args=[self.company.pk])).status_code, 403)
+
+
+class ApplicantRankingTests(ApplicationTestCase):
+    def setUp(self):
+        super().setUp()
+        python, django = Skill.objects.create(name="Python"), Skill.objects.create(name="Django")
+        self.job = self.create_job("Senior developer", experience_level="SENIOR", location_type="ONSITE",
+                                   city="Pune", country="India")
+        self.job.skills.add(python, django)
+        self.strong, self.partial, self.bare = self.apply(3)
+        today = date.today()
+
+        profile = Profile.objects.create(user=self.strong.applicant, location="Pune")
+        profile.skills.add(python, django)
+        # Overlapping positions count once: six years in all.
+        Experience.objects.create(profile=profile, company="A", title="Dev", start_date=today - timedelta(days=6 * 365))
+        Experience.objects.create(profile=profile, company="B", title="Dev", start_date=today - timedelta(days=3 * 365),
+                                  end_date=today - timedelta(days=2 * 365))
+        Education.objects.create(profile=profile, institution="IIT", degree="Master of Science", start_year=2010)
+
+        profile = Profile.objects.create(user=self.partial.applicant, location="Mumbai, India")
+        profile.skills.add(python)
+        Experience.objects.create(profile=profile, company="C", title="Dev", start_date=today - timedelta(days=913),
+                                  end_date=today)
+        # self.bare has no profile at all.
+
+    def ranked(self, **params):
+        response = self.client.get(reverse("job-applications-ranked", args=[self.job.pk]), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data["results"]
+
+    def test_applicants_are_scored_on_every_feature(self):
+        rows = {row["application"]: row for row in self.ranked()}
+        strong, partial, bare = (rows[str(a.pk)] for a in (self.strong, self.partial, self.bare))
+        self.assertEqual((strong["skills"], strong["experience"], strong["education"], strong["location"]),
+                         (1.0, 1.0, 0.75, 1.0))
+        self.assertEqual(round(strong["years"]), 6)
+        self.assertEqual((partial["skills"], partial["education"], partial["location"]), (0.5, 0.0, 0.5))
+        self.assertAlmostEqual(partial["experience"], 0.5, places=3)  # two and a half of five years
+        self.assertEqual(bare["score"], 0.0)
+        self.assertEqual(strong["score"], 0.975)
 
-# Create your tests here.
+    def test_sorting_and_filtering(self):
+        order = [str(a.pk) for a in (self.strong, self.partial, self.bare)]
+        self.assertEqual([row["application"] for row in self.ranked()], order)
+        self.assertEqual([row["application"] for row in self.ranked(sort="years")], order[::-1])
+        Application.objects.filter(pk=self.partial.pk).update(status=ApplicationStatus.REJECTED)
+        self.assertEqual([row["application"] for row in self.ranked(status=ApplicationStatus.REJECTED)], order[1:2])
+        response = self.client.get(reverse("job-applications-ranked", args=[self.job.pk]), {"sort": "salary"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,130 @@
+"""
+Application status state machine and bulk transitions.
+
+Applications move forward through SUBMITTED -> UNDER_REVIEW -> INTERVIEW ->
+OFFER (stages may be skipped) and can be rejected from any stage; REJECTED
+is final. `bulk_transition` moves many applications with one UPDATE, then
+writes their ApplicationEvent and AuditLog rows with bulk_create and queues
+the applicants' notifications in batches once the transaction commits.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from auditlog.bulk import bulk_audit
+from common.choices import ApplicationStatus, NotificationType
+from common.exports import chunked
+from . import pipeline
+
+STAGES = [
+    ApplicationStatus.SUBMITTED,
+    ApplicationStatus.UNDER_REVIEW,
+    ApplicationStatus.INTERVIEW,
+    ApplicationStatus.OFFER,
+]
+
+TRANSITIONS = {
+    **{stage: {*STAGES[i + 1:], ApplicationStatus.REJECTED} for i, stage in enumerate(STAGES)},
+    ApplicationStatus.REJECTED: set(),
+}
+
+NOTIFICATION_BATCH_SIZE = 500
+
+
+class TransitionError(Exception):
+    """Raised with `{application id: message}` when a transition is not allowed."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def can_transition(current, new):
+    return new in TRANSITIONS.get(current, ())
+
+
+def bulk_transition(application_ids, new_status, user=None, note=""):
+    """
+    Move `application_ids` to `new_status`, all or nothing. Applications
+    already in `new_status` are left alone. Returns the ids that moved;
+    raises TransitionError if any application is missing or cannot move.
+    """
+    from .models import Application, ApplicationEvent
+
+    application_ids = list(dict.fromkeys(str(pk) for pk in application_ids))
+    with transaction.atomic():
+        rows = {
+            str(row["id"]): row
+            for row in Application.objects.select_for_update()
+            .filter(pk__in=application_ids)
+            .values("id", "job_id", "applicant_id", "status", "created_at")
+        }
+        errors = {}
+        for pk in application_ids:
+            row = rows.get(pk)
+            if row is None:
+                errors[pk] = "Application not found."
+            elif row["status"] != new_status and not can_transition(row["status"], new_status):
+                errors[pk] = f"Cannot move from {row['status']} to {new_status}."
+        if errors:
+            raise TransitionError(errors)
+
+        moving = [row for row in rows.values() if row["status"] != new_status]
+        if not moving:
+            return []
+        moved_ids = [row["id"] for row in moving]
+        now = timezone.now()
+        Application.objects.filter(pk__in=moved_ids).update(status=new_status, updated_at=now)
+
+        label = ApplicationStatus(new_status).label
+        ApplicationEvent.objects.bulk_create([
+            ApplicationEvent(
+                application_id=row["id"],
+                event=f"Status changed to {label}",
+                note="\n".join(filter(None, [f"{row['status']} -> {new_status}", note])),
+            )
+            for row in moving
+        ], batch_size=1000)
+        bulk_audit("UPDATE", Application.__name__, [
+            (row["id"], {"status": row["status"]}, {"status": new_status, "updated_at": now.isoformat()})
+            for row in moving
+        ], user=user)
+        # A queryset update bypasses the signals that keep the pipeline counts.
+        pipeline.move(
+            [Application(id=row["id"], job_id=row["job_id"], status=new_status, created_at=row["created_at"])
+             for row in moving],
+            {row["id"]: (row["job_id"], row["status"]) for row in moving},
+        )
+        queue_status_notifications(moved_ids, new_status)
+    return moved_ids
+
+
+def queue_status_notifications(application_ids, status):
+    from .tasks import notify_status_change
+
+    for batch in chunked([str(pk) for pk in application_ids], NOTIFICATION_BATCH_SIZE):
+        # robust: a broker outage must not undo the transition.
+        transaction.on_commit(lambda batch=batch: notify_status_change.delay(batch, status), robust=True)
+
+
+def send_status_notifications(application_ids, status):
+    """Tell each applicant their application moved to `status`. Returns the number of notifications."""
+    from notifications.models import Notification
+    from .models import Application
+
+    label = ApplicationStatus(status).label
+    application_ct = ContentType.objects.get_for_model(Application)
+    rows = Application.objects.filter(pk__in=application_ids, status=status).values_list(
+        "id", "applicant_id", "job__title"
+    )
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            recipient_id=applicant_id,
+            type=NotificationType.APPLICATION,
+            verb=f"Your application for {title} is now: {label}"[:160],
+            target_ct=application_ct,
+            target_id=str(pk),
+        )
+        for pk, applicant_id, title in rows
+    ], batch_size=NOTIFICATION_BATCH_SIZE)
+    return len(notifications)
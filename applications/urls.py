@@ -1,7 +1,15 @@
 from django.urls import path
-from .views import ApplicationListCreateView, ApplicationDetailView
+from .views import (
+    ApplicationListCreateView, ApplicationDetailView, ApplicationExportView, ApplicationPipelineView,
+    ApplicationRankingView, ApplicationTimelineView, ApplicationTransitionView,
+)
 
 urlpatterns = [
     path("applications/", ApplicationListCreateView.as_view(), name="application-list-create"),
+    path("applications/transition/", ApplicationTransitionView.as_view(), name="application-transition"),
+    path("applications/export/", ApplicationExportView.as_view(), name="application-export"),
     path("applications/<uuid:pk>/", ApplicationDetailView.as_view(), name="application-detail"),
+    path("jobs/<uuid:pk>/applications/ranked/", ApplicationRankingView.as_view(), name="job-applications-ranked"),
+    path("applications/<uuid:pk>/timeline/", ApplicationTimelineView.as_view(), name="application-timeline"),
+    path("companies/<uuid:pk>/pipeline/", ApplicationPipelineView.as_view(), name="company-pipeline"),
 ]
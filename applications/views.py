@@ -1,16 +1,34 @@
+import uuid
+
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status,filters
+from rest_framework import status, filters, permissions
+from rest_framework.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
 from .models import Application
-from .serializers import ApplicationSerializer
+from .serializers import ApplicationSerializer, ApplicationTransitionSerializer
 from django_filters.rest_framework import DjangoFilterBackend
-from job_portal.pagination import SetPagination
+from job_portal.pagination import SetPagination, KeysetPagination
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from common.choices import ApplicationStatus
+from common.conditional import conditional_on_updated_at, updated_at_of
+from companies.permissions import RECRUITER_ROLES, IsCompanyRecruiter, is_company_member
+from jobs.models import Job
+from common.serializers import SPARSE_FIELDSET_PARAMETERS, sparse_fieldset
+from common.exports import EXPORT_FORMATS, export_format
+from .exports import ApplicationExport
+from . import pipeline
+from .ranking import SORT_KEYS, rank_applicants
+from common.archive import ARCHIVES
+from .transitions import TransitionError, bulk_transition
+from companies.models import Company
+from accounts.models import User
 
 class ApplicationListCreateView(APIView):
+    query_budget = {"GET": 4}
+    permission_classes = [permissions.IsAuthenticated]
     applications = Application.objects.all()
     serializer_class = ApplicationSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -18,18 +36,60 @@ class ApplicationListCreateView(APIView):
     search_fields = ["cover_letter", "job__title", "applicant__email"]  
     ordering_fields = ["created_at", "status"] 
     ordering = ["-created_at"]
-    pagination_class = SetPagination
+    pagination_class = KeysetPagination
+    recruiter_roles = RECRUITER_ROLES
 
     @swagger_auto_schema(
-        operation_summary="Retrieve all applications",
+        operation_summary="List applications, newest first",
+        operation_description="Without `job`, lists the caller's own applications (staff see every "
+                              "application). With `job`, lists that job's applications for its company's "
+                              "admins and recruiters, optionally filtered by `status`. Pages are keyset "
+                              "paginated; follow `next` / `previous`.",
+        manual_parameters=[
+            openapi.Parameter("job", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("status", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=list(ApplicationStatus.values)),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
         responses={200: ApplicationSerializer(many=True)},
         security=[{"Bearer": []}]
     )
 
     def get(self, request):
-        applications = Application.objects.all()
-        serializer = ApplicationSerializer(applications, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        job_id = request.query_params.get("job")
+        app_status = request.query_params.get("status")
+        if app_status and app_status not in ApplicationStatus.values:
+            return Response({"error": f"Unknown status '{app_status}'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if job_id:
+            try:
+                job_id = uuid.UUID(job_id)
+            except ValueError:
+                return Response({"error": "job must be a job id"}, status=status.HTTP_400_BAD_REQUEST)
+            # Served by app_job_created_idx, or app_job_status_created_idx with ?status=.
+            company_id = Job.objects.filter(pk=job_id).values_list("company_id", flat=True).first()
+            if company_id is None:
+                return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+            if not request.user.is_staff and not is_company_member(request.user, company_id, self.recruiter_roles):
+                return Response({"error": "Not a member of this company"}, status=status.HTTP_403_FORBIDDEN)
+            applications = Application.objects.filter(job_id=job_id)
+        elif request.user.is_staff:
+            applications = Application.objects.all()
+        else:
+            # Served by app_applicant_created_idx.
+            applications = Application.objects.filter(applicant=request.user)
+        if app_status:
+            applications = applications.filter(status=app_status)
+
+        fields, expand = sparse_fieldset(request)
+        paginator = self.pagination_class()
+        keys = [name.lstrip("-") for name in paginator.ordering]
+        applications = ApplicationSerializer.optimize_queryset(applications, fields, expand, keep=keys)
+        page = paginator.paginate_queryset(applications, request, view=self)
+        serializer = ApplicationSerializer(page, many=True, fields=fields, expand=expand)
+        return paginator.get_paginated_response(serializer.data)
 
     @swagger_auto_schema(
         operation_summary="Create a new application",
@@ -47,15 +107,32 @@ class ApplicationListCreateView(APIView):
 
 
 class ApplicationDetailView(APIView):
+    query_budget = {"GET": 4}
     @swagger_auto_schema(
         operation_summary="Retrieve a specific application",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: ApplicationSerializer},
         security=[{"Bearer": []}]
     )
+    @conditional_on_updated_at(lambda request, pk: updated_at_of(Application.objects.filter(pk=pk)))
     def get(self, request, pk):
-        application = get_object_or_404(Application, pk=pk)
-        serializer = ApplicationSerializer(application)
+        fields, expand = sparse_fieldset(request)
+        queryset = ApplicationSerializer.optimize_queryset(Application.objects.all(), fields, expand)
+        application = get_object_or_404(queryset, pk=pk)
+        serializer = ApplicationSerializer(application, fields=fields, expand=expand)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def writable(self, request, pk):
+        """The application, if the caller is its applicant, a recruiter of the job's company, or staff."""
+        application = get_object_or_404(Application.objects.select_related("job"), pk=pk)
+        if not (
+            request.user.is_staff
+            or application.applicant_id == request.user.pk
+            or is_company_member(request.user, application.job.company_id, RECRUITER_ROLES)
+        ):
+            raise PermissionDenied("Not allowed to change this application")
+        return application
+
     @swagger_auto_schema(
         operation_summary="Update a specific application",
         request_body=ApplicationSerializer,
@@ -63,7 +140,7 @@ class ApplicationDetailView(APIView):
         security=[{"Bearer": []}]
     )
     def put(self, request, pk):
-        application = get_object_or_404(Application, pk=pk)
+        application = self.writable(request, pk)
         serializer = ApplicationSerializer(application, data=request.data)
         if serializer.is_valid():
             serializer.save()  
@@ -77,7 +154,7 @@ class ApplicationDetailView(APIView):
     )
 
     def patch(self, request, pk):
-        application = get_object_or_404(Application, pk=pk)
+        application = self.writable(request, pk)
         serializer = ApplicationSerializer(application, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -90,6 +167,159 @@ class ApplicationDetailView(APIView):
     )
 
     def delete(self, request, pk):
-        application = get_object_or_404(Application, pk=pk)
+        application = self.writable(request, pk)
         application.delete()
         return Response({"detail": "Application deleted"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class ApplicationTimelineView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    recruiter_roles = RECRUITER_ROLES
+
+    @swagger_auto_schema(
+        operation_summary="Every event of an application, oldest first",
+        operation_description="Includes events already moved to the archive.",
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, pk):
+        application = Application.objects.filter(pk=pk).values("applicant_id", "job__company_id").first()
+        if application is None:
+            return Response({"error": "Application not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not (
+            request.user.is_staff
+            or application["applicant_id"] == request.user.pk
+            or is_company_member(request.user, application["job__company_id"], self.recruiter_roles)
+        ):
+            return Response({"error": "Not allowed to view this application"}, status=status.HTTP_403_FORBIDDEN)
+        events = ARCHIVES["application_events"].history(pk)
+        return Response({"application": str(pk), "events": events}, status=status.HTTP_200_OK)
+
+
+class ApplicationTransitionView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    recruiter_roles = RECRUITER_ROLES
+
+    @swagger_auto_schema(
+        operation_summary="Move many applications to a new status",
+        operation_description="All or nothing: if any application is missing or cannot make the transition, "
+                              "nothing changes and the errors are returned per application.",
+        request_body=ApplicationTransitionSerializer,
+        security=[{"Bearer": []}]
+    )
+    def post(self, request):
+        serializer = ApplicationTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        if not request.user.is_staff:
+            company_ids = set(
+                Job.objects.filter(applications__pk__in=data["applications"]).values_list("company_id", flat=True)
+            )
+            if not all(is_company_member(request.user, pk, self.recruiter_roles) for pk in company_ids):
+                return Response({"error": "Not a member of this company"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            moved = bulk_transition(data["applications"], data["status"], user=request.user, note=data["note"])
+        except TransitionError as exc:
+            return Response({"error": "Transition not allowed", "applications": exc.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"status": data["status"], "updated": len(moved), "unchanged": len(set(data["applications"])) - len(moved)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class ApplicationExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Stream every application as NDJSON or CSV",
+        manual_parameters=[
+            openapi.Parameter("output", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+            openapi.Parameter("job", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("status", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        fmt = export_format(request)
+        if fmt not in EXPORT_FORMATS:
+            return Response({"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        qs = Application.objects.order_by("pk")
+        job = request.query_params.get("job")
+        app_status = request.query_params.get("status")
+        if job:
+            qs = qs.filter(job_id=job)
+        if app_status:
+            qs = qs.filter(status=app_status)
+        return ApplicationExport(qs).response(fmt, "applications")
+
+
+class ApplicationPipelineView(APIView):
+    query_budget = {"GET": 5}
+    permission_classes = [IsCompanyRecruiter]
+    company_url_kwarg = "pk"
+
+    @swagger_auto_schema(
+        operation_summary="Hiring pipeline of a company's jobs",
+        operation_description="Per-job application counts for every status, company totals, and the "
+                              "newest applications in each status.",
+        manual_parameters=[openapi.Parameter("newest", openapi.IN_QUERY, type=openapi.TYPE_INTEGER)],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, pk):
+        if not Company.objects.filter(pk=pk).exists():
+            return Response({"error": "Company not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            newest = min(max(int(request.query_params.get("newest", pipeline.newest_size())), 0),
+                         pipeline.newest_size())
+        except ValueError:
+            newest = pipeline.newest_size()
+        return Response({"company": str(pk), **pipeline.board(pk, newest)}, status=status.HTTP_200_OK)
+
+
+class ApplicationRankingView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SetPagination
+    recruiter_roles = RECRUITER_ROLES
+
+    @swagger_auto_schema(
+        operation_summary="A job's applicants ranked by fit",
+        operation_description="Every application to the job, scored on skill overlap with the job, years of "
+                              "experience against its level, highest education, and location. Sort by "
+                              "`sort` (prefix `-` for descending; default `-score`) and filter by `status`.",
+        manual_parameters=[
+            openapi.Parameter("sort", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[f"{prefix}{key}" for key in SORT_KEYS for prefix in ("-", "")]),
+            openapi.Parameter("status", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=list(ApplicationStatus.values)),
+            openapi.Parameter("page", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter("size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, pk):
+        sort = request.query_params.get("sort", "-score")
+        if sort.lstrip("-") not in SORT_KEYS:
+            return Response({"error": f"sort must be one of {', '.join(SORT_KEYS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        app_status = request.query_params.get("status")
+        if app_status and app_status not in ApplicationStatus.values:
+            return Response({"error": f"Unknown status '{app_status}'"}, status=status.HTTP_400_BAD_REQUEST)
+        job = Job.objects.filter(pk=pk).only(
+            "company_id", "experience_level", "location_type", "city", "country"
+        ).first()
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not request.user.is_staff and not is_company_member(request.user, job.company_id, self.recruiter_roles):
+            return Response({"error": "Not a member of this company"}, status=status.HTTP_403_FORBIDDEN)
+
+        ranking = rank_applicants(job)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(ranking.order(sort, app_status or None), request, view=self)
+        rows = ranking.rows(page)
+        emails = dict(User.objects.filter(pk__in=[row["applicant"] for row in rows]).values_list("pk", "email"))
+        for row in rows:
+            row["applicant_email"] = emails.get(uuid.UUID(row["applicant"]), "")
+        return paginator.get_paginated_response(rows)
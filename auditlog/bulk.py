@@ -0,0 +1,54 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .models import AuditLog
+
+
+def snapshot(instance, exclude=None, extra=None):
+    """JSON-safe `model_to_dict` for AuditLog.old_data/new_data."""
+    data = model_to_dict(instance, exclude=exclude)
+    if extra:
+        data.update(extra)
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def bulk_audit(action, model_name, entries, user=None):
+    """
+    Write one AuditLog row per `(object_id, old_data, new_data)` entry with a
+    single INSERT, then publish them to Kafka in one batch after commit.
+    Nothing records writes automatically (the handlers in auditlog.signals
+    are not connected), so bulk writers call this to record theirs.
+    """
+    logs = AuditLog.objects.bulk_create([
+        AuditLog(
+            user=user,
+            action=action,
+            model_name=model_name,
+            object_id=str(object_id),
+            old_data=old_data,
+            new_data=new_data,
+        )
+        for object_id, old_data, new_data in entries
+    ])
+
+    def publish():
+        from .kafka_producer import publish_audit_logs
+
+        publish_audit_logs([
+            {
+                'user': user.email if user else None,
+                'action': log.action,
+                'model_name': log.model_name,
+                'object_id': log.object_id,
+                'timestamp': str(log.timestamp),
+                'old_data': log.old_data,
+                'new_data': log.new_data,
+            }
+            for log in logs
+        ])
+
+    transaction.on_commit(publish, robust=True)
+    return logs
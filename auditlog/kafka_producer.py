@@ -20,3 +20,11 @@ def publish_audit_log(data: dict):
     """
     producer.send('audit-logs', value=data)
     producer.flush()
+
+def publish_audit_logs(items):
+    """
+    Publish many audit log dictionaries with a single flush
+    """
+    for data in items:
+        producer.send('audit-logs', value=data)
+    producer.flush()
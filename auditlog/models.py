@@ -19,5 +19,12 @@ class AuditLog(models.Model):
     old_data = models.JSONField(blank=True, null=True)   
     new_data = models.JSONField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["model_name", "object_id", "timestamp"], name="audit_object_idx"),
+            # Finds the rows old enough for common.archive to move out.
+            models.Index(fields=["timestamp"], name="audit_timestamp_idx"),
+        ]
+
     def __str__(self):
         return f"{self.action} on {self.model_name} ({self.object_id}) by {self.user}"
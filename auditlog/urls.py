@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import AuditHistoryView
+
+urlpatterns = [
+    path("audit/<str:model_name>/<str:object_id>/", AuditHistoryView.as_view(), name="audit-history"),
+]
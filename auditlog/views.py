@@ -1,3 +1,21 @@
 from django.shortcuts import render
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from drf_yasg.utils import swagger_auto_schema
+from common.archive import ARCHIVES
 
-# Create your views here.
+
+class AuditHistoryView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Audit trail of one object, oldest first",
+        operation_description="`model_name` is the model's class name, e.g. `Application`. Includes entries "
+                              "already moved to the archive.",
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, model_name, object_id):
+        entries = ARCHIVES["audit_log"].history(model_name, object_id)
+        return Response({"model_name": model_name, "object_id": object_id, "entries": entries},
+                        status=status.HTTP_200_OK)
@@ -0,0 +1,191 @@
+"""
+Tiered archival of append-only history tables.
+
+`ArchivedHistory.archive` moves rows older than ARCHIVE_AFTER_DAYS out of
+the database, one batch at a time. Each batch becomes one immutable segment
+under ARCHIVE_ROOT/<name>/:
+
+- `<segment>.jsonl.gz`: the rows as JSON lines, sorted by key (an
+  application, or an audited object) and cut into blocks of about
+  BLOCK_SIZE bytes, each block its own gzip member;
+- `<segment>.idx.json`: the sidecar index, holding the batch's time range,
+  each block's byte range and the block each key starts in.
+
+`history(key)` reads only the blocks of segments whose index lists the key,
+and merges them with the rows still in the database, so callers see one
+timeline whichever tier a row lives in.
+"""
+import gzip
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+BLOCK_SIZE = 64 * 1024
+
+
+class _Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds to milliseconds; archived timestamps keep every digit.
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _dumps(row):
+    return json.dumps(row, cls=_Encoder, separators=(",", ":"))
+
+
+class ArchivedHistory:
+    def __init__(self, name, model_label, fields, key_fields, time_field):
+        self.name = name
+        self.model_label = model_label
+        self.fields = fields
+        self.key_fields = key_fields
+        self.time_field = time_field
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def directory(self):
+        return os.path.join(getattr(settings, "ARCHIVE_ROOT", os.path.join(settings.BASE_DIR, "archive")), self.name)
+
+    def key(self, row):
+        return "|".join(str(row[field]) for field in self.key_fields)
+
+    def archive(self, before=None, batch_size=None):
+        """Move every row older than `before` (default: ARCHIVE_AFTER_DAYS ago) into segments. Returns the count."""
+        if before is None:
+            before = timezone.now() - timedelta(days=getattr(settings, "ARCHIVE_AFTER_DAYS", 180))
+        batch_size = batch_size or getattr(settings, "ARCHIVE_BATCH_SIZE", 5000)
+        moved = 0
+        while True:
+            count = self.archive_batch(before, batch_size)
+            moved += count
+            if count < batch_size:
+                return moved
+
+    def archive_batch(self, before, batch_size):
+        model = self.model
+        rows = list(
+            model.objects.filter(**{f"{self.time_field}__lt": before})
+            .order_by(self.time_field, "pk").values(*self.fields)[:batch_size]
+        )
+        if not rows:
+            return 0
+        self.write_segment(rows)
+        # Written (and synced) first: a crash before the delete only leaves
+        # rows in both tiers, which history() de-duplicates by id.
+        with transaction.atomic():
+            # _raw_delete: a single DELETE, without delete()'s fetch of every
+            # row to collect cascades and send per-row signals.
+            model.objects.filter(pk__in=[row["id"] for row in rows])._raw_delete(model.objects.db)
+        return len(rows)
+
+    def write_segment(self, rows):
+        os.makedirs(self.directory, exist_ok=True)
+        segment = f"{rows[0][self.time_field]:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.directory, segment)
+
+        by_key = defaultdict(list)
+        for row in rows:
+            by_key[self.key(row)].append(_dumps(row))
+        blocks, keys, pending, pending_size, offset = [], {}, [], 0, 0
+        with open(path + ".jsonl.gz.tmp", "wb") as fh:
+            def flush():
+                nonlocal offset, pending_size
+                data = gzip.compress("\n".join(pending).encode() + b"\n", mtime=0)
+                fh.write(data)
+                blocks.append([offset, len(data)])
+                offset += len(data)
+                pending.clear()
+                pending_size = 0
+
+            for key in sorted(by_key):
+                # A key's rows never straddle blocks, so one block read serves a lookup.
+                keys[key] = len(blocks)
+                pending.extend(by_key[key])
+                pending_size += sum(map(len, by_key[key]))
+                if pending_size >= BLOCK_SIZE:
+                    flush()
+            if pending:
+                flush()
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(path + ".jsonl.gz.tmp", path + ".jsonl.gz")
+
+        index = {
+            "rows": len(rows),
+            "first": json.loads(_dumps(rows[0][self.time_field])),
+            "last": json.loads(_dumps(rows[-1][self.time_field])),
+            "blocks": blocks,
+            "keys": keys,
+        }
+        with open(path + ".idx.json.tmp", "w") as fh:
+            json.dump(index, fh, separators=(",", ":"))
+            fh.flush()
+            os.fsync(fh.fileno())
+        # The index appears last; readers ignore segments without one.
+        os.replace(path + ".idx.json.tmp", path + ".idx.json")
+        return segment
+
+    def indexes(self):
+        """{segment: index} for every complete segment; indexes are loaded once per process."""
+        if not os.path.isdir(self.directory):
+            return {}
+        names = sorted(name[:-len(".idx.json")] for name in os.listdir(self.directory) if name.endswith(".idx.json"))
+        with self._lock:
+            for name in names:
+                if name not in self._indexes:
+                    with open(os.path.join(self.directory, name + ".idx.json")) as fh:
+                        self._indexes[name] = json.load(fh)
+            return {name: self._indexes[name] for name in names}
+
+    def archived(self, key):
+        rows = []
+        for segment, index in self.indexes().items():
+            block = index["keys"].get(key)
+            if block is None:
+                continue
+            offset, length = index["blocks"][block]
+            with open(os.path.join(self.directory, segment + ".jsonl.gz"), "rb") as fh:
+                fh.seek(offset)
+                data = gzip.decompress(fh.read(length))
+            rows.extend(row for row in map(json.loads, data.splitlines()) if self.key(row) == key)
+        return rows
+
+    def history(self, *key_values):
+        """Every row for the key, archived and live, oldest first."""
+        key = "|".join(str(value) for value in key_values)
+        rows = {row["id"]: row for row in self.archived(key)}
+        live = self.model.objects.filter(**dict(zip(self.key_fields, key_values))).values(*self.fields)
+        for row in live:
+            row = json.loads(_dumps(row))
+            rows[row["id"]] = row
+        return sorted(rows.values(), key=lambda row: (row[self.time_field], row["id"]))
+
+
+ARCHIVES = {
+    "application_events": ArchivedHistory(
+        "application_events", "applications.ApplicationEvent",
+        fields=("id", "application_id", "event", "note", "created_at", "updated_at"),
+        key_fields=("application_id",), time_field="created_at",
+    ),
+    "audit_log": ArchivedHistory(
+        "audit_log", "auditlog.AuditLog",
+        fields=("id", "user_id", "action", "model_name", "object_id", "timestamp", "old_data", "new_data"),
+        key_fields=("model_name", "object_id"), time_field="timestamp",
+    ),
+}
@@ -0,0 +1,174 @@
+"""
+Prefix autocomplete over company, skill and job category names.
+
+Each `Autocomplete` keeps its model's names in a `NameIndex`: one sorted
+array of `(lowercased name, name, id)`, so a keystroke is a binary search
+plus a short scan, with no database round trip. Saves and deletes in this
+worker update the array in place; other workers pick changes up when they
+rebuild after AUTOCOMPLETE_INDEX_MAX_AGE seconds, which happens in the
+background while the old array keeps answering. A worker with no index yet
+answers from the database through the `Lower(name)` index meanwhile.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
+
+# Sorts after any character a name continues with, so [prefix, prefix + MAX) is a range on the index.
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize(prefix):
+    return (prefix or "").strip().lower()
+
+
+class NameIndex:
+    def __init__(self):
+        self.entries = []   # sorted (lowercased name, name, id)
+        self.by_id = {}     # id -> entry
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, pk, name):
+        pk = str(pk)
+        with self.lock:
+            self._remove(pk)
+            entry = (name.lower(), name, pk)
+            insort(self.entries, entry)
+            self.by_id[pk] = entry
+
+    def remove(self, pk):
+        with self.lock:
+            self._remove(str(pk))
+
+    def _remove(self, pk):
+        entry = self.by_id.pop(pk, None)
+        if entry is not None:
+            i = bisect_left(self.entries, entry)
+            del self.entries[i]
+
+    def load(self, rows):
+        """Replace the contents with `(id, name)` rows in one sort."""
+        entries = sorted((name.lower(), name, str(pk)) for pk, name in rows)
+        with self.lock:
+            self.entries = entries
+            self.by_id = {entry[2]: entry for entry in entries}
+
+    def complete(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        with self.lock:
+            start = bisect_left(self.entries, (prefix,))
+            matches = []
+            for key, name, pk in self.entries[start:start + limit]:
+                if not key.startswith(prefix):
+                    break
+                matches.append({"id": pk, "name": name})
+            return matches
+
+
+class Autocomplete:
+    def __init__(self, model_label):
+        self.model_label = model_label
+        self._index = None
+        self._lock = threading.Lock()
+        self._building = False
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def queryset(self):
+        model = self.model
+        names = model.objects.all()
+        if any(field.name == "is_active" for field in model._meta.fields):
+            names = names.filter(is_active=True)
+        return names
+
+    def max_age(self):
+        return getattr(settings, "AUTOCOMPLETE_INDEX_MAX_AGE", 300)
+
+    def get_loaded_index(self):
+        return self._index
+
+    def reset_index(self):
+        with self._lock:
+            self._index = None
+
+    def build_index(self):
+        index = NameIndex()
+        index.load(self.queryset().values_list("pk", "name").iterator(chunk_size=5000))
+        return index
+
+    def _rebuild(self):
+        try:
+            self._index = self.build_index()
+        finally:
+            self._building = False
+            close_old_connections()
+
+    def refresh(self, wait=False):
+        """Build the index in a background thread unless a build is already running."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        if wait:
+            self._rebuild()
+        else:
+            threading.Thread(target=self._rebuild, name=f"autocomplete-{self.model_label}", daemon=True).start()
+
+    def complete(self, prefix, limit=10):
+        """Up to `limit` `{"id", "name"}` matches for `prefix`, alphabetically."""
+        index = self._index
+        if index is None or time.monotonic() - index.built_at > self.max_age():
+            self.refresh()
+        if index is None:
+            return self.fallback(prefix, limit)
+        return index.complete(prefix, limit)
+
+    def fallback(self, prefix, limit=10):
+        # The range lets the Lower(name) index find the first match whatever the
+        # collation; startswith then keeps exactly the names with the prefix.
+        prefix = normalize(prefix)
+        rows = (
+            self.queryset().annotate(name_ci=Lower("name"))
+            .filter(name_ci__gte=prefix, name_ci__lt=prefix + _MAX_CHAR, name_ci__startswith=prefix)
+            .order_by("name_ci", "name", "pk").values_list("pk", "name")[:limit]
+        )
+        return [{"id": str(pk), "name": name} for pk, name in rows]
+
+    def track(self):
+        """Keep this worker's index current on saves and deletes of the model."""
+        uid = f"autocomplete:{self.model_label}"
+
+        def saved(sender, instance, raw=False, **kwargs):
+            index = self._index
+            if raw or index is None:
+                return
+            if getattr(instance, "is_active", True):
+                transaction.on_commit(lambda: index.add(instance.pk, instance.name))
+            else:
+                transaction.on_commit(lambda: index.remove(instance.pk))
+
+        def deleted(sender, instance, **kwargs):
+            index = self._index
+            if index is not None:
+                transaction.on_commit(lambda pk=instance.pk: index.remove(pk))
+
+        post_save.connect(saved, sender=self.model_label, weak=False, dispatch_uid=uid)
+        post_delete.connect(deleted, sender=self.model_label, weak=False, dispatch_uid=uid)
+
+
+AUTOCOMPLETE = {
+    "companies": Autocomplete("companies.Company"),
+    "skills": Autocomplete("jobs.Skill"),
+    "categories": Autocomplete("jobs.JobCategory"),
+}
@@ -0,0 +1,165 @@
+"""
+Two-tier versioned cache for serialized API payloads.
+
+Entries live in the process-local cache (`CACHES["default"]`) with the
+shared Redis cache (`CACHES["shared"]`) behind it. Every key is prefixed
+with its namespace's current version, and the version is read from the
+shared tier on each lookup. Bumping the version from a signal handler
+therefore invalidates every worker's entries at once, without deleting
+anything. Old versions simply expire.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import caches
+from django.db import transaction
+
+from common.routers import pin_primary, replica_lag
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ALIAS = "default"
+SHARED_ALIAS = "shared"
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_local_versions = defaultdict(lambda: 1)
+_local_bumped_at = {}
+
+
+def _count(namespace, event):
+    with _stats_lock:
+        _stats[namespace][event] += 1
+
+
+def cache_stats():
+    """Per-namespace counters for this process, with hit rates."""
+    with _stats_lock:
+        snapshot = {namespace: dict(counter) for namespace, counter in _stats.items()}
+    for counter in snapshot.values():
+        hits = counter.get("local_hits", 0) + counter.get("shared_hits", 0)
+        lookups = hits + counter.get("misses", 0)
+        counter["hit_rate"] = round(hits / lookups, 4) if lookups else None
+    return snapshot
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class VersionedCache:
+    def __init__(self, namespace, timeout=600, local_timeout=60):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+
+    @property
+    def local(self):
+        return caches[LOCAL_ALIAS]
+
+    @property
+    def shared(self):
+        return caches[SHARED_ALIAS]
+
+    @property
+    def version_key(self):
+        return f"cachever:{self.namespace}"
+
+    def version(self):
+        try:
+            version = self.shared.get(self.version_key)
+            if version is None:
+                self.shared.add(self.version_key, 1, timeout=None)
+                version = self.shared.get(self.version_key, 1)
+            return version
+        except Exception:
+            # Without the shared tier, fall back to this process's own counter.
+            _count(self.namespace, "shared_errors")
+            return _local_versions[self.namespace]
+
+    def bump(self):
+        _count(self.namespace, "bumps")
+        _local_versions[self.namespace] += 1
+        _local_bumped_at[self.namespace] = time.time()
+        try:
+            try:
+                self.shared.incr(self.version_key)
+            except ValueError:
+                self.shared.add(self.version_key, 2, timeout=None)
+            self.shared.set(f"{self.version_key}:at", time.time(), replica_lag())
+        except Exception:
+            _count(self.namespace, "shared_errors")
+            logger.warning("Could not bump shared cache version for %s", self.namespace)
+
+    def bumped_recently(self):
+        """Whether a replica might still be missing the write behind the last bump."""
+        try:
+            bumped_at = self.shared.get(f"{self.version_key}:at")
+        except Exception:
+            bumped_at = _local_bumped_at.get(self.namespace)
+        return bumped_at is not None and time.time() - bumped_at < replica_lag()
+
+    def bump_on_commit(self):
+        transaction.on_commit(self.bump)
+
+    def make_key(self, key, version=None):
+        return f"{self.namespace}:v{version or self.version()}:{key}"
+
+    def get(self, key, version=None):
+        full_key = self.make_key(key, version)
+        value = self.local.get(full_key)
+        if value is not None:
+            _count(self.namespace, "local_hits")
+            return value
+        try:
+            value = self.shared.get(full_key)
+        except Exception:
+            _count(self.namespace, "shared_errors")
+            value = None
+        if value is not None:
+            _count(self.namespace, "shared_hits")
+            self.local.set(full_key, value, self.local_timeout)
+            return value
+        _count(self.namespace, "misses")
+        return None
+
+    def set(self, key, value, version=None):
+        full_key = self.make_key(key, version)
+        self.local.set(full_key, value, self.local_timeout)
+        try:
+            self.shared.set(full_key, value, self.timeout)
+        except Exception:
+            _count(self.namespace, "shared_errors")
+
+    def get_or_set(self, key, producer):
+        """Return the cached value for `key`, calling `producer()` on a miss. `None` is never cached."""
+        version = self.version()
+        value = self.get(key, version)
+        if value is None:
+            if self.bumped_recently():
+                # Build from the primary: a lagging replica would cache the old data under the new version.
+                with pin_primary():
+                    value = producer()
+            else:
+                value = producer()
+            if value is not None:
+                # Store under the version read before building, so a bump that
+                # lands while producing leaves this entry unreachable.
+                self.set(key, value, version)
+        return value
+
+
+job_cache = VersionedCache("jobs")
+company_cache = VersionedCache("companies")
+
+
+def request_cache_key(request, prefix):
+    """Key for a list page: host plus the sorted query string."""
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    query = "&".join(f"{key}={value}" for key, value in params)
+    digest = hashlib.sha1(f"{request.get_host()}?{query}".encode()).hexdigest()
+    return f"{prefix}:{digest}"
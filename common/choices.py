@@ -34,3 +34,8 @@ class NotificationType(models.TextChoices):
     SYSTEM = "SYSTEM", "System"
     APPLICATION = "APPLICATION", "Application"
     JOB = "JOB", "Job"
+
+class ExtractionStatus(models.TextChoices):
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+    UNSUPPORTED = "UNSUPPORTED", "Unsupported"
@@ -0,0 +1,54 @@
+"""
+Conditional GET (ETag / Last-Modified) for detail endpoints.
+
+The validator comes from a single `updated_at` lookup, so a client holding
+the current version gets `304 Not Modified` without the object being loaded
+or serialized.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def updated_at_of(queryset):
+    return queryset.values_list("updated_at", flat=True).first()
+
+
+def make_etag(updated_at, request):
+    # The query string is part of the representation (e.g. field selection).
+    query = "&".join(sorted(request.GET.urlencode().split("&")))
+    digest = hashlib.md5(f"{updated_at.isoformat()}?{query}".encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def conditional_on_updated_at(stamp):
+    """
+    Decorate an APIView `get` handler. `stamp(request, *args, **kwargs)`
+    returns the object's `updated_at`, or None to fall through to the handler
+    (which then produces its usual 404).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            updated_at = stamp(request, *args, **kwargs)
+            if updated_at is None:
+                return method(view, request, *args, **kwargs)
+
+            etag = make_etag(updated_at, request)
+            last_modified = timegm(updated_at.utctimetuple())
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            else:
+                response = not_modified
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
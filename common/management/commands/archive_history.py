@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.archive import ARCHIVES
+
+
+class Command(BaseCommand):
+    help = "Move application events and audit log rows older than ARCHIVE_AFTER_DAYS into compressed segments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--history", action="append", choices=sorted(ARCHIVES),
+                            help="History to archive; repeat for several (default: all).")
+        parser.add_argument("--days", type=int, help="Archive rows older than this many days.")
+        parser.add_argument("--batch-size", type=int, help="Rows per segment (default ARCHIVE_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"]) if options["days"] is not None else None
+        for name in options["history"] or sorted(ARCHIVES):
+            moved = ARCHIVES[name].archive(before, options["batch_size"])
+            self.stdout.write(f"Archived {moved:,} {name.replace('_', ' ')} rows.")
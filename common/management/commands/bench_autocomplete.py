@@ -0,0 +1,72 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from common.autocomplete import AUTOCOMPLETE
+from companies.models import Company
+
+WORDS = "acme global north star blue river data soft systems labs cloud prime urban green bright nova".split()
+
+
+class Command(BaseCommand):
+    help = "Measure per-keystroke autocomplete latency from the in-memory index and from the database fallback."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=sorted(AUTOCOMPLETE), default="companies")
+        parser.add_argument("--names", type=int, default=100000, help="Company names needed for --source companies.")
+        parser.add_argument("--queries", type=int, default=2000, help="Keystrokes to time on each path.")
+        parser.add_argument("--seed", action="store_true", help="Insert synthetic companies until there are enough.")
+
+    def handle(self, *args, **options):
+        autocomplete = AUTOCOMPLETE[options["source"]]
+        if options["source"] == "companies":
+            have = Company.objects.count()
+            if have < options["names"]:
+                if not options["seed"]:
+                    raise CommandError(f"Only {have} companies; re-run with --seed to add more.")
+                self.seed(options["names"] - have, offset=have)
+
+        started = time.perf_counter()
+        autocomplete.reset_index()
+        autocomplete.refresh(wait=True)
+        index = autocomplete.get_loaded_index()
+        self.stdout.write(f"Built an index of {len(index):,} names in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        if not len(index):
+            raise CommandError("Nothing to complete.")
+
+        # Every prefix of sampled names, as a user would type them.
+        prefixes = []
+        while len(prefixes) < options["queries"]:
+            name = random.choice(index.entries)[1]
+            prefixes.extend(name[:n] for n in range(1, min(len(name), 12) + 1))
+        prefixes = prefixes[:options["queries"]]
+
+        mismatched = sum(index.complete(p) != autocomplete.fallback(p) for p in prefixes[:200])
+        if mismatched:
+            raise CommandError(f"{mismatched} of 200 prefixes complete differently from the database.")
+        self.stdout.write(self.style.SUCCESS("The index matches the database on 200 prefixes."))
+
+        self.stdout.write(f"{'path':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for label, complete in (("index", index.complete), ("database", autocomplete.fallback)):
+            timings = []
+            for prefix in prefixes:
+                started = time.perf_counter()
+                complete(prefix)
+                timings.append((time.perf_counter() - started) * 1000)
+            p99 = statistics.quantiles(timings, n=100)[98]
+            self.stdout.write(f"{label:>9} {statistics.median(timings):>8.3f} {p99:>8.3f} {max(timings):>8.3f}")
+
+    def seed(self, count, offset=0, batch_size=5000):
+        owner, _ = User.objects.get_or_create(email="bench-owner@example.com")
+        for first in range(offset, offset + count, batch_size):
+            Company.objects.bulk_create(
+                Company(
+                    owner=owner,
+                    name=f"{random.choice(WORDS).title()} {random.choice(WORDS).title()} {i}",
+                    slug=f"bench-autocomplete-{i}",
+                )
+                for i in range(first, min(first + batch_size, offset + count))
+            )
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from common.storage import collect_blobs
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed files that no record has referenced for the grace period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace", type=int, help="Seconds unreferenced before deletion (default CAS_GRACE_SECONDS).")
+
+    def handle(self, *args, **options):
+        grace = timedelta(seconds=options["grace"]) if options["grace"] is not None else None
+        self.stdout.write(f"Removed {collect_blobs(grace):,} unreferenced files.")
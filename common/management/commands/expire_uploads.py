@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from common.uploads import expire_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished resumable uploads and their part files after UPLOAD_SESSION_MAX_AGE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-age", type=int, help="Seconds idle before an upload expires.")
+
+    def handle(self, *args, **options):
+        max_age = timedelta(seconds=options["max_age"]) if options["max_age"] is not None else None
+        self.stdout.write(f"Expired {expire_sessions(max_age):,} unfinished uploads.")
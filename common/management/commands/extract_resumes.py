@@ -0,0 +1,60 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from common.exports import chunked
+from common.resumes import parse, pending, read_blob, store
+
+
+class Command(BaseCommand):
+    help = "Parse stored resumes that have no text yet in a pool of processes, and report throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parsing processes.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Files read and saved together.")
+        parser.add_argument("--retry", action="store_true", help="Parse failed and unsupported files again.")
+        parser.add_argument("--limit", type=int, help="Stop after this many files.")
+
+    def handle(self, *args, **options):
+        blobs = pending(options["retry"]).order_by("created_at").only("sha256", "name", "size")
+        if options["limit"]:
+            blobs = blobs[:options["limit"]]
+        blobs = list(blobs)
+        if not blobs:
+            self.stdout.write("Nothing to extract.")
+            return
+
+        # The pool only parses bytes; reading files and saving text stay in this process.
+        connections.close_all()
+        files = size = parse_ms = 0
+        statuses = {}
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            for batch in chunked(blobs, options["batch_size"]):
+                data = []
+                for blob in batch:
+                    try:
+                        data.append((blob, read_blob(blob)))
+                    except FileNotFoundError:
+                        continue
+                results = pool.map(parse, [raw for _, raw in data],
+                                   [os.path.splitext(blob.name)[1] for blob, _ in data])
+                parsed = [(blob.sha256, blob.size, result) for (blob, _), result in zip(data, results)]
+                store(parsed)
+                for _, blob_size, result in parsed:
+                    files += 1
+                    size += blob_size
+                    parse_ms += result["duration_ms"]
+                    statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+                self.stdout.write(f"{files:,} / {len(blobs):,} files")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(", ".join(f"{count:,} {name.lower()}" for name, count in sorted(statuses.items())))
+        self.stdout.write(
+            f"{files:,} files, {size / 2**20:.1f} MB in {elapsed:.1f} s with {options['workers']} workers: "
+            f"{files / elapsed:.1f} files/s, {size / 2**20 / elapsed:.2f} MB/s; "
+            f"{parse_ms / 1000:.1f} CPU s parsing, {parse_ms / 1000 / elapsed:.1f} cores busy on average."
+        )
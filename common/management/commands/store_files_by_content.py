@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import Application
+from common.storage import ContentAddressedStorage
+from profiles.models import Profile
+
+FIELDS = [(Profile, "resume"), (Application, "resume_snapshot")]
+
+
+class Command(BaseCommand):
+    help = "Move resumes stored before content addressing into the store, keeping one copy per unique file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-originals", action="store_true", help="Do not delete the old files.")
+
+    def handle(self, *args, **options):
+        for model, field_name in FIELDS:
+            storage = model._meta.get_field(field_name).storage
+            if not isinstance(storage, ContentAddressedStorage):
+                continue
+            moved = missing = 0
+            renamed = {}
+            legacy = (
+                model.objects.exclude(**{f"{field_name}__startswith": f"{storage.prefix}/"})
+                .exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+                .values_list("pk", field_name)
+            )
+            for pk, old_name in legacy.iterator(chunk_size=500):
+                new_name = renamed.get(old_name)
+                if new_name is None:
+                    if not storage.exists(old_name):
+                        missing += 1
+                        continue
+                    with storage.open(old_name) as fh:
+                        new_name = renamed[old_name] = storage.save(old_name, fh)
+                    if not options["keep_originals"]:
+                        storage.delete(old_name)
+                # update() skips the save signals, so take the reference here.
+                model.objects.filter(pk=pk).update(**{field_name: new_name})
+                storage.retain(new_name)
+                moved += 1
+            self.stdout.write(f"{model.__name__}.{field_name}: moved {moved:,}, {missing:,} files missing.")
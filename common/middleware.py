@@ -0,0 +1,64 @@
+import logging
+
+from django.conf import settings
+
+from common.queries import record_view, track_queries, view_label, view_query_budget
+from common.routers import note_write, read_from_replica, replicas, wrote_recently
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCountMiddleware:
+    """
+    Count the queries each request runs and report them in `X-Query-Count`,
+    `X-Query-Repeats` and a `Server-Timing: db` header. Requests that repeat
+    one query shape `QUERY_REPEAT_THRESHOLD` times, or that exceed their view's
+    `query_budget`, are logged. Per-view totals are kept for `/api/queries/stats/`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, "QUERY_REPEAT_THRESHOLD", 10)
+
+    def __call__(self, request):
+        with track_queries() as stats:
+            response = self.get_response(request)
+
+        response["X-Query-Count"] = str(stats.count)
+        response["X-Query-Repeats"] = str(stats.max_repeats)
+        response["Server-Timing"] = f'db;dur={stats.duration_ms};desc="{stats.count} queries"'
+        response["X-Query-Aliases"] = ",".join(f"{alias}={n}" for alias, n in sorted(stats.aliases.items()))
+
+        label = view_label(request)
+        if label is None:
+            return response
+        match = request.resolver_match
+        budget = view_query_budget(getattr(match.func, "view_class", None), request.method)
+        over_budget = budget is not None and stats.count > budget
+        n_plus_one = stats.max_repeats >= self.repeat_threshold
+        if over_budget:
+            logger.warning("%s ran %d queries (budget %d)\n%s", label, stats.count, budget, stats.report())
+        elif n_plus_one:
+            logger.warning("%s repeated a query %d times\n%s", label, stats.max_repeats, stats.report())
+        record_view(label, stats, over_budget=over_budget, n_plus_one=n_plus_one)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from the replicas (see common/routers.py), unless
+    the client wrote within the last `REPLICA_LAG_SECONDS`.
+    """
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+        safe = request.method in self.safe_methods
+        with read_from_replica(safe and not wrote_recently(request)):
+            response = self.get_response(request)
+        if not safe and response.status_code < 400:
+            note_write(request)
+        return response
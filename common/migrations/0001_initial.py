@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Path of the file in its storage.', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0, help_text='Model fields pointing at the file; unreferenced files are removed by collect_blobs.')),
+            ],
+            options={
+                'verbose_name': 'stored blob',
+                'verbose_name_plural': 'stored blobs',
+                'indexes': [models.Index(fields=['refcount', 'updated_at'], name='blob_refcount_updated_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:45
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('target', models.CharField(help_text='Where the finished file goes; a key of UPLOAD_TARGETS.', max_length=20)),
+                ('target_id', models.CharField(blank=True, help_text='Record to attach to, when the target needs one.', max_length=64)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField(help_text='Declared file size in bytes.')),
+                ('received', models.PositiveBigIntegerField(default=0, help_text="Bytes written so far; the next chunk's offset.")),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('stored_name', models.CharField(blank=True, max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'upload session',
+                'verbose_name_plural': 'upload sessions',
+                'indexes': [models.Index(fields=['completed_at', 'updated_at'], name='upload_completed_updated_idx')],
+            },
+        ),
+    ]
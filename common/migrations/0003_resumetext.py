@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:08
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeText',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('DONE', 'Done'), ('FAILED', 'Failed'), ('UNSUPPORTED', 'Unsupported')], max_length=20)),
+                ('content', models.BinaryField(default=b'', help_text='zlib-compressed UTF-8 text; read it through `text`.')),
+                ('chars', models.PositiveIntegerField(default=0, help_text='Length of the extracted text.')),
+                ('pages', models.PositiveIntegerField(blank=True, null=True)),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Size of the parsed file in bytes.')),
+                ('duration_ms', models.PositiveIntegerField(default=0, help_text='CPU time spent parsing the file.')),
+                ('error', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'resume text',
+                'verbose_name_plural': 'resume texts',
+                'indexes': [models.Index(fields=['updated_at'], name='resumetext_updated_idx')],
+            },
+        ),
+    ]
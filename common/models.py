@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.db import models
 import uuid
+import zlib
+
+from common.choices import ExtractionStatus
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, db_index=True,
@@ -28,3 +32,69 @@ class Activatable(models.Model):
         verbose_name="active?", help_text="Soft-active flag for the record.")
     class Meta:
         abstract = True
+
+
+class StoredBlob(UUIDModel, TimeStampedModel):
+    """One file in the content-addressed store (see common/storage.py), shared by every record that uploaded it."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True, help_text="Path of the file in its storage.")
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(
+        default=0,
+        help_text="Model fields pointing at the file; unreferenced files are removed by collect_blobs.")
+
+    class Meta:
+        verbose_name = "stored blob"
+        verbose_name_plural = "stored blobs"
+        indexes = [models.Index(fields=["refcount", "updated_at"], name="blob_refcount_updated_idx")]
+
+    def __str__(self):
+        return self.name
+
+
+class ResumeText(UUIDModel, TimeStampedModel):
+    """
+    Plain text of one stored resume (see common/resumes.py). Keyed by content
+    hash rather than tied to the StoredBlob, so a file collected and uploaded
+    again is not parsed twice.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=ExtractionStatus.choices)
+    content = models.BinaryField(default=b"", help_text="zlib-compressed UTF-8 text; read it through `text`.")
+    chars = models.PositiveIntegerField(default=0, help_text="Length of the extracted text.")
+    pages = models.PositiveIntegerField(null=True, blank=True)
+    size = models.PositiveBigIntegerField(default=0, help_text="Size of the parsed file in bytes.")
+    duration_ms = models.PositiveIntegerField(default=0, help_text="CPU time spent parsing the file.")
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = "resume text"
+        verbose_name_plural = "resume texts"
+        indexes = [models.Index(fields=["updated_at"], name="resumetext_updated_idx")]
+
+    def __str__(self):
+        return self.sha256
+
+    @property
+    def text(self):
+        return zlib.decompress(self.content).decode() if self.content else ""
+
+
+class UploadSession(UUIDModel, TimeStampedModel):
+    """A resumable upload of one file, received in chunks (see common/uploads.py)."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions")
+    target = models.CharField(max_length=20, help_text="Where the finished file goes; a key of UPLOAD_TARGETS.")
+    target_id = models.CharField(max_length=64, blank=True, help_text="Record to attach to, when the target needs one.")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Declared file size in bytes.")
+    received = models.PositiveBigIntegerField(default=0, help_text="Bytes written so far; the next chunk's offset.")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    stored_name = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = "upload session"
+        verbose_name_plural = "upload sessions"
+        indexes = [models.Index(fields=["completed_at", "updated_at"], name="upload_completed_updated_idx")]
@@ -0,0 +1,124 @@
+"""
+Cheap query accounting for requests and tests.
+
+`track_queries()` installs an execute wrapper on every database connection
+and records the number of queries, the time spent in the database, the
+queries per alias and how often each query shape repeats. A shape is the SQL
+Django sends with its placeholders (`IN (%s, %s, ...)` lists are collapsed),
+so the same statement run once per row of a page shows up as one shape with
+a high count: the signature of an N+1. Nothing is captured beyond one
+counter per shape, which keeps it cheap enough to leave on in production.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+_view_stats = defaultdict(Counter)
+_view_stats_lock = threading.Lock()
+
+
+def query_shape(sql):
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.aliases = Counter()
+        self.shapes = Counter()
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+    def repeated(self, threshold=2):
+        """`[(shape, count), ...]` for shapes run at least `threshold` times, most repeated first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    @property
+    def max_repeats(self):
+        return max(self.shapes.values(), default=0)
+
+    def wrapper(self, alias):
+        def record(execute, sql, params, many, context):
+            if sql.startswith("EXPLAIN"):
+                # Issued by profilers (silk explains every query it sees), not by the view.
+                return execute(sql, params, many, context)
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.duration += time.perf_counter() - started
+                self.count += 1
+                self.aliases[alias] += 1
+                self.shapes[query_shape(sql)] += 1
+        return record
+
+    def report(self, limit=5):
+        lines = [f"{self.count} queries in {self.duration_ms} ms"]
+        for shape, n in self.repeated()[:limit]:
+            lines.append(f"  {n}x {shape}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def track_queries():
+    """Count the queries run on any connection inside the block."""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats.wrapper(connection.alias)))
+        yield stats
+
+
+def view_label(request):
+    """`"GET app.views.SomeView"` for the view that served `request`, or None if it did not resolve."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    func = getattr(match.func, "view_class", match.func)
+    return f"{request.method} {func.__module__}.{func.__qualname__}"
+
+
+def view_query_budget(view_class, method):
+    """A view declares `query_budget = 5` or `query_budget = {"GET": 5, ...}`."""
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget
+
+
+def record_view(label, stats, over_budget=False, n_plus_one=False):
+    with _view_stats_lock:
+        counter = _view_stats[label]
+        counter["requests"] += 1
+        counter["queries"] += stats.count
+        counter["db_ms"] += stats.duration * 1000
+        counter["max_queries"] = max(counter["max_queries"], stats.count)
+        counter["over_budget"] += over_budget
+        counter["n_plus_one"] += n_plus_one
+        for alias, n in stats.aliases.items():
+            counter[f"queries:{alias}"] += n
+
+
+def query_stats():
+    """Per-view counters for this process, with per-request averages."""
+    with _view_stats_lock:
+        snapshot = {label: dict(counter) for label, counter in _view_stats.items()}
+    for counter in snapshot.values():
+        counter["db_ms"] = round(counter["db_ms"], 2)
+        counter["avg_queries"] = round(counter["queries"] / counter["requests"], 2)
+        counter["avg_db_ms"] = round(counter["db_ms"] / counter["requests"], 2)
+    return snapshot
+
+
+def reset_query_stats():
+    with _view_stats_lock:
+        _view_stats.clear()
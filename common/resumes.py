@@ -0,0 +1,208 @@
+"""
+Plain text from uploaded resumes.
+
+Every new file in the content-addressed store (a new StoredBlob, so content
+not seen before) queues `extract_resume_text` after commit. The task is
+routed to the "extraction" queue, whose worker runs a prefork pool sized for
+CPU-bound parsing (see docker-compose.yml), so parsing never runs on the
+request path or holds up the default queue. The text is kept zlib-compressed
+in ResumeText under the file's SHA-256, and content already parsed is
+skipped. Files that cannot be parsed are recorded as failed or unsupported;
+`extract_resumes --retry` tries them again.
+"""
+import io
+import os
+import re
+import time
+import zipfile
+import zlib
+from datetime import timedelta
+from xml.etree import ElementTree
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from .choices import ExtractionStatus
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_SPACES = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Longest error message kept; ResumeText.error is a CharField(255).
+_MAX_ERROR = 255
+# Uncompressed size allowed for a DOCX body. Uploads are capped at 5 MB, but a
+# crafted zip can inflate that to gigabytes in the worker.
+MAX_DOCX_XML_BYTES = 50 * 2**20
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+def _pdf_text(data):
+    import pypdf  # only the extraction workers pay for the import
+
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages), len(reader.pages)
+
+
+def _docx_text(data):
+    limit = MAX_DOCX_XML_BYTES
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        if archive.getinfo("word/document.xml").file_size > limit:
+            raise ValueError(f"word/document.xml is over {limit // 2**20} MB uncompressed")
+        # The declared size can lie; never inflate more than the limit.
+        with archive.open("word/document.xml") as member:
+            xml = member.read(limit + 1)
+        if len(xml) > limit:
+            raise ValueError(f"word/document.xml is over {limit // 2**20} MB uncompressed")
+    paragraphs = []
+    for paragraph in ElementTree.fromstring(xml).iter(f"{_W}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_W}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{_W}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_W}br", f"{_W}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs), None
+
+
+PARSERS = {".pdf": _pdf_text, ".docx": _docx_text}
+
+
+def normalize(text):
+    text = _SPACES.sub(" ", text.replace("\x00", ""))
+    return _BLANK_LINES.sub("\n\n", "\n".join(line.strip() for line in text.splitlines())).strip()
+
+
+def parse(data, ext):
+    """
+    Parse one file's bytes into a result dict. Touches neither the database
+    nor storage, so it can run in any worker process.
+    """
+    # CPU time, so the figure means the same however many processes share the cores.
+    started = time.process_time()
+    result = {"status": ExtractionStatus.DONE.value, "text": "", "pages": None, "error": ""}
+    parser = PARSERS.get(ext.lower())
+    try:
+        if parser is None:
+            raise UnsupportedFormat(f"No parser for '{ext or 'no extension'}' files")
+        text, result["pages"] = parser(data)
+        result["text"] = normalize(text)
+    except UnsupportedFormat as exc:
+        result.update(status=ExtractionStatus.UNSUPPORTED.value, error=str(exc)[:_MAX_ERROR])
+    except Exception as exc:  # a corrupt upload must not fail the batch
+        result.update(status=ExtractionStatus.FAILED.value, error=f"{type(exc).__name__}: {exc}"[:_MAX_ERROR])
+    result["duration_ms"] = round((time.process_time() - started) * 1000)
+    return result
+
+
+def store(parsed):
+    """Save `(sha256, size, result)` triples, replacing earlier attempts at the same content."""
+    from .models import ResumeText
+
+    rows = {
+        sha256: ResumeText(
+            sha256=sha256,
+            status=result["status"],
+            content=zlib.compress(result["text"].encode()) if result["text"] else b"",
+            chars=len(result["text"]),
+            pages=result["pages"],
+            size=size,
+            duration_ms=result["duration_ms"],
+            error=result["error"],
+        )
+        for sha256, size, result in parsed
+    }
+    # New content is inserted in one statement; only re-extractions (--retry) update rows in place.
+    now = timezone.now()
+    with transaction.atomic():
+        for sha256 in ResumeText.objects.filter(sha256__in=rows).values_list("sha256", flat=True):
+            row = rows.pop(sha256)
+            ResumeText.objects.filter(sha256=sha256).update(
+                status=row.status, content=row.content, chars=row.chars, pages=row.pages,
+                size=row.size, duration_ms=row.duration_ms, error=row.error, updated_at=now,
+            )
+        ResumeText.objects.bulk_create(rows.values(), ignore_conflicts=True)
+
+
+def pending(retry=False):
+    """Stored files without text yet; with `retry`, also those that failed or were unsupported."""
+    from .models import ResumeText, StoredBlob
+
+    seen = ResumeText.objects.all()
+    if retry:
+        seen = seen.filter(status=ExtractionStatus.DONE)
+    return StoredBlob.objects.exclude(sha256__in=seen.values("sha256"))
+
+
+def read_blob(blob):
+    from .storage import resume_storage
+
+    with resume_storage().open(blob.name, "rb") as fh:
+        return fh.read()
+
+
+def extract_blobs(blob_ids, retry=False):
+    """Parse the given stored files in this process; returns how many were parsed."""
+    parsed = []
+    for blob in pending(retry).filter(pk__in=blob_ids).only("sha256", "name", "size"):
+        try:
+            data = read_blob(blob)
+        except FileNotFoundError:
+            continue  # collected before we got to it
+        parsed.append((blob.sha256, blob.size, parse(data, os.path.splitext(blob.name)[1])))
+    store(parsed)
+    return len(parsed)
+
+
+def queue_extraction(blob_ids):
+    from .tasks import extract_resume_text
+
+    blob_ids = [str(pk) for pk in blob_ids]
+    # robust: a broker outage must not fail the upload; extract_resumes picks the files up later.
+    transaction.on_commit(lambda: extract_resume_text.delay(blob_ids), robust=True)
+
+
+def texts_for(names):
+    """`{file name: text}` for content-addressed file names that have been parsed."""
+    from .models import ResumeText
+
+    by_hash = {os.path.splitext(os.path.basename(name))[0]: name for name in names if name}
+    rows = ResumeText.objects.filter(sha256__in=by_hash, status=ExtractionStatus.DONE)
+    return {by_hash[row.sha256]: row.text for row in rows.only("sha256", "content")}
+
+
+def extraction_stats(window=timedelta(hours=1)):
+    """Totals per status, the backlog, and throughput over the last `window`."""
+    from .models import ResumeText
+
+    totals = {
+        row["status"]: {"files": row["files"], "bytes": row["bytes"] or 0, "chars": row["chars"] or 0}
+        for row in ResumeText.objects.values("status").annotate(
+            files=Count("pk"), bytes=Sum("size"), chars=Sum("chars")
+        ).order_by()
+    }
+    recent = ResumeText.objects.filter(updated_at__gte=timezone.now() - window).aggregate(
+        files=Count("pk"), bytes=Sum("size"), parse_ms=Sum("duration_ms"),
+        mean_ms=Avg("duration_ms"), max_ms=Max("duration_ms"),
+    )
+    seconds = window.total_seconds()
+    parse_seconds = (recent["parse_ms"] or 0) / 1000
+    return {
+        "totals": totals,
+        "pending": pending().count(),
+        "window_seconds": int(seconds),
+        "recent": {
+            "files": recent["files"],
+            "bytes": recent["bytes"] or 0,
+            "files_per_minute": round(recent["files"] / seconds * 60, 2),
+            # What one core gets through per second of CPU time.
+            "files_per_cpu_second": round(recent["files"] / parse_seconds, 2) if parse_seconds else None,
+            "mean_parse_ms": round(recent["mean_ms"], 1) if recent["mean_ms"] is not None else None,
+            "max_parse_ms": recent["max_ms"],
+        },
+    }
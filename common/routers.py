@@ -0,0 +1,110 @@
+"""
+Primary / replica database routing.
+
+Writes always go to `default`. Reads of models in `REPLICA_READ_APPS` go to
+one of `DATABASE_REPLICAS`, but only inside a request that
+`ReplicaRoutingMiddleware` marked safe: a GET/HEAD/OPTIONS from a client that
+has not written within the last `REPLICA_LAG_SECONDS`. Everything else
+(writes, auth, audit log, Celery tasks, management commands) reads from the
+primary, so a client always sees its own writes.
+"""
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+PRIMARY = "default"
+
+_state = threading.local()
+
+
+def replicas():
+    return [alias for alias in getattr(settings, "DATABASE_REPLICAS", ()) if alias in settings.DATABASES]
+
+
+def replica_lag():
+    return getattr(settings, "REPLICA_LAG_SECONDS", 5)
+
+
+def replica_reads_allowed():
+    return getattr(_state, "replica_ok", False) and not getattr(_state, "pinned", 0)
+
+
+@contextmanager
+def read_from_replica(allowed=True):
+    previous = getattr(_state, "replica_ok", False)
+    _state.replica_ok = allowed
+    try:
+        yield
+    finally:
+        _state.replica_ok = previous
+
+
+@contextmanager
+def pin_primary():
+    """Read from the primary inside the block, whatever the request allows."""
+    _state.pinned = getattr(_state, "pinned", 0) + 1
+    try:
+        yield
+    finally:
+        _state.pinned -= 1
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in getattr(settings, "REPLICA_READ_APPS", ()):
+            return PRIMARY
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db == PRIMARY:
+            # Related objects of a row read from the primary stay on the primary.
+            return PRIMARY
+        aliases = replicas()
+        if not aliases or not replica_reads_allowed():
+            return PRIMARY
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary and get its schema by replication.
+        return db not in replicas()
+
+
+# -- read your writes ---------------------------------------------------------
+
+def client_key(request):
+    """Identify the client across workers: its credentials, else its session, else its address."""
+    credential = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or f"{request.META.get('REMOTE_ADDR')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    )
+    return "lastwrite:" + hashlib.sha1(credential.encode()).hexdigest()
+
+
+def _cache_call(method, *args):
+    # The shared tier lets every worker see a client's writes; fall back to this process.
+    try:
+        return getattr(caches["shared"], method)(*args)
+    except Exception:
+        return getattr(caches["default"], method)(*args)
+
+
+def note_write(request):
+    _cache_call("set", client_key(request), time.time(), replica_lag())
+
+
+def wrote_recently(request):
+    written_at = _cache_call("get", client_key(request))
+    return written_at is not None and time.time() - written_at < replica_lag()
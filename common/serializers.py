@@ -0,0 +1,136 @@
+"""
+Serializers shared across apps.
+
+Sparse fieldsets: `?fields=id,title,city` keeps only the named fields and `?expand=company`
+swaps a related id for the nested object. Serializers opt in with
+`SparseFieldsetMixin` and list what can be expanded in `expandable_fields`.
+Views pass the request's selection to the serializer and to
+`optimize_queryset()`, so columns, joins and prefetches that the payload
+does not use are never loaded.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from drf_yasg import openapi
+from rest_framework import serializers
+
+from .uploads import UPLOAD_TARGETS
+
+
+def _split(raw):
+    return [name.strip() for part in raw for name in part.split(",") if name.strip()]
+
+
+def sparse_fieldset(request):
+    """`(fields, expand)` from the query string; `fields` is None when every field is wanted."""
+    params = request.query_params if hasattr(request, "query_params") else request.GET
+    fields = _split(params.getlist("fields")) or None
+    expand = _split(params.getlist("expand"))
+    return fields, expand
+
+
+def sparse_cache_key(fields, expand):
+    """Suffix for cache keys that do not already include the query string."""
+    if fields is None and not expand:
+        return ""
+    return f":f={','.join(sorted(fields or ()))}:e={','.join(sorted(expand))}"
+
+
+class SparseFieldsetMixin:
+    # name -> (serializer class or its dotted path, extra kwargs)
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.expanded(expand):
+            serializer_class, options = self.expandable_serializer(name)
+            self.fields[name] = serializer_class(read_only=True, **options)
+        if fields is not None:
+            keep = set(fields)
+            for name in [name for name in self.fields if name not in keep]:
+                self.fields.pop(name)
+
+    @classmethod
+    def expanded(cls, expand):
+        return [name for name in expand or () if name in cls.expandable_fields]
+
+    @classmethod
+    def expandable_serializer(cls, name):
+        serializer_class, options = cls.expandable_fields[name]
+        if isinstance(serializer_class, str):
+            serializer_class = import_string(serializer_class)
+        return serializer_class, dict(options)
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None, keep=()):
+        """
+        Narrow `queryset` to what `cls(fields=..., expand=...)` reads: `only()`
+        the selected columns, `select_related` expanded foreign keys and
+        `prefetch_related` only the selected many-valued relations, including
+        those of expanded objects. `keep` names columns the caller reads
+        itself, such as pagination keys.
+        """
+        lookups = _lookups(cls(fields=fields, expand=expand), queryset.model)
+        if lookups is None:
+            return queryset
+        only, select, prefetch = lookups
+        queryset = queryset.only(*only, *keep)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+def _lookups(serializer, model, prefix=""):
+    """`(only, select_related, prefetch_related)` for a serializer's fields; None if they cannot be told."""
+    only, select, prefetch = {prefix + model._meta.pk.name}, [], []
+    whole = set()
+    for field in serializer.fields.values():
+        source = field.source.split(".")[0]
+        if source == "*":
+            return None
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # A property or method: it may read any column.
+            return None
+        path = prefix + source
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.append(path)
+        elif model_field.is_relation and isinstance(field, serializers.BaseSerializer):
+            # Expanded: the related row is loaded whole, its own relations prefetched.
+            only.add(path)
+            select.append(path)
+            whole.add(path)
+            nested = _lookups(field, model_field.related_model, path + "__")
+            if nested is not None:
+                select.extend(nested[1])
+                prefetch.extend(nested[2])
+        elif model_field.concrete:
+            only.add(path)
+            if model_field.is_relation and "." in field.source:
+                # e.g. source="job.title": join the row instead of loading it per object.
+                select.append(path)
+                attribute = field.source.split(".")
+                if len(attribute) == 2:
+                    only.add(f"{path}__{attribute[1]}")
+                else:
+                    whole.add(path)
+    # Relations loaded whole for one field must not be narrowed by another.
+    only = {name for name in only if not any(name.startswith(f"{loaded}__") for loaded in whole)}
+    return only, select, prefetch
+
+
+SPARSE_FIELDSET_PARAMETERS = [
+    openapi.Parameter("fields", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Comma separated fields to return (default: all)"),
+    openapi.Parameter("expand", openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Comma separated relations to return as nested objects"),
+]
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=list(UPLOAD_TARGETS))
+    application = serializers.UUIDField(required=False)
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
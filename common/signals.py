@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import StoredBlob
+from .resumes import queue_extraction
+
+
+@receiver(post_save, sender=StoredBlob)
+def extract_new_blob(sender, instance, created, raw=False, **kwargs):
+    # A new blob is content the store has not seen; re-uploads reuse the existing row.
+    if created and not raw:
+        queue_extraction([instance.pk])
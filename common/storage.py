@@ -0,0 +1,179 @@
+"""
+Content-addressed file storage.
+
+`ContentAddressedStorage` names every file after the SHA-256 of its bytes
+(`cas/ab/cd/abcd….pdf`). The digest is computed while the upload is copied
+into the store, and a file whose content is already stored is discarded, so
+each unique file is kept once however many times it is uploaded. A
+`StoredBlob` row per file counts the model fields that point at it;
+`track_references` keeps that count current for a model's file fields, and
+`collect_blobs` removes files nobody has referenced for `CAS_GRACE_SECONDS`.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+
+def _link_or_copy(source, path):
+    # Replaces the placeholder at `path`; a copy when the two are on different filesystems.
+    os.remove(path)
+    try:
+        os.link(source, path)
+    except OSError:
+        shutil.copyfile(source, path)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    prefix = "cas"
+
+    def blob_name(self, digest, ext):
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def get_available_name(self, name, max_length=None):
+        # _save picks the name from the content, so there is nothing to make unique.
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        tmp_dir = self.path(f"{self.prefix}/tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        # In the store's own directory, so the final rename is atomic.
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            digest, size = hashlib.sha256(), 0
+            if hasattr(content, "temporary_file_path"):
+                # Already on disk (large uploads, finished chunked uploads): hash, then
+                # link rather than move, so the source survives a save that fails.
+                os.close(fd)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                _link_or_copy(content.temporary_file_path(), tmp_path)
+            else:
+                with os.fdopen(fd, "wb") as fh:
+                    for chunk in content.chunks():
+                        digest.update(chunk)
+                        fh.write(chunk)
+                        size += len(chunk)
+            sha256 = digest.hexdigest()
+            ext = os.path.splitext(name)[1].lower()
+            with transaction.atomic():
+                blob, _ = StoredBlob.objects.select_for_update().get_or_create(
+                    sha256=sha256, defaults={"name": self.blob_name(sha256, ext), "size": size}
+                )
+                path = self.path(blob.name)
+                if os.path.exists(path):
+                    os.remove(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp_path, path)
+                    # mkstemp creates files private to this user.
+                    os.chmod(path, self.file_permissions_mode or 0o644)
+                # Restart the grace period: the uploader has not referenced it yet.
+                StoredBlob.objects.filter(pk=blob.pk).update(updated_at=timezone.now())
+            return blob.name
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, name):
+        # Other records may share the file; collect_blobs removes it once unreferenced.
+        from .models import StoredBlob
+
+        if not StoredBlob.objects.filter(name=name).exists():
+            super().delete(name)
+
+    def retain(self, name):
+        from .models import StoredBlob
+
+        StoredBlob.objects.filter(name=name).update(refcount=F("refcount") + 1, updated_at=timezone.now())
+
+    def release(self, name):
+        from .models import StoredBlob
+
+        StoredBlob.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F("refcount") - 1, updated_at=timezone.now()
+        )
+
+
+def resume_storage():
+    return storages["resumes"]
+
+
+def collect_blobs(grace=None, storage=None):
+    """Delete files no record has referenced for `grace` (default CAS_GRACE_SECONDS). Returns the count."""
+    from .models import StoredBlob
+
+    storage = storage or resume_storage()
+    if grace is None:
+        grace = timedelta(seconds=getattr(settings, "CAS_GRACE_SECONDS", 24 * 60 * 60))
+    cutoff = timezone.now() - grace
+    removed = 0
+    for pk in StoredBlob.objects.filter(refcount=0, updated_at__lt=cutoff).values_list("pk", flat=True):
+        with transaction.atomic():
+            # Re-check under the lock: an upload or a new reference may have revived it.
+            blob = StoredBlob.objects.select_for_update().filter(
+                pk=pk, refcount=0, updated_at__lt=cutoff
+            ).first()
+            if blob is None:
+                continue
+            FileSystemStorage.delete(storage, blob.name)
+            blob.delete()
+            removed += 1
+    return removed
+
+
+def _file_names(instance, field_names):
+    return {name: getattr(instance, name).name or None for name in field_names}
+
+
+def track_references(model, *field_names):
+    """Keep StoredBlob.refcount current for `model`'s content-addressed file fields."""
+    uid = f"cas:{model._meta.label}"
+
+    def remember(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or instance._state.adding:
+            return
+        if update_fields is not None and not set(field_names) & set(update_fields):
+            return
+        row = model._default_manager.filter(pk=instance.pk).values(*field_names).first()
+        instance._stored_files = row or {}
+
+    def update(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        if created:
+            before = {}
+        elif "_stored_files" in instance.__dict__:
+            before = instance.__dict__.pop("_stored_files")
+        else:
+            return
+        for name, current in _file_names(instance, field_names).items():
+            previous = before.get(name) or None
+            if previous == current:
+                continue
+            storage = model._meta.get_field(name).storage
+            if current:
+                storage.retain(current)
+            if previous:
+                storage.release(previous)
+
+    def forget(sender, instance, **kwargs):
+        for name, current in _file_names(instance, field_names).items():
+            if current:
+                model._meta.get_field(name).storage.release(current)
+
+    pre_save.connect(remember, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(update, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(forget, sender=model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task
+def extract_resume_text(blob_ids):
+    """Parse newly stored files into ResumeText; routed to the "extraction" queue (CELERY_TASK_ROUTES)."""
+    from .resumes import extract_blobs
+
+    return extract_blobs(blob_ids)
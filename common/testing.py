@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+
+from common.queries import track_queries, view_query_budget
+
+
+@contextmanager
+def assert_max_queries(budget, label="block"):
+    """Fail if the block runs more than `budget` queries."""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > budget:
+        raise AssertionError(f"{label} exceeded its query budget of {budget}: {stats.report()}")
+
+
+def assert_query_budget(client, method, path, *args, **kwargs):
+    """
+    Make a request with the test `client` and fail if it runs more queries
+    than the `query_budget` declared on the view that served it.
+    """
+    with track_queries() as stats:
+        response = getattr(client, method.lower())(path, *args, **kwargs)
+    view_class = getattr(response.resolver_match.func, "view_class", None)
+    budget = view_query_budget(view_class, method)
+    if budget is None:
+        raise AssertionError(f"{method.upper()} {path} is served by a view without a query_budget")
+    # Prefer the middleware's count: it leaves out other middleware's bookkeeping (e.g. silk).
+    count = int(response.get("X-Query-Count", stats.count))
+    if count > budget:
+        raise AssertionError(
+            f"{method.upper()} {path} ran {count} queries, over its budget of {budget}: {stats.report()}"
+        )
+    return response
@@ -1,3 +1,333 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from applications.models import Application, ApplicationEvent
+from auditlog.models import AuditLog
+from common import resumes, routers, uploads
+from common.archive import ArchivedHistory, ARCHIVES
+from common.autocomplete import AUTOCOMPLETE
+from common.cache import VersionedCache, cache_stats, reset_cache_stats
+from common.choices import ExtractionStatus
+from common.middleware import ReplicaRoutingMiddleware
+from common.models import StoredBlob
+from common.storage import collect_blobs, resume_storage
+from companies.models import Company
+from jobs.models import Job, Skill
+from profiles.models import Profile
+
+
+def docx(*paragraphs):
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "word/document.xml",
+            f'<w:document xmlns:w="{resumes._W[1:-1]}"><w:body>{body}</w:body></w:document>',
+        )
+    return buffer.getvalue()
+
+
+class ResumeParseTests(SimpleTestCase):
+    def test_docx_text(self):
+        result = resumes.parse(docx("Jane Doe", "Python   Django"), ".docx")
+        self.assertEqual(result["status"], ExtractionStatus.DONE)
+        self.assertEqual(result["text"], "Jane Doe\nPython Django")
+
+    def test_oversized_docx_body_fails_without_inflating_it(self):
+        data = docx("x" * 10_000)
+        with mock.patch.object(resumes, "MAX_DOCX_XML_BYTES", 1024):
+            result = resumes.parse(data, ".docx")
+        self.assertEqual(result["status"], ExtractionStatus.FAILED)
+        self.assertIn("uncompressed", result["error"])
+
+    def test_unknown_extension_is_unsupported(self):
+        self.assertEqual(resumes.parse(b"hello", ".txt")["status"], ExtractionStatus.UNSUPPORTED)
+
+
+TWO_TIER_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-local"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-shared"},
+}
+
+
+@override_settings(CACHES=TWO_TIER_CACHES)
+class VersionedCacheTests(TransactionTestCase):
+    def setUp(self):
+        self.cache = VersionedCache("tests")
+        self.cache.local.clear()
+        self.cache.shared.clear()
+        reset_cache_stats()
+
+    def test_bump_on_commit_waits_for_the_commit(self):
+        version = self.cache.version()
+        with transaction.atomic():
+            self.cache.bump_on_commit()
+            self.assertEqual(self.cache.version(), version)
+        self.assertEqual(self.cache.version(), version + 1)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.cache.bump_on_commit()
+            raise RuntimeError("rolled back")
+        self.assertEqual(self.cache.version(), version + 1)
+
+    def test_shared_tier_refills_the_local_one(self):
+        self.cache.set("page", {"n": 1})
+        self.cache.local.clear()  # another worker: nothing cached in this process yet
+        self.assertEqual(self.cache.get("page"), {"n": 1})
+        self.assertEqual(self.cache.get("page"), {"n": 1})
+        stats = cache_stats()["tests"]
+        self.assertEqual((stats["shared_hits"], stats["local_hits"]), (1, 1))
+
+    def test_bump_hides_entries_in_both_tiers(self):
+        self.cache.set("page", {"n": 1})
+        self.cache.bump()
+        self.assertEqual(self.cache.get_or_set("page", lambda: {"n": 2}), {"n": 2})
+
+    def test_rebuild_right_after_a_bump_reads_the_primary(self):
+        def produce():
+            on_replica.append(routers.replica_reads_allowed())
+            return {"n": 1}
+
+        on_replica = []
+        self.cache.bump()
+        with routers.read_from_replica():
+            self.cache.get_or_set("page", produce)
+            with override_settings(REPLICA_LAG_SECONDS=0):  # the replicas have caught up
+                self.cache.get_or_set("other", produce)
+        self.assertEqual(on_replica, [False, True])
+
+    def test_bump_while_producing_leaves_the_entry_unreachable(self):
+        def produce():
+            self.cache.bump()
+            return {"n": 1}
+
+        self.cache.get_or_set("page", produce)
+        self.assertEqual(self.cache.get_or_set("page", lambda: {"n": 2}), {"n": 2})
+
+
+@override_settings(CACHES=TWO_TIER_CACHES, REPLICA_READ_APPS=["jobs", "companies"])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(routers, "replicas", return_value=["replica"]))
+        self.enterContext(mock.patch("common.middleware.replicas", return_value=["replica"]))
+        self.router = routers.PrimaryReplicaRouter()
+
+    def test_only_allowed_reads_of_listed_apps_use_a_replica(self):
+        self.assertEqual(self.router.db_for_read(Job), "default")
+        with routers.read_from_replica():
+            self.assertEqual(self.router.db_for_read(Job), "replica")
+            self.assertEqual(self.router.db_for_read(Application), "default")
+            with routers.pin_primary():
+                self.assertEqual(self.router.db_for_read(Job), "default")
+            job = Job()
+            job._state.db = "default"
+            self.assertEqual(self.router.db_for_read(Company, instance=job), "default")
+        self.assertEqual(self.router.db_for_write(Job), "default")
+
+    def test_a_client_reads_its_own_writes(self):
+        seen = []
+
+        def view(request):
+            seen.append(routers.replica_reads_allowed())
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        alice, bob = {"HTTP_AUTHORIZATION": "Bearer alice"}, {"HTTP_AUTHORIZATION": "Bearer bob"}
+        middleware(factory.get("/api/jobs/", **alice))
+        middleware(factory.post("/api/jobs/", **alice))
+        middleware(factory.get("/api/jobs/", **alice))
+        middleware(factory.get("/api/jobs/", **bob))
+        self.assertEqual(seen, [True, False, False, True])
+        with override_settings(REPLICA_LAG_SECONDS=0):
+            middleware(factory.get("/api/jobs/", **alice))
+        self.assertEqual(seen[-1], True)
+
+
+class StorageTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+
+class ContentAddressedStorageTests(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profiles = [
+            Profile.objects.create(user=User.objects.create_user(email=f"seeker{i}@example.com", password="x"))
+            for i in range(2)
+        ]
+
+    def blob(self, name):
+        return StoredBlob.objects.filter(name=name).first()
+
+    def test_shared_content_is_stored_once_and_collected_when_unreferenced(self):
+        first, second = self.profiles
+        first.resume.save("cv.pdf", ContentFile(b"%PDF-1.4 same"))
+        second.resume.save("resume.pdf", ContentFile(b"%PDF-1.4 same"))
+        shared = first.resume.name
+        self.assertEqual(second.resume.name, shared)
+        self.assertEqual((StoredBlob.objects.count(), self.blob(shared).refcount), (1, 2))
+
+        first.resume.save("cv2.pdf", ContentFile(b"%PDF-1.4 new"))
+        self.assertEqual((self.blob(shared).refcount, self.blob(first.resume.name).refcount), (1, 1))
+        second.delete()
+        self.assertEqual(self.blob(shared).refcount, 0)
+
+        self.assertEqual(collect_blobs(), 0)  # still inside the grace period
+        self.assertEqual(collect_blobs(grace=timedelta(0)), 1)
+        self.assertIsNone(self.blob(shared))
+        self.assertFalse(resume_storage().exists(shared))
+        self.assertTrue(resume_storage().exists(first.resume.name))
+
+    def test_reupload_revives_a_file_awaiting_collection(self):
+        first, second = self.profiles
+        first.resume.save("cv.pdf", ContentFile(b"%PDF-1.4 same"))
+        name = first.resume.name
+        first.delete()
+        second.resume.save("cv.pdf", ContentFile(b"%PDF-1.4 same"))
+        self.assertEqual(collect_blobs(grace=timedelta(0)), 0)
+        self.assertEqual(self.blob(name).refcount, 1)
+        self.assertTrue(resume_storage().exists(name))
+
+
+class ChunkedUploadTests(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email="seeker@example.com", password="x")
+        self.profile = Profile.objects.create(user=self.user)
+        self.data = b"%PDF-1.4 resume body"
+        self.session = uploads.open_session(self.user, "profile", "cv.pdf", len(self.data))
+
+    def send(self, offset, end):
+        return uploads.write_chunk(self.session.pk, self.user, offset, io.BytesIO(self.data[offset:end]))
+
+    def test_last_chunk_can_be_resent_after_attaching_fails(self):
+        self.send(0, 8)
+        with mock.patch.object(Profile, "save", side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                self.send(8, None)
+        blob_name = resume_storage().blob_name(hashlib.sha256(self.data).hexdigest(), ".pdf")
+        self.assertFalse(os.path.exists(resume_storage().path(blob_name)))
+        self.assertTrue(os.path.exists(uploads.part_path(self.session)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            session = self.send(8, None)
+        self.assertIsNotNone(session.completed_at)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.resume.name, blob_name)
+        self.assertEqual(StoredBlob.objects.get(name=blob_name).refcount, 1)
+        with resume_storage().open(blob_name, "rb") as fh:
+            self.assertEqual(fh.read(), self.data)
+        self.assertFalse(os.path.exists(uploads.part_path(self.session)))
+
+
+class ArchivedHistoryTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.enterContext(override_settings(ARCHIVE_ROOT=root.name))
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        job = Job.objects.create(
+            company=Company.objects.create(owner=owner, name="Acme", slug="acme"), title="Backend developer",
+            description="Build APIs.", experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+            application_deadline=(timezone.now() + timedelta(days=30)).date(),
+        )
+        self.application = Application.objects.create(
+            job=job, applicant=User.objects.create_user(email="seeker@example.com", password="x")
+        )
+        now = timezone.now()
+        for days in (300, 250, 200, 1):
+            event = ApplicationEvent.objects.create(application=self.application, event=f"{days} days ago")
+            ApplicationEvent.objects.filter(pk=event.pk).update(created_at=now - timedelta(days=days))
+        self.cutoff = now - timedelta(days=180)
+
+    def history(self):
+        # A fresh instance, as a new process would load the indexes.
+        archive = ARCHIVES["application_events"]
+        return ArchivedHistory(archive.name, archive.model_label, archive.fields, archive.key_fields,
+                               archive.time_field).history(self.application.pk)
+
+    def test_archived_rows_read_back_with_the_live_ones(self):
+        before = self.history()
+        self.assertEqual(ARCHIVES["application_events"].archive(self.cutoff, batch_size=2), 3)
+        self.assertEqual(ApplicationEvent.objects.count(), 1)
+        self.assertEqual(len(ARCHIVES["application_events"].indexes()), 2)
+        after = self.history()
+        self.assertEqual([row["event"] for row in after],
+                         ["300 days ago", "250 days ago", "200 days ago", "1 days ago"])
+        self.assertEqual(after, before)
+
+    def test_crash_before_the_delete_does_not_duplicate_rows(self):
+        with mock.patch("django.db.models.query.QuerySet._raw_delete", side_effect=RuntimeError("killed")):
+            with self.assertRaises(RuntimeError):
+                ARCHIVES["application_events"].archive(self.cutoff)
+        self.assertEqual(ApplicationEvent.objects.count(), 4)
+        self.assertEqual(len(self.history()), 4)
+        # The next run archives the same rows again; readers still see each once.
+        ARCHIVES["application_events"].archive(self.cutoff)
+        self.assertEqual(len(ARCHIVES["application_events"].indexes()), 2)
+        self.assertEqual([row["event"] for row in self.history()],
+                         ["300 days ago", "250 days ago", "200 days ago", "1 days ago"])
+
+    def test_audit_log_is_keyed_by_object(self):
+        old = timezone.now() - timedelta(days=365)
+        for object_id in ("a", "b"):
+            AuditLog.objects.create(action="UPDATE", model_name="Job", object_id=object_id, timestamp=old)
+        ARCHIVES["audit_log"].archive(self.cutoff)
+        self.assertFalse(AuditLog.objects.exists())
+        self.assertEqual([row["object_id"] for row in ARCHIVES["audit_log"].history("Job", "a")], ["a"])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.skills = AUTOCOMPLETE["skills"]
+        self.skills.reset_index()
+        self.addCleanup(self.skills.reset_index)
+        for name in ("Python", "pandas", "PyTorch", "Java"):
+            Skill.objects.create(name=name)
+
+    def names(self, matches):
+        return [match["name"] for match in matches]
+
+    def test_index_and_database_fallback_agree(self):
+        self.assertEqual(self.names(self.skills.fallback(" PY")), ["Python", "PyTorch"])
+        self.skills.refresh(wait=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(self.skills.complete(" PY")), ["Python", "PyTorch"])
+        self.assertEqual(self.names(self.skills.complete("p", limit=2)), ["pandas", "Python"])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.skills.refresh(wait=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            skill = Skill.objects.create(name="Pyramid")
+        self.assertEqual(self.names(self.skills.complete("pyr")), ["Pyramid"])
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.name = "Flask"
+            skill.save()
+        self.assertEqual(self.names(self.skills.complete("pyr")), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.delete()
+        self.assertEqual(self.names(self.skills.complete("fl")), [])
+
+    def test_endpoint(self):
+        self.skills.refresh(wait=True)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="seeker@example.com", password="x"))
+        response = client.get(reverse("skill-autocomplete"), {"q": "ja"})
+        self.assertEqual(self.names(response.data["results"]), ["Java"])
+        self.assertEqual(client.get(reverse("skill-autocomplete")).status_code, 400)
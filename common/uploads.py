@@ -0,0 +1,206 @@
+"""
+Chunked, resumable uploads.
+
+A client opens an `UploadSession` with the file's name and size, then sends
+the bytes in order as raw request bodies, each tagged with its offset. A
+chunk is streamed straight into a part file next to the content-addressed
+store and checked while it arrives: it may not run past the declared size,
+and the first bytes must match the file type the extension claims. After a
+dropped connection the client asks for the session's offset and carries on
+from there. When the last byte lands, the part file is hashed, linked
+into the store (not copied) and attached to the target record, so the file
+is never held in memory. The part file itself is removed once that commits;
+if attaching fails it is kept, and resending the last chunk tries again.
+"""
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+# target -> (model, file field); target_record() finds the record for a session.
+UPLOAD_TARGETS = {
+    "profile": ("profiles.Profile", "resume"),
+    "application": ("applications.Application", "resume_snapshot"),
+}
+
+# Leading bytes of the accepted resume formats.
+FILE_SIGNATURES = {
+    "pdf": (b"%PDF",),
+    "docx": (b"PK\x03\x04",),
+}
+
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def chunk_size():
+    return getattr(settings, "UPLOAD_CHUNK_SIZE", 256 * 1024)
+
+
+def target_field(target):
+    model_label, field_name = UPLOAD_TARGETS[target]
+    model = apps.get_model(model_label)
+    return model, model._meta.get_field(field_name)
+
+
+def target_record(session):
+    """The record the finished file attaches to, if `session.user` may write it."""
+    model, _ = target_field(session.target)
+    if session.target == "profile":
+        return model.objects.filter(user_id=session.user_id).first()
+    return model.objects.filter(pk=session.target_id, applicant_id=session.user_id).first()
+
+
+def part_path(session):
+    _, field = target_field(session.target)
+    return field.storage.path(f"uploads/{session.pk}.part")
+
+
+def open_session(user, target, filename, size, target_id=""):
+    """Validate the declared file against the target field's validators and start a session."""
+    from .models import UploadSession
+
+    if target not in UPLOAD_TARGETS:
+        raise UploadError(f"target must be one of {', '.join(UPLOAD_TARGETS)}")
+    if size <= 0:
+        raise UploadError("size must be positive")
+    _, field = target_field(target)
+    # The validators only read .name and .size, so they can run before any data is sent.
+    try:
+        for validator in field.validators:
+            validator(SimpleNamespace(name=filename, size=size))
+    except ValidationError as exc:
+        raise UploadError(" ".join(exc.messages))
+
+    session = UploadSession(user=user, target=target, target_id=str(target_id or ""), filename=filename, size=size)
+    if target_record(session) is None:
+        raise UploadError(f"No {target} to attach the file to", status=404)
+    session.save()
+    os.makedirs(os.path.dirname(part_path(session)), exist_ok=True)
+    open(part_path(session), "wb").close()
+    return session
+
+
+def check_signature(session, head):
+    ext = os.path.splitext(session.filename)[1].lower().lstrip(".")
+    signatures = FILE_SIGNATURES.get(ext)
+    if signatures and not any(head.startswith(sig[:len(head)]) for sig in signatures):
+        raise UploadError(f"File content does not look like a .{ext} file")
+
+
+def write_chunk(session_id, user, offset, stream):
+    """
+    Append the bytes of `stream` at `offset`; returns the session. The chunk
+    is read and written in READ_SIZE pieces and rejected as soon as it would
+    run past the declared size, so an oversized body is never buffered.
+    """
+    from .models import UploadSession
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().filter(pk=session_id, user=user).first()
+        if session is None:
+            raise UploadError("Upload not found", status=404)
+        if session.completed_at:
+            raise UploadError("Upload already complete", status=409, offset=session.received)
+        if offset != session.received:
+            raise UploadError("Offset does not match the bytes received", status=409, offset=session.received)
+
+        written = 0
+        with open(part_path(session), "r+b") as fh:
+            fh.seek(offset)
+            try:
+                while True:
+                    piece = stream.read(READ_SIZE)
+                    if not piece:
+                        break
+                    if offset + written + len(piece) > session.size:
+                        raise UploadError(f"Upload exceeds its declared size of {session.size} bytes",
+                                          status=413, offset=session.received)
+                    if offset + written == 0:
+                        check_signature(session, piece[:8])
+                    fh.write(piece)
+                    written += len(piece)
+            except UploadError:
+                # Drop the partial chunk; the client resumes from the last good offset.
+                fh.truncate(session.received)
+                raise
+        session.received = offset + written
+        session.updated_at = timezone.now()
+        # update(), not save(): every chunk writes just the progress columns, with no signal dispatch.
+        UploadSession.objects.filter(pk=session.pk).update(received=session.received, updated_at=session.updated_at)
+        if session.received == session.size:
+            finish(session)
+    return session
+
+
+class _PartFile(File):
+    """A finished part file; temporary_file_path lets the storage link it instead of copying."""
+
+    def __init__(self, path, name):
+        super().__init__(open(path, "rb"), name=name)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def finish(session):
+    record = target_record(session)
+    if record is None:
+        raise UploadError(f"No {session.target} to attach the file to", status=404)
+    _, field = target_field(session.target)
+    path = part_path(session)
+    previous = getattr(record, field.name).name
+    upload = _PartFile(path, session.filename)
+    try:
+        with transaction.atomic():
+            getattr(record, field.name).save(session.filename, upload, save=True)
+    except BaseException:
+        # A StoredBlob row this upload created went with the savepoint, so
+        # delete() removes its file; content stored earlier is left alone.
+        stored = getattr(record, field.name).name
+        if stored and stored != previous:
+            field.storage.delete(stored)
+        raise
+    finally:
+        upload.close()
+    transaction.on_commit(lambda: _remove(path))
+    session.completed_at = session.updated_at = timezone.now()
+    session.stored_name = getattr(record, field.name).name
+    type(session).objects.filter(pk=session.pk).update(
+        completed_at=session.completed_at, stored_name=session.stored_name, updated_at=session.updated_at
+    )
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def expire_sessions(max_age=None):
+    """Delete unfinished sessions idle for `max_age` (default UPLOAD_SESSION_MAX_AGE) and their part files."""
+    from .models import UploadSession
+
+    if max_age is None:
+        max_age = timedelta(seconds=getattr(settings, "UPLOAD_SESSION_MAX_AGE", 24 * 60 * 60))
+    stale = UploadSession.objects.filter(completed_at__isnull=True, updated_at__lt=timezone.now() - max_age)
+    expired = 0
+    for session in stale.iterator():
+        _remove(part_path(session))
+        session.delete()
+        expired += 1
+    return expired
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import CacheStatsView, QueryStatsView, ResumeExtractionStatsView, UploadSessionCreateView, UploadSessionView
+
+urlpatterns = [
+    path("cache/stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("queries/stats/", QueryStatsView.as_view(), name="query-stats"),
+    path("resumes/extraction/stats/", ResumeExtractionStatsView.as_view(), name="resume-extraction-stats"),
+    path("uploads/", UploadSessionCreateView.as_view(), name="upload-create"),
+    path("uploads/<uuid:pk>/", UploadSessionView.as_view(), name="upload-detail"),
+]
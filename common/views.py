@@ -1,3 +1,164 @@
+import io
+from datetime import timedelta
+
 from django.shortcuts import render
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from common import uploads
+from common.autocomplete import AUTOCOMPLETE
+from common.cache import cache_stats
+from common.models import UploadSession
+from common.queries import query_stats
+from common.resumes import extraction_stats
+from common.serializers import UploadSessionCreateSerializer
+
+
+class AutocompleteView(APIView):
+    query_budget = {"GET": 2}
+    permission_classes = [permissions.IsAuthenticated]
+    source = None
+    max_limit = 20
+
+    @swagger_auto_schema(
+        operation_summary="Names starting with a prefix, case-insensitively",
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        prefix = request.query_params.get("q", "").strip()
+        if not prefix:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), self.max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": AUTOCOMPLETE[self.source].complete(prefix, limit)}, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Response cache hit-rate counters for this worker",
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+class QueryStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Per-view query counts and database time for this worker",
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        return Response(query_stats(), status=status.HTTP_200_OK)
+
+
+class ResumeExtractionStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Resume text extraction totals, backlog and recent throughput",
+        manual_parameters=[
+            openapi.Parameter("minutes", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Throughput window (default 60)"),
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        try:
+            minutes = max(int(request.query_params.get("minutes", 60)), 1)
+        except ValueError:
+            return Response({"error": "minutes must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(extraction_stats(timedelta(minutes=minutes)), status=status.HTTP_200_OK)
+
+
+def upload_payload(session):
+    return {
+        "id": str(session.pk),
+        "target": session.target,
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.received,
+        "complete": session.completed_at is not None,
+        "file": session.stored_name or None,
+        "chunk_size": uploads.chunk_size(),
+    }
+
+
+def upload_response(session, code=status.HTTP_200_OK):
+    response = Response(upload_payload(session), status=code)
+    response["Upload-Offset"] = str(session.received)
+    response["Upload-Length"] = str(session.size)
+    return response
+
+
+class UploadSessionCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Start a resumable resume upload",
+        operation_description="Declare the file's name and size; the extension and size are checked against "
+                              "the target field before any data is sent. Then PATCH the bytes to the returned "
+                              "upload in order, each chunk with an `Upload-Offset` header.",
+        request_body=UploadSessionCreateSerializer,
+        security=[{"Bearer": []}]
+    )
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        try:
+            session = uploads.open_session(
+                request.user, data["target"], data["filename"], data["size"], target_id=data.get("application")
+            )
+        except uploads.UploadError as exc:
+            return Response({"error": str(exc)}, status=exc.status)
+        return upload_response(session, status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="Progress of a resumable upload; resume from `offset`",
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, pk):
+        session = UploadSession.objects.filter(pk=pk, user=request.user).first()
+        if session is None:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        return upload_response(session)
 
-# Create your views here.
+    @swagger_auto_schema(
+        operation_summary="Append a chunk to a resumable upload",
+        operation_description="Send the raw bytes as the body with `Upload-Offset` set to the upload's current "
+                              "offset. The last chunk attaches the file to its target.",
+        manual_parameters=[openapi.Parameter("Upload-Offset", openapi.IN_HEADER, type=openapi.TYPE_INTEGER,
+                                             required=True)],
+        security=[{"Bearer": []}]
+    )
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            return Response({"error": "Upload-Offset header is required"}, status=status.HTTP_400_BAD_REQUEST)
+        # Read the body as a stream; request.data would buffer it through the parsers.
+        try:
+            session = uploads.write_chunk(pk, request.user, offset, request.stream or io.BytesIO())
+        except uploads.UploadError as exc:
+            response = Response({"error": str(exc), "offset": exc.offset}, status=exc.status)
+            if exc.offset is not None:
+                response["Upload-Offset"] = str(exc.offset)
+            return response
+        return upload_response(session)
@@ -0,0 +1,114 @@
+"""
+Company membership and role checks.
+
+A user's role in every company they own or belong to is loaded with one
+query into a `{company_id: role}` map, then kept on the request's user
+object and in `membership_cache` (process-local, with the shared cache
+behind it). CompanyMember changes and company ownership changes bump the
+cache version (see companies.signals), so a check served from the cache
+costs no query.
+"""
+from django.db.models import CharField, Value
+from rest_framework import permissions
+
+from common.cache import VersionedCache
+from common.choices import CompanyRole
+from .models import Company, CompanyMember
+
+membership_cache = VersionedCache("memberships", timeout=3600)
+
+RECRUITER_ROLES = frozenset({CompanyRole.ADMIN, CompanyRole.RECRUITER})
+
+
+def load_company_roles(user_id):
+    owned = Company.objects.filter(owner_id=user_id).annotate(
+        role=Value(CompanyRole.ADMIN.value, output_field=CharField())
+    ).values_list("pk", "role")
+    rows = CompanyMember.objects.filter(user_id=user_id).values_list("company_id", "role").union(owned, all=True)
+    roles = {}
+    for company_id, role in rows:
+        # Owners count as admins whatever their membership row says.
+        if roles.get(str(company_id)) != CompanyRole.ADMIN:
+            roles[str(company_id)] = role
+    return roles
+
+
+def company_roles(user):
+    """`{company_id: role}` for every company the user owns or belongs to."""
+    if not user or not user.is_authenticated:
+        return {}
+    roles = getattr(user, "_company_roles", None)
+    if roles is None:
+        roles = membership_cache.get_or_set(f"user:{user.pk}", lambda: load_company_roles(user.pk))
+        user._company_roles = roles
+    return roles
+
+
+def company_role(user, company_id):
+    """Return the user's CompanyRole in the company (owners count as admins), or None."""
+    return company_roles(user).get(str(company_id))
+
+
+def is_company_member(user, company_id, roles=None):
+    role = company_role(user, company_id)
+    return role is not None and (roles is None or role in roles)
+
+
+def member_company_ids(user, roles=None):
+    return [company_id for company_id, role in company_roles(user).items() if roles is None or role in roles]
+
+
+def scope_to_companies(queryset, user, roles=None, company_field="company"):
+    """Narrow `queryset` to rows of companies where `user` holds one of `roles`; staff see everything."""
+    if user.is_staff:
+        return queryset
+    return queryset.filter(**{f"{company_field}__in": member_company_ids(user, roles)})
+
+
+def object_company_id(obj):
+    if isinstance(obj, Company):
+        return obj.pk
+    if hasattr(obj, "company_id"):
+        return obj.company_id
+    job = getattr(obj, "job", None)
+    return job.company_id if job is not None else None
+
+
+class CompanyRolePermission(permissions.BasePermission):
+    """
+    Staff, or members holding one of `roles`. Views under a company URL set
+    `company_url_kwarg` to check at request level; otherwise the check runs
+    on the object (a Company, or anything with `company_id` or a `job`).
+    """
+    roles = None
+    message = "Not a member of this company"
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        kwarg = getattr(view, "company_url_kwarg", None)
+        if user.is_staff or kwarg is None:
+            return True
+        return is_company_member(user, view.kwargs[kwarg], self.roles)
+
+    def has_object_permission(self, request, view, obj):
+        return request.user.is_staff or is_company_member(request.user, object_company_id(obj), self.roles)
+
+
+class IsCompanyAdmin(CompanyRolePermission):
+    roles = frozenset({CompanyRole.ADMIN})
+
+
+class IsCompanyRecruiter(CompanyRolePermission):
+    roles = RECRUITER_ROLES
+
+
+class IsCompanyRecruiterOrReadOnly(IsCompanyRecruiter):
+    def has_permission(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return bool(request.user and request.user.is_authenticated)
+        return super().has_permission(request, view)
+
+    def has_object_permission(self, request, view, obj):
+        return request.method in permissions.SAFE_METHODS or super().has_object_permission(request, view, obj)
@@ -1,7 +1,57 @@
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
-from .models import Company
+from .models import Company, CompanyMember
+from common.serializers import SparseFieldsetMixin
+
+# ?expand=counts adds these; each is one correlated subquery, never a count per company.
+COUNT_FIELDS = ("active_jobs_count", "member_count", "open_application_count")
+
+
+def latest_jobs_size():
+    return getattr(settings, "COMPANY_LATEST_JOBS", 5)
+
+
+def _count(queryset, group, total="pk", aggregate=Count):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group).annotate(n=aggregate(total)).values("n")[:1],
+                 output_field=IntegerField()),
+        0,
+    )
+
+
+def with_counts(queryset):
+    """Annotate active job, member and open application counts."""
+    from applications.models import ApplicationStatusCount
+    from applications.transitions import STAGES
+    from jobs.models import Job
+
+    return queryset.annotate(
+        active_jobs_count=_count(Job.objects.filter(company=OuterRef("pk"), is_active=True), "company"),
+        member_count=_count(CompanyMember.objects.filter(company=OuterRef("pk")), "company"),
+        # Read from the pipeline's per-(job, status) counters instead of counting applications.
+        open_application_count=_count(
+            ApplicationStatusCount.objects.filter(job__company=OuterRef("pk"), status__in=STAGES),
+            "job__company", total="count", aggregate=Sum,
+        ),
+    )
+
+
+def latest_jobs_prefetch(size=None):
+    """The newest `size` active jobs of every company on the page, in one query."""
+    from jobs.models import Job
+    from jobs.serializers import JobSerializer
+
+    jobs = JobSerializer.optimize_queryset(Job.objects.filter(is_active=True)).order_by("-created_at", "-id")
+    return Prefetch("jobs", queryset=jobs[:size or latest_jobs_size()], to_attr="latest_jobs")
+
+
+class CompanySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "latest_jobs": ("jobs.serializers.JobSerializer", {"many": True}),
+    }
 
-class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = [
@@ -10,3 +60,31 @@ class CompanySerializer(serializers.ModelSerializer):
             "created_at", "updated_at"
         ]
         read_only_fields = ["id", "slug", "verified", "created_at", "updated_at"]
+
+    def __init__(self, *args, expand=None, **kwargs):
+        self.with_counts = "counts" in (expand or ())
+        super().__init__(*args, expand=expand, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.with_counts:
+            for name in COUNT_FIELDS:
+                fields[name] = serializers.IntegerField(read_only=True)
+        return fields
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None, keep=(), latest=None):
+        """
+        Besides the usual narrowing, `expand=counts` annotates COUNT_FIELDS and
+        `expand=latest_jobs` prefetches each company's newest `latest` active jobs.
+        """
+        expand = list(expand or ())
+        extras = {"counts", "latest_jobs"}
+        if fields is not None:
+            fields = [name for name in fields if name not in COUNT_FIELDS and name not in extras]
+        queryset = super().optimize_queryset(queryset, fields, [name for name in expand if name not in extras], keep)
+        if "counts" in expand:
+            queryset = with_counts(queryset)
+        if "latest_jobs" in expand:
+            queryset = queryset.prefetch_related(latest_jobs_prefetch(latest))
+        return queryset
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from common.autocomplete import AUTOCOMPLETE
+from common.cache import company_cache
+from .models import Company, CompanyMember
+from .permissions import membership_cache
+
+AUTOCOMPLETE["companies"].track()
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def bump_company_cache(sender, **kwargs):
+    company_cache.bump_on_commit()
+
+
+@receiver(post_save, sender=CompanyMember)
+@receiver(post_delete, sender=CompanyMember)
+def bump_membership_cache(sender, **kwargs):
+    membership_cache.bump_on_commit()
+
+
+@receiver(pre_save, sender=Company)
+def remember_company_owner(sender, instance, raw=False, **kwargs):
+    if not raw and not instance._state.adding:
+        instance._previous_owner_id = Company.objects.filter(pk=instance.pk).values_list("owner_id", flat=True).first()
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def bump_membership_cache_on_owner_change(sender, instance, created=False, **kwargs):
+    # Owners hold the admin role without a CompanyMember row.
+    if created or kwargs["signal"] is post_delete or instance.__dict__.pop("_previous_owner_id", instance.owner_id) != instance.owner_id:
+        membership_cache.bump_on_commit()
@@ -1,7 +1,9 @@
 from django.urls import path
+from common.views import AutocompleteView
 from .views import CompanyListCreateView, CompanyDetailView
 
 urlpatterns = [
     path("companies/", CompanyListCreateView.as_view(), name="company-list-create"),
+    path("companies/autocomplete/", AutocompleteView.as_view(source="companies"), name="company-autocomplete"),
     path("companies/<uuid:pk>/", CompanyDetailView.as_view(), name="company-detail"),
 ]
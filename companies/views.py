@@ -4,12 +4,37 @@ from rest_framework.response import Response
 from rest_framework import status,filters
 from django.shortcuts import get_object_or_404
 from .models import Company
-from .serializers import CompanySerializer
+from .serializers import CompanySerializer, latest_jobs_size
 from django_filters.rest_framework import DjangoFilterBackend
 from job_portal.pagination import SetPagination
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from common.cache import company_cache, request_cache_key
+from common.conditional import conditional_on_updated_at, updated_at_of
+from common.serializers import SPARSE_FIELDSET_PARAMETERS, sparse_cache_key, sparse_fieldset
+
+# Expansions read other tables, so their responses skip the company cache and conditional GET.
+LIVE_EXPANSIONS = {"counts", "latest_jobs"}
+COMPANY_PARAMETERS = [
+    *SPARSE_FIELDSET_PARAMETERS,
+    openapi.Parameter("latest", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description="Jobs per company with expand=latest_jobs"),
+]
+
+
+def live_expansion(request):
+    return bool(LIVE_EXPANSIONS & set(sparse_fieldset(request)[1]))
+
+
+def latest_param(request):
+    try:
+        return min(max(int(request.query_params.get("latest", latest_jobs_size())), 1), 20)
+    except ValueError:
+        return latest_jobs_size()
+
+
 class CompanyListCreateView(APIView):
+    query_budget = {"GET": 6}
     companies = Company.objects.all()
     serializer_class = CompanySerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -20,15 +45,27 @@ class CompanyListCreateView(APIView):
     pagination_class = SetPagination
     @swagger_auto_schema(
         operation_summary="List all companies",
+        operation_description="`expand=counts` adds active job, member and open application counts; "
+                              "`expand=latest_jobs` adds each company's newest active jobs.",
+        manual_parameters=COMPANY_PARAMETERS,
         responses={200: CompanySerializer(many=True)},
         security=[{"Bearer": []}]
     )
     def get(self, request):
-        companies = Company.objects.all()
+        if live_expansion(request):
+            return Response(self.list_payload(request), status=status.HTTP_200_OK)
+        data = company_cache.get_or_set(request_cache_key(request, "list"), lambda: self.list_payload(request))
+        return Response(data, status=status.HTTP_200_OK)
+
+    def list_payload(self, request):
+        fields, expand = sparse_fieldset(request)
+        companies = CompanySerializer.optimize_queryset(
+            Company.objects.order_by("-created_at", "-id"), fields, expand, latest=latest_param(request)
+        )
         paginator = self.pagination_class()
         paginated_companies = paginator.paginate_queryset(companies, request)
-        serializer = CompanySerializer(paginated_companies, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        serializer = CompanySerializer(paginated_companies, many=True, fields=fields, expand=expand)
+        return paginator.get_paginated_response(serializer.data).data
 
     @swagger_auto_schema(
         operation_summary="Create a new company",
@@ -44,15 +81,29 @@ class CompanyListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class CompanyDetailView(APIView):
+    query_budget = {"GET": 6}
     @swagger_auto_schema(
         operation_summary="Retrieve a company",
+        operation_description="`expand=counts` adds active job, member and open application counts; "
+                              "`expand=latest_jobs` adds the company's newest active jobs.",
+        manual_parameters=COMPANY_PARAMETERS,
         responses={200: CompanySerializer},
         security=[{"Bearer": []}]
     )
+    @conditional_on_updated_at(
+        lambda request, pk: None if live_expansion(request) else updated_at_of(Company.objects.filter(pk=pk))
+    )
     def get(self, request, pk):
-        company = get_object_or_404(Company, pk=pk)
-        serializer = CompanySerializer(company)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields, expand = sparse_fieldset(request)
+        queryset = CompanySerializer.optimize_queryset(Company.objects.all(), fields, expand, latest=latest_param(request))
+        if live_expansion(request):
+            company = get_object_or_404(queryset, pk=pk)
+            return Response(CompanySerializer(company, fields=fields, expand=expand).data, status=status.HTTP_200_OK)
+        data = company_cache.get_or_set(
+            f"detail:{pk}{sparse_cache_key(fields, expand)}",
+            lambda: CompanySerializer(get_object_or_404(queryset, pk=pk), fields=fields, expand=expand).data,
+        )
+        return Response(data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
         operation_summary="Update a company",
@@ -82,16 +133,6 @@ class CompanyDetailView(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @swagger_auto_schema(
-        operation_summary="Retrieve a company",
-        responses={200: CompanySerializer},
-        security=[{"Bearer": []}]
-    )
-    def get(self, request, pk):
-        company = get_object_or_404(Company, pk=pk)
-        serializer = CompanySerializer(company)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     @swagger_auto_schema(
         operation_summary="Delete a company",
         responses={204: openapi.Response("No Content")},
@@ -1,6 +1,135 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class SetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite (timestamp, pk) key.
+
+    Pages are located with `WHERE (a, b) < (cursor_a, cursor_b)` instead of
+    OFFSET, so fetching page 10,000 costs the same as page 1 as long as an
+    index covers `ordering`. Both ordering fields must sort the same way.
+    """
+    page_size = 10
+    page_size_query_param = 'size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None, page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values, reverse=False):
+        payload = {"v": [str(v) for v in values]}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, encoded, model):
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode()))
+            fields = [model._meta.get_field(name.lstrip("-")) for name in self.ordering]
+            values = [field.to_python(raw) for field, raw in zip(fields, payload["v"], strict=True)]
+            return values, bool(payload.get("r"))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _seek(self, values, reverse):
+        # Expanded form of the row comparison: the leading `lte`/`gte` keeps it
+        # an index range scan on databases that do not plan OR well.
+        first, second = (name.lstrip("-") for name in self.ordering)
+        descending = self.ordering[0].startswith("-") != reverse
+        op = "lt" if descending else "gt"
+        return (
+            Q(**{f"{first}__{op}e": values[0]})
+            & (Q(**{f"{first}__{op}": values[0]}) | Q(**{first: values[0], f"{second}__{op}": values[1]}))
+        )
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering]
+
+    def _key(self, obj):
+        names = [name.lstrip("-") for name in self.ordering]
+        if isinstance(obj, dict):
+            return [obj[name] for name in names]
+        return [getattr(obj, name) for name in names]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        reverse = False
+        if encoded:
+            values, reverse = self.decode_cursor(encoded, queryset.model)
+            queryset = queryset.filter(self._seek(values, reverse))
+        ordering = self._reversed_ordering() if reverse else list(self.ordering)
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = bool(encoded) and (has_more if reverse else True)
+        self.first_key = self._key(rows[0]) if rows else None
+        self.last_key = self._key(rows[-1]) if rows else None
+        if not rows:
+            self.has_next = self.has_previous = False
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_key))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.first_key, reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
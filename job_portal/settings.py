@@ -58,9 +58,27 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Kolkata"
+# Resume parsing is CPU-bound; it runs on its own prefork worker (see docker-compose.yml and common/resumes.py)
+CELERY_TASK_ROUTES = {
+    "common.tasks.extract_resume_text": {"queue": "extraction"},
+}
+
+# "default" is per process; "shared" is the Redis tier behind it (see common/cache.py)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "job-portal-local",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://redis:6379/1",
+    },
+}
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,7 +86,9 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'auditlog.middleware.CurrentUserMiddleware',
-    'silk.middleware.SilkyMiddleware'
+    'silk.middleware.SilkyMiddleware',
+    # Innermost, so silk's own bookkeeping queries are not counted against the view.
+    'common.middleware.QueryCountMiddleware',
 ]
 # email configuration
 
@@ -133,6 +153,15 @@ DATABASES = {
         'PORT': '5432',            
     }
 }
+# Read replica of "default". Point HOST at the standby; until then it reads the primary.
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['common.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = ['replica']
+# Apps whose reads may go to a replica during safe requests (see common/routers.py)
+REPLICA_READ_APPS = ['jobs', 'companies', 'profiles']
+# Seconds after a write during which the writing client (and cache refills) read from the primary
+REPLICA_LAG_SECONDS = 5
 
 
 # Password validation
@@ -171,10 +200,49 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    # Resumes and application snapshots: one copy per unique file (see common/storage.py)
+    "resumes": {"BACKEND": "common.storage.ContentAddressedStorage"},
+}
+# Seconds an unreferenced stored file is kept before collect_blobs removes it
+CAS_GRACE_SECONDS = 24 * 60 * 60
+# Suggested chunk size for resumable uploads, and how long an unfinished one is kept (see common/uploads.py)
+UPLOAD_CHUNK_SIZE = 256 * 1024
+UPLOAD_SESSION_MAX_AGE = 24 * 60 * 60
+# Application events and audit log rows older than this move to compressed segments under ARCHIVE_ROOT,
+# ARCHIVE_BATCH_SIZE rows per segment (see common/archive.py)
+ARCHIVE_ROOT = BASE_DIR / "archive"
+ARCHIVE_AFTER_DAYS = 180
+ARCHIVE_BATCH_SIZE = 5000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Snapshot of the in-process job search index (see jobs/search.py)
+JOB_SEARCH_INDEX_PATH = BASE_DIR / 'var' / 'job_search.idx'
+# Seconds before a worker catches its job search index up with other workers' writes,
+# and before it rebuilds it from scratch to pick up skill and company renames (see jobs/search.py)
+JOB_SEARCH_INDEX_MAX_AGE = 60
+JOB_SEARCH_INDEX_REBUILD_AGE = 3600
+# Seconds before a worker rebuilds its job facet bitmaps (see jobs/facets.py)
+JOB_FACET_INDEX_MAX_AGE = 300
+# Seconds before a worker rebuilds its skill -> jobs recommendation index (see jobs/recommendations.py)
+JOB_RECOMMENDATION_INDEX_MAX_AGE = 300
+# Seconds before the alert worker reloads its saved search index from scratch (see jobs/alerts.py)
+JOB_ALERT_INDEX_MAX_AGE = 900
+# Seconds before a worker rebuilds its company, skill and category name autocomplete arrays (see common/autocomplete.py)
+AUTOCOMPLETE_INDEX_MAX_AGE = 300
+# Newest applications kept per (job, status) for the pipeline board (see applications/pipeline.py)
+PIPELINE_NEWEST_PER_STATUS = 5
+# Newest active jobs shown per company with ?expand=latest_jobs (see companies/serializers.py)
+COMPANY_LATEST_JOBS = 5
+# Identical query shapes per request before it is logged as a likely N+1 (see common/middleware.py)
+QUERY_REPEAT_THRESHOLD = 10
+
 AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
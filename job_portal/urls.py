@@ -26,6 +26,8 @@ urlpatterns = [
     path('api/', include('companies.urls')),
     path('api/', include('jobs.urls')),
     path('api/', include('notifications.urls')),
+    path('api/', include('common.urls')),
+    path('api/', include('auditlog.urls')),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-docs'),
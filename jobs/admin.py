@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Job, JobCategory
+from .models import Job, JobCategory, SavedSearch
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
@@ -15,3 +15,9 @@ class JobCategoryAdmin(admin.ModelAdmin):
     list_filter = ("is_active", "created_at")
 
 
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "experience_level", "location_type", "city", "is_active", "created_at")
+    list_filter = ("is_active", "experience_level", "location_type")
+    search_fields = ("name", "user__email")
+    autocomplete_fields = ("skills",)
@@ -0,0 +1,259 @@
+"""
+Percolation of newly published jobs against saved searches.
+
+Instead of running every saved search per job, `SavedSearchIndex` files
+each search under the (skill, experience level, location type, city) keys
+it requires, with None for the filters it leaves open. A job then probes
+every combination of its own values and None, so it only touches searches
+that already agree on those four filters; country and salary are checked
+on that short list. New and edited searches are loaded incrementally
+(`catch_up`) from `SavedSearch.updated_at` before every batch.
+"""
+import threading
+import time
+from collections import defaultdict
+from itertools import product
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from common.choices import NotificationType
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def _lower(value):
+    return value.strip().lower() if value else None
+
+
+class SavedSearchIndex:
+    def __init__(self):
+        self.searches = {}               # search_id -> (user_id, name, skills, level, location_type, country, city, min, max)
+        self.anchors = defaultdict(set)  # anchor key -> {search_id}
+        self.search_anchors = {}         # search_id -> [anchor key]
+        self.watermark = None            # newest SavedSearch.updated_at loaded
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.searches)
+
+    def anchor_keys(self, skills, level, location_type, city):
+        return [(skill_id, level, location_type, city) for skill_id in skills or (None,)]
+
+    def add(self, search_id, user_id, name, skills, level, location_type, country, city, min_salary, max_salary):
+        search_id = str(search_id)
+        skills = frozenset(str(s) for s in skills)
+        # A blank choice leaves the filter open, as None does; jobs probe with None.
+        level, location_type = level or None, location_type or None
+        country, city = _lower(country), _lower(city)
+        with self.lock:
+            self._remove(search_id)
+            self.searches[search_id] = (
+                user_id, name, skills, level, location_type, country, city, min_salary, max_salary
+            )
+            keys = self.anchor_keys(skills, level, location_type, city)
+            for key in keys:
+                self.anchors[key].add(search_id)
+            self.search_anchors[search_id] = keys
+
+    def remove(self, search_id):
+        with self.lock:
+            self._remove(str(search_id))
+
+    def _remove(self, search_id):
+        for key in self.search_anchors.pop(search_id, ()):
+            bucket = self.anchors.get(key)
+            if bucket is not None:
+                bucket.discard(search_id)
+                if not bucket:
+                    del self.anchors[key]
+        self.searches.pop(search_id, None)
+
+    def add_searches(self, queryset):
+        """(Re)load `queryset`; inactive searches are dropped."""
+        from .models import SavedSearch
+
+        queryset = queryset.order_by()
+        rows = queryset.values_list(
+            "id", "is_active", "updated_at", "user_id", "name", "experience_level", "location_type",
+            "country", "city", "min_salary", "max_salary",
+        )
+        skills = defaultdict(list)
+        through = SavedSearch.skills.through.objects.filter(savedsearch__in=queryset.filter(is_active=True))
+        for search_id, skill_id in through.values_list("savedsearch_id", "skill_id").iterator(chunk_size=10000):
+            skills[search_id].append(skill_id)
+
+        for search_id, is_active, updated_at, user_id, name, *filters in rows.iterator(chunk_size=10000):
+            level, location_type, country, city, min_salary, max_salary = filters
+            if is_active:
+                self.add(search_id, user_id, name, skills[search_id], level, location_type,
+                         country, city, min_salary, max_salary)
+            else:
+                self.remove(search_id)
+            if self.watermark is None or updated_at > self.watermark:
+                self.watermark = updated_at
+
+    def catch_up(self):
+        """Apply saved searches created or changed since the last load."""
+        from .models import SavedSearch
+
+        if self.watermark is None:
+            self.add_searches(SavedSearch.objects.filter(is_active=True))
+        else:
+            self.add_searches(SavedSearch.objects.filter(updated_at__gte=self.watermark))
+
+    # -- matching -----------------------------------------------------------
+
+    def _matches(self, search, job):
+        _, _, skills, level, location_type, country, city, min_salary, max_salary = search
+        job_skills, job_level, job_location_type, job_country, job_city, job_min, job_max = job
+        if skills and skills.isdisjoint(job_skills):
+            return False
+        if level and level != job_level:
+            return False
+        if location_type and location_type != job_location_type:
+            return False
+        if country and country != job_country:
+            return False
+        if city and city != job_city:
+            return False
+        if min_salary is not None:
+            top = job_max if job_max is not None else job_min
+            if top is None or top < min_salary:
+                return False
+        if max_salary is not None:
+            bottom = job_min if job_min is not None else job_max
+            if bottom is None or bottom > max_salary:
+                return False
+        return True
+
+    def match(self, skills, level, location_type, country, city, min_salary, max_salary):
+        """Return the ids of the saved searches a job with these attributes satisfies."""
+        job = (frozenset(str(s) for s in skills), level, location_type, _lower(country), _lower(city),
+               min_salary, max_salary)
+        # A search is filed under (skill, level, location type, city) with None for
+        # filters it leaves open, so probing every combination of the job's values
+        # and None finds exactly the searches agreeing on all four.
+        keys = product((*job[0], None), (level, None), (location_type, None), (job[4], None))
+        with self.lock:
+            candidates = set()
+            for key in keys:
+                bucket = self.anchors.get(key)
+                if bucket:
+                    candidates |= bucket
+            return [search_id for search_id in candidates if self._matches(self.searches[search_id], job)]
+
+    def percolate(self, jobs):
+        """
+        Match a batch of jobs, given as `values()` rows with a `skills` list.
+        Returns `{user_id: [(search id, search name, job row), ...]}`.
+        """
+        matches = defaultdict(list)
+        for job in jobs:
+            search_ids = self.match(
+                job["skills"], job["experience_level"], job["location_type"], job["country"],
+                job["city"], job["min_salary"], job["max_salary"],
+            )
+            for search_id in search_ids:
+                user_id, name = self.searches[search_id][:2]
+                matches[user_id].append((search_id, name, job))
+        return matches
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def max_age():
+    return getattr(settings, "JOB_ALERT_INDEX_MAX_AGE", 900)
+
+
+def get_index():
+    """
+    Return this process's saved search index, brought up to date with the
+    database. Deleted searches are only dropped when the index is rebuilt,
+    every `JOB_ALERT_INDEX_MAX_AGE` seconds; until then `send_job_alerts`
+    skips them.
+    """
+    global _index
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.built_at > max_age():
+            _index = SavedSearchIndex()
+        _index.catch_up()
+        return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def published_jobs(job_ids):
+    """`values()` rows, with skill ids, for the active jobs among `job_ids`."""
+    from .models import Job
+
+    jobs = list(Job.objects.filter(pk__in=job_ids, is_active=True, published_at__isnull=False).values(
+        "id", "title", "company_id", "experience_level", "location_type", "country", "city",
+        "min_salary", "max_salary",
+    ))
+    skills = defaultdict(list)
+    through = Job.skills.through.objects.filter(job_id__in=[job["id"] for job in jobs])
+    for job_id, skill_id in through.values_list("job_id", "skill_id"):
+        skills[job_id].append(skill_id)
+    for job in jobs:
+        job["skills"] = skills[job["id"]]
+    return jobs
+
+
+def live_search_ids(search_ids, chunk_size=5000):
+    """The subset of `search_ids` still saved and active (the index keeps deleted ones until its next rebuild)."""
+    from .models import SavedSearch
+
+    search_ids = list(search_ids)
+    live = set()
+    for first in range(0, len(search_ids), chunk_size):
+        chunk = SavedSearch.objects.filter(pk__in=search_ids[first:first + chunk_size], is_active=True)
+        live.update(str(pk) for pk in chunk.values_list("pk", flat=True))
+    return live
+
+
+def send_job_alerts(job_ids):
+    """Percolate `job_ids` and notify each matching user once per job. Returns the number of notifications."""
+    from notifications.models import Notification
+    from .models import Job
+
+    jobs = published_jobs(job_ids)
+    if not jobs:
+        return 0
+    matches = get_index().percolate(jobs)
+    if not matches:
+        return 0
+
+    live = live_search_ids({search_id for hits in matches.values() for search_id, _, _ in hits})
+    job_ct = ContentType.objects.get_for_model(Job)
+    # Re-running a batch (e.g. a retried task) must not notify anyone twice.
+    already = set(
+        Notification.objects.filter(
+            type=NotificationType.JOB, target_ct=job_ct, target_id__in=[str(job["id"]) for job in jobs]
+        ).values_list("recipient_id", "target_id")
+    )
+    notifications = []
+    for user_id, hits in matches.items():
+        seen = set()
+        for search_id, name, job in hits:
+            target_id = str(job["id"])
+            if search_id not in live or target_id in seen or (user_id, target_id) in already:
+                continue
+            seen.add(target_id)
+            notifications.append(Notification(
+                recipient_id=user_id,
+                type=NotificationType.JOB,
+                verb=f"New job for '{name}': {job['title']}"[:160],
+                target_ct=job_ct,
+                target_id=target_id,
+            ))
+    Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_BATCH_SIZE)
+    return len(notifications)
+
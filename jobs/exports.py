@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+from common.exports import QuerysetExport
+from companies.models import Company
+from .models import Job, JobCategory
+
+
+class JobExport(QuerysetExport):
+    fields = (
+        "id", "company_id", "title", "slug", "description", "category_id", "experience_level",
+        "employment_type", "location_type", "country", "city", "min_salary", "max_salary",
+        "application_deadline", "published_at", "is_active", "created_at", "updated_at",
+    )
+    columns = (
+        "id", "company_id", "company", "title", "slug", "description", "category", "experience_level",
+        "employment_type", "location_type", "country", "city", "min_salary", "max_salary",
+        "application_deadline", "published_at", "skills", "is_active", "created_at", "updated_at",
+    )
+
+    def resolve(self, rows):
+        companies = dict(
+            Company.objects.filter(pk__in={row["company_id"] for row in rows}).values_list("pk", "name")
+        )
+        categories = dict(
+            JobCategory.objects.filter(pk__in={row["category_id"] for row in rows if row["category_id"]})
+            .values_list("pk", "name")
+        )
+        skills = defaultdict(list)
+        through = Job.skills.through.objects.filter(job_id__in=[row["id"] for row in rows]).order_by("skill__name")
+        for job_id, name in through.values_list("job_id", "skill__name"):
+            skills[job_id].append(name)
+
+        for row in rows:
+            row["company"] = companies.get(row["company_id"])
+            row["category"] = categories.get(row.pop("category_id"))
+            row["skills"] = skills.get(row["id"], [])
+        return [{column: row[column] for column in self.columns} for row in rows]
@@ -0,0 +1,297 @@
+"""
+Facet counts for the job listing filters.
+
+Every job gets a bit position, and each facet value keeps a bitmap (a Python
+int) of the jobs that carry it. Counts for a filter combination come from
+ANDing bitmaps and popcounting, so all facets are computed in one pass over
+the bitmaps without touching the database. A facet's own selection is left
+out when counting it, so the UI can show how many jobs each alternative
+value would give.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+
+from common.choices import EmploymentType, ExperienceLevel, LocationType
+
+UNSPECIFIED = "unspecified"
+
+# (label, lower bound inclusive, upper bound exclusive)
+SALARY_BUCKETS = [
+    ("0-50k", 0, 50_000),
+    ("50k-100k", 50_000, 100_000),
+    ("100k-150k", 100_000, 150_000),
+    ("150k-200k", 150_000, 200_000),
+    ("200k+", 200_000, None),
+]
+
+FACET_FIELDS = {
+    "experience_level": "experience_level",
+    "employment_type": "employment_type",
+    "location_type": "location_type",
+    "country": "country",
+    "city": "city",
+    "category": "category_id",
+}
+FACETS = (*FACET_FIELDS, "salary", "is_active")
+
+FACET_CHOICES = {
+    "experience_level": ExperienceLevel.values,
+    "employment_type": EmploymentType.values,
+    "location_type": LocationType.values,
+}
+
+
+def salary_bucket(min_salary, max_salary):
+    salary = min_salary if min_salary is not None else max_salary
+    if salary is None:
+        return UNSPECIFIED
+    for label, low, high in SALARY_BUCKETS:
+        if salary >= low and (high is None or salary < high):
+            return label
+    return UNSPECIFIED
+
+
+def salary_bucket_q(labels):
+    """Queryset filter matching any of the salary bucket `labels` (needs `salary` annotation)."""
+    q = Q()
+    for label, low, high in SALARY_BUCKETS:
+        if label in labels:
+            bucket = Q(salary__gte=low)
+            if high is not None:
+                bucket &= Q(salary__lt=high)
+            q |= bucket
+    if UNSPECIFIED in labels:
+        q |= Q(salary__isnull=True)
+    return q
+
+
+def annotate_salary(queryset):
+    return queryset.annotate(salary=Coalesce("min_salary", "max_salary"))
+
+
+class FacetIndex:
+    cache_size = 512
+
+    def __init__(self):
+        self.positions = {}                                   # job_id -> bit
+        self.values = {}                                      # job_id -> {facet: value}
+        self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+        self.free = []
+        self.next_position = 0
+        self.all_mask = 0
+        self.counts_cache = OrderedDict()
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, job_id, values):
+        job_id = str(job_id)
+        with self.lock:
+            self._remove(job_id)
+            position = self.free.pop() if self.free else self._grow()
+            bit = 1 << position
+            self.positions[job_id] = position
+            self.values[job_id] = values
+            for facet, value in values.items():
+                self.bitmaps[facet][value] |= bit
+            self.all_mask |= bit
+            self.counts_cache.clear()
+
+    def remove(self, job_id):
+        with self.lock:
+            self._remove(str(job_id))
+            self.counts_cache.clear()
+
+    def _grow(self):
+        position = self.next_position
+        self.next_position += 1
+        return position
+
+    def _remove(self, job_id):
+        position = self.positions.pop(job_id, None)
+        if position is None:
+            return
+        bit = 1 << position
+        for facet, value in self.values.pop(job_id).items():
+            bitmap = self.bitmaps[facet][value] & ~bit
+            if bitmap:
+                self.bitmaps[facet][value] = bitmap
+            else:
+                del self.bitmaps[facet][value]
+        self.all_mask &= ~bit
+        self.free.append(position)
+
+    def add_jobs(self, queryset):
+        rows = queryset.order_by().values_list(
+            "id", *FACET_FIELDS.values(), "min_salary", "max_salary", "is_active"
+        )
+        documents = []
+        for job_id, *facet_values, min_salary, max_salary, is_active in rows.iterator(chunk_size=5000):
+            values = {
+                facet: UNSPECIFIED if value is None else str(value)
+                for facet, value in zip(FACET_FIELDS, facet_values)
+            }
+            values["salary"] = salary_bucket(min_salary, max_salary)
+            values["is_active"] = "true" if is_active else "false"
+            documents.append((str(job_id), values))
+
+        with self.lock:
+            if self.positions:
+                for job_id, values in documents:
+                    self.add(job_id, values)
+                return
+            self._bulk_load(documents)
+
+    def _bulk_load(self, documents):
+        # OR-ing one bit at a time into a large int copies the whole bitmap on
+        # every step; set the bits in a bytearray and convert once instead.
+        size = (len(documents) + 7) // 8
+        # Only called while empty, but positions freed by earlier removals must
+        # not be handed out again on top of the ones assigned here.
+        self.free = []
+        self.positions, self.values = {}, {}
+        self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+        buffers = {facet: defaultdict(lambda: bytearray(size)) for facet in FACETS}
+        for position, (job_id, values) in enumerate(documents):
+            self.positions[job_id] = position
+            self.values[job_id] = values
+            byte, bit = divmod(position, 8)
+            for facet, value in values.items():
+                buffers[facet][value][byte] |= 1 << bit
+        for facet, by_value in buffers.items():
+            for value, buffer in by_value.items():
+                self.bitmaps[facet][value] = int.from_bytes(buffer, "little")
+        self.next_position = len(documents)
+        self.all_mask = (1 << len(documents)) - 1
+        self.counts_cache.clear()
+
+    def _selection_mask(self, facet, selected):
+        bitmaps = self.bitmaps[facet]
+        mask = 0
+        for value in selected:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def counts(self, filters):
+        """
+        Return `(total, {facet: {value: count}})` for `filters`, a mapping of
+        facet name to the set of selected values.
+        """
+        filters = {facet: frozenset(values) for facet, values in filters.items() if values and facet in FACETS}
+        key = frozenset(filters.items())
+        with self.lock:
+            cached = self.counts_cache.get(key)
+            if cached is not None:
+                self.counts_cache.move_to_end(key)
+                return cached
+
+            masks = {facet: self._selection_mask(facet, values) for facet, values in filters.items()}
+            total_mask = self.all_mask
+            for mask in masks.values():
+                total_mask &= mask
+
+            result = {}
+            for facet in FACETS:
+                mask = self.all_mask
+                for other, other_mask in masks.items():
+                    if other != facet:
+                        mask &= other_mask
+                counts = {value: (bitmap & mask).bit_count() for value, bitmap in self.bitmaps[facet].items()}
+                for value in FACET_CHOICES.get(facet, ()):
+                    counts.setdefault(value, 0)
+                result[facet] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+            cached = (total_mask.bit_count(), result)
+            self.counts_cache[key] = cached
+            if len(self.counts_cache) > self.cache_size:
+                self.counts_cache.popitem(last=False)
+            return cached
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def max_age():
+    return getattr(settings, "JOB_FACET_INDEX_MAX_AGE", 300)
+
+
+def get_index():
+    """
+    Return the process-wide facet index. Changes made in this process are
+    applied by `jobs.signals`; the index is also rebuilt once it is older than
+    `JOB_FACET_INDEX_MAX_AGE` seconds to pick up writes from other processes.
+    """
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age():
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.built_at > max_age():
+                _index = build_index()
+            index = _index
+    return index
+
+
+def get_loaded_index():
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def build_index():
+    from .models import Job
+
+    index = FacetIndex()
+    index.add_jobs(Job.objects.all())
+    return index
+
+
+def parse_filters(query_params):
+    """
+    Read `?facet=a,b&facet=c` style selections from the request. Raises
+    ValueError for a category that is not a category id.
+    """
+    filters = {}
+    for facet in FACETS:
+        values = set()
+        for raw in query_params.getlist(facet):
+            values.update(v.strip() for v in raw.split(",") if v.strip())
+        if values:
+            filters[facet] = values
+    for value in filters.get("category", ()):
+        if value != UNSPECIFIED:
+            try:
+                uuid.UUID(value)
+            except ValueError:
+                raise ValueError(f"category must be a category id or '{UNSPECIFIED}'") from None
+    filters.setdefault("is_active", {"true"})
+    return filters
+
+
+def filter_queryset(queryset, filters):
+    """Apply the same selections to a Job queryset."""
+    for facet, field in FACET_FIELDS.items():
+        values = filters.get(facet)
+        if not values:
+            continue
+        q = Q(**{f"{field}__in": [v for v in values if v != UNSPECIFIED]})
+        if UNSPECIFIED in values:
+            q |= Q(**{f"{field}__isnull": True})
+        queryset = queryset.filter(q)
+    if filters.get("salary"):
+        queryset = annotate_salary(queryset).filter(salary_bucket_q(filters["salary"]))
+    if filters.get("is_active"):
+        queryset = queryset.filter(is_active__in=[v == "true" for v in filters["is_active"]])
+    return queryset
@@ -0,0 +1,238 @@
+"""
+Streaming bulk import of job postings for one company.
+
+Rows are read lazily from CSV or NDJSON and processed in chunks. Each chunk
+is validated without touching the database, then its categories and skills
+are resolved with one query each. Slug collisions are checked against the
+company's slugs, loaded once per import. Jobs and their skill rows
+are written with `bulk_create`, and a single batched audit insert follows.
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from auditlog.bulk import bulk_audit, snapshot
+from .models import Job, JobCategory, Skill
+from .serializers import JobSerializer
+from .signals import jobs_bulk_changed, jobs_published
+
+CSV_LIST_SEPARATORS = (";", "|")
+SLUG_BASE_LENGTH = 240
+
+
+class JobImportRowSerializer(JobSerializer):
+    """A JobSerializer row with company fixed by the import and names in place of related keys."""
+    category = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    skills = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, allow_empty=True
+    )
+
+    class Meta(JobSerializer.Meta):
+        fields = [f for f in JobSerializer.Meta.fields if f != "company"]
+
+
+def parse_csv(stream):
+    for row in csv.DictReader(stream):
+        data = {key.strip(): value.strip() for key, value in row.items() if key and value not in (None, "")}
+        if "skills" in data:
+            raw = data["skills"]
+            for separator in CSV_LIST_SEPARATORS:
+                raw = raw.replace(separator, ",")
+            data["skills"] = [s.strip() for s in raw.split(",") if s.strip()]
+        yield data
+
+
+def parse_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield ValueError(f"Invalid JSON: {exc}")
+            continue
+        yield data if isinstance(data, dict) else ValueError("Each line must be a JSON object.")
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+def detect_format(filename, requested=None):
+    if requested:
+        return requested.lower()
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def text_stream(binary):
+    """Wrap an uploaded (binary) file so rows can be read without loading it all."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+class JobImporter:
+    chunk_size = 1000
+    max_reported_errors = 1000
+
+    def __init__(self, company, user=None, create_skills=True, chunk_size=None):
+        self.company = company
+        self.user = user
+        self.create_skills = create_skills
+        if chunk_size:
+            self.chunk_size = chunk_size
+        # Built once and reused: constructing a ModelSerializer's fields costs more than validating a row.
+        self.row_serializer = JobImportRowSerializer()
+        self.taken_slugs = set()
+        self.slugs_loaded = False
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def run(self, rows):
+        chunk = []
+        for number, row in enumerate(rows, start=1):
+            chunk.append((number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def fail(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"row": number, "errors": errors})
+
+    # -- per chunk ----------------------------------------------------------
+
+    def import_chunk(self, chunk):
+        valid = []
+        for number, row in chunk:
+            if isinstance(row, Exception):
+                self.fail(number, {"non_field_errors": [str(row)]})
+                continue
+            try:
+                valid.append((number, self.row_serializer.run_validation(row)))
+            except serializers.ValidationError as exc:
+                self.fail(number, serializers.as_serializer_error(exc))
+        if not valid:
+            return
+
+        categories = self.resolve_categories(valid)
+        skills = self.resolve_skills(valid)
+        self.load_taken_slugs()
+
+        jobs, job_skills, rows = [], [], []
+        now = timezone.now()
+        for number, data in valid:
+            data = dict(data)
+            category_ref = data.pop("category", None)
+            skill_names = data.pop("skills", [])
+            if category_ref and category_ref not in categories:
+                self.fail(number, {"category": [f"Unknown category '{category_ref}'."]})
+                continue
+            missing = [name for name in skill_names if name not in skills]
+            if missing:
+                self.fail(number, {"skills": [f"Unknown skills: {', '.join(missing)}."]})
+                continue
+
+            job = Job(company=self.company, category=categories.get(category_ref), **data)
+            job.slug = self.unique_slug(job.title)
+            if job.is_active and not job.published_at:
+                job.published_at = now
+            jobs.append(job)
+            job_skills.append([skills[name] for name in dict.fromkeys(skill_names)])
+            rows.append(number)
+
+        if jobs:
+            self.write(jobs, job_skills, rows)
+
+    def write(self, jobs, job_skills, rows):
+        through = Job.skills.through
+        try:
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs)
+                through.objects.bulk_create([
+                    through(job_id=job.pk, skill_id=skill.pk)
+                    for job, skill_list in zip(jobs, job_skills)
+                    for skill in skill_list
+                ])
+                bulk_audit("CREATE", Job.__name__, [
+                    (job.pk, None, snapshot(job, exclude=["skills"], extra={"skills": [s.pk for s in skill_list]}))
+                    for job, skill_list in zip(jobs, job_skills)
+                ], user=self.user)
+                jobs_bulk_changed([job.pk for job in jobs])
+                jobs_published([job.pk for job in jobs if job.is_active])
+        except IntegrityError as exc:
+            # A concurrent writer took one of the slugs; report the chunk rather than guess.
+            for number in rows:
+                self.fail(number, {"non_field_errors": [f"Could not save row: {exc}"]})
+            return
+        self.created += len(jobs)
+
+    # -- lookups (one query each per chunk) ---------------------------------
+
+    def resolve_categories(self, valid):
+        refs = {data["category"] for _, data in valid if data.get("category")}
+        if not refs:
+            return {}
+        ids, names = set(), set()
+        for ref in refs:
+            try:
+                ids.add(uuid.UUID(ref))
+            except ValueError:
+                names.add(ref)
+        resolved = {}
+        for category in JobCategory.objects.filter(Q(pk__in=ids) | Q(name__in=names)):
+            resolved[str(category.pk)] = category
+            resolved[category.name] = category
+        return resolved
+
+    def resolve_skills(self, valid):
+        names = {name for _, data in valid for name in data.get("skills", ())}
+        if not names:
+            return {}
+        found = {skill.name: skill for skill in Skill.objects.filter(name__in=names)}
+        missing = names - set(found)
+        if missing and self.create_skills:
+            Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+            found.update((skill.name, skill) for skill in Skill.objects.filter(name__in=missing))
+        return found
+
+    def load_taken_slugs(self):
+        # One indexed (company_id) query for the whole import; the set then
+        # grows with every slug handed out, so later chunks need no lookup.
+        if self.slugs_loaded:
+            return
+        self.taken_slugs.update(Job.objects.filter(company=self.company).values_list("slug", flat=True))
+        self.slugs_loaded = True
+
+    def slug_base(self, title):
+        return slugify(title)[:SLUG_BASE_LENGTH] or "job"
+
+    def unique_slug(self, title):
+        base = self.slug_base(title)
+        slug, suffix = base, 2
+        while slug in self.taken_slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        self.taken_slugs.add(slug)
+        return slug
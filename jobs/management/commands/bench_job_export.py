@@ -0,0 +1,67 @@
+import json
+import resource
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.exports import EXPORT_FORMATS
+from jobs.exports import JobExport
+from jobs.models import Job
+from jobs.serializers import job_row_serializer
+from .bench_job_pagination import Command as PaginationBenchmark
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class CountingSink:
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, block):
+        self.bytes += len(block)
+
+
+class Command(BaseCommand):
+    help = "Measure time and peak RSS of a streaming job export (and optionally of building the list in memory)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--chunk-size", type=int, default=JobExport.chunk_size)
+        parser.add_argument("--seed", action="store_true", help="Insert synthetic jobs until --rows exist.")
+        parser.add_argument("--compare-list", action="store_true",
+                            help="Afterwards, serialize the same rows into one in-memory list, as the list endpoint does.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        total = Job.objects.count()
+        if total < rows:
+            if not options["seed"]:
+                raise CommandError(f"Only {total} jobs; re-run with --seed to insert {rows - total} more.")
+            PaginationBenchmark(stdout=self.stdout, stderr=self.stderr).seed(rows - total)
+
+        qs = Job.objects.order_by("pk")[:rows]
+        baseline = peak_rss_mb()
+        sink = CountingSink()
+        started = time.perf_counter()
+        JobExport(qs, chunk_size=options["chunk_size"]).write(options["format"], sink)
+        elapsed = time.perf_counter() - started
+        streamed_peak = peak_rss_mb()
+        self.stdout.write(
+            f"stream: {rows:,} rows, {sink.bytes / 1e6:,.1f} MB {options['format']} in {elapsed:.1f}s "
+            f"({rows / elapsed:,.0f} rows/s); peak RSS {baseline:.0f} -> {streamed_peak:.0f} MB"
+        )
+
+        if options["compare_list"]:
+            started = time.perf_counter()
+            body = json.dumps(job_row_serializer.serialize_queryset(qs), default=str)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"list:   {rows:,} rows, {len(body) / 1e6:,.1f} MB json in {elapsed:.1f}s; "
+                f"peak RSS {streamed_peak:.0f} -> {peak_rss_mb():.0f} MB"
+            )
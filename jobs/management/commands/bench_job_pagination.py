@@ -0,0 +1,84 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+
+from accounts.models import User
+from companies.models import Company
+from common.choices import EmploymentType, ExperienceLevel, LocationType
+from job_portal.pagination import KeysetPagination
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Compare OFFSET and keyset pagination latency for the job listing at increasing page depths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", default="1,10,100,1000,10000",
+                            help="Comma separated page numbers to measure.")
+        parser.add_argument("--size", type=int, default=10, help="Page size.")
+        parser.add_argument("--repeat", type=int, default=5, help="Samples per page; the median is reported.")
+        parser.add_argument("--seed", action="store_true",
+                            help="Insert synthetic jobs until the deepest page exists.")
+
+    def handle(self, *args, **options):
+        pages = sorted(int(p) for p in options["pages"].split(","))
+        size = options["size"]
+        needed = pages[-1] * size
+
+        qs = Job.objects.order_by("-created_at", "-id")
+        total = qs.count()
+        if total < needed:
+            if not options["seed"]:
+                self.stderr.write(f"Only {total} jobs; page {pages[-1]} needs {needed}. Re-run with --seed.")
+                return
+            self.seed(needed - total)
+
+        factory = RequestFactory()
+        self.stdout.write(f"{'page':>8} {'offset ms':>12} {'keyset ms':>12}")
+        for page in pages:
+            start = (page - 1) * size
+            offset_samples = self.sample(lambda: list(qs[start:start + size]), options["repeat"])
+
+            paginator = KeysetPagination(page_size=size)
+            params = {}
+            if start:
+                boundary = qs.values_list("created_at", "id")[start - 1]
+                params["cursor"] = paginator.encode_cursor(boundary)
+            request = Request(factory.get("/api/jobs/", params))
+            keyset_samples = self.sample(lambda: paginator.paginate_queryset(qs, request), options["repeat"])
+
+            self.stdout.write(f"{page:>8} {offset_samples:>12.3f} {keyset_samples:>12.3f}")
+
+    def sample(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def seed(self, count, batch_size=5000):
+        owner, _ = User.objects.get_or_create(email="bench-owner@example.com")
+        company, _ = Company.objects.get_or_create(slug="bench-company", defaults={"owner": owner, "name": "Bench Company"})
+        offset = Job.objects.filter(company=company).count()
+        deadline = timezone.now().date() + timedelta(days=30)
+        for first in range(0, count, batch_size):
+            Job.objects.bulk_create([
+                Job(
+                    company=company,
+                    title=f"Bench job {offset + i}",
+                    slug=f"bench-job-{offset + i}",
+                    description="Synthetic job used by bench_job_pagination.",
+                    experience_level=ExperienceLevel.MID,
+                    employment_type=EmploymentType.FULL_TIME,
+                    location_type=LocationType.REMOTE,
+                    application_deadline=deadline,
+                )
+                for i in range(first, min(first + batch_size, count))
+            ])
+        self.stdout.write(f"Seeded {count} jobs.")
@@ -0,0 +1,78 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from jobs.models import Job, Skill
+from jobs.serializers import JobSerializer, job_row_serializer
+from .bench_job_pagination import Command as PaginationBenchmark
+
+
+class Command(BaseCommand):
+    help = "Check that the values()-based job list serializer matches JobSerializer, then compare their speed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000", help="Comma separated page sizes to measure.")
+        parser.add_argument("--repeat", type=int, default=3, help="Samples per size; the median is reported.")
+        parser.add_argument("--seed", action="store_true",
+                            help="Insert synthetic jobs (with skills) until the largest page is full.")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(s) for s in options["sizes"].split(","))
+        qs = Job.objects.order_by("-created_at", "-id")
+        total = qs.count()
+        if total < sizes[-1]:
+            if not options["seed"]:
+                raise CommandError(f"Only {total} jobs; a page of {sizes[-1]} needs more. Re-run with --seed.")
+            PaginationBenchmark(stdout=self.stdout, stderr=self.stderr).seed(sizes[-1] - total)
+            self.add_skills()
+
+        self.check_parity(qs[:sizes[-1]])
+
+        self.stdout.write(f"{'rows':>8} {'drf ms':>10} {'rows ms':>10} {'speedup':>8} {'drf queries':>12} {'rows queries':>13}")
+        for size in sizes:
+            # Slice afresh on every call so neither side reuses a cached result.
+            drf_ms, drf_queries = self.sample(lambda: JobSerializer(qs[:size], many=True).data, options["repeat"])
+            rows_ms, rows_queries = self.sample(lambda: job_row_serializer.serialize_queryset(qs[:size]), options["repeat"])
+            self.stdout.write(
+                f"{size:>8} {drf_ms:>10.1f} {rows_ms:>10.1f} {drf_ms / rows_ms:>7.1f}x {drf_queries:>12} {rows_queries:>13}"
+            )
+
+    def check_parity(self, queryset):
+        renderer = JSONRenderer()
+        expected = renderer.render(JobSerializer(queryset, many=True).data)
+        actual = renderer.render(job_row_serializer.serialize_queryset(queryset))
+        if expected != actual:
+            raise CommandError("JobRowSerializer output differs from JobSerializer.")
+        self.stdout.write(self.style.SUCCESS(f"Output matches JobSerializer ({len(expected)} bytes)."))
+
+    def sample(self, fn, repeat):
+        timings, queries = [], []
+
+        def count(execute, sql, params, many, context):
+            queries[-1] += 1
+            return execute(sql, params, many, context)
+
+        for _ in range(repeat):
+            queries.append(0)
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                fn()
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), queries[-1]
+
+    def add_skills(self, per_job=4):
+        skills = list(Skill.objects.values_list("pk", flat=True))
+        if not skills:
+            skills = [s.pk for s in Skill.objects.bulk_create(Skill(name=f"Bench skill {i}") for i in range(50))]
+        through = Job.skills.through
+        bare = Job.objects.filter(company__slug="bench-company", skills__isnull=True).values_list("pk", flat=True)
+        through.objects.bulk_create(
+            (through(job_id=job_id, skill_id=skill_id)
+             for job_id in bare.iterator()
+             for skill_id in random.sample(skills, min(per_job, len(skills)))),
+            batch_size=5000,
+        )
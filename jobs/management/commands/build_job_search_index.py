@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import search
+
+
+class Command(BaseCommand):
+    help = "Build the job search index from the database and write a snapshot workers load at startup."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Snapshot location (defaults to settings.JOB_SEARCH_INDEX_PATH).")
+
+    def handle(self, *args, **options):
+        path = options["path"] or search.index_path()
+        if not path:
+            raise CommandError("No --path given and JOB_SEARCH_INDEX_PATH is not set.")
+
+        started = time.perf_counter()
+        index = search.build_index()
+        built = time.perf_counter()
+        index.dump(path)
+        self.stdout.write(
+            f"Indexed {len(index)} jobs ({len(index.postings)} terms) in {built - started:.2f}s, "
+            f"wrote {path} in {time.perf_counter() - built:.2f}s."
+        )
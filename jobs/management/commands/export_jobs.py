@@ -0,0 +1,35 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from common.exports import EXPORT_FORMATS
+from jobs.exports import JobExport
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Stream every job to a CSV or NDJSON file (or stdout) with a server-side cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="-", help="File to write; '-' for stdout.")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--chunk-size", type=int, default=JobExport.chunk_size)
+        parser.add_argument("--company", help="Only export this company's jobs (id).")
+        parser.add_argument("--active-only", action="store_true")
+
+    def handle(self, *args, **options):
+        qs = Job.objects.order_by("pk")
+        if options["company"]:
+            qs = qs.filter(company_id=options["company"])
+        if options["active_only"]:
+            qs = qs.filter(is_active=True)
+        export = JobExport(qs, chunk_size=options["chunk_size"])
+
+        started = time.perf_counter()
+        if options["output"] == "-":
+            written = export.write(options["format"], sys.stdout.buffer)
+        else:
+            with open(options["output"], "wb") as fh:
+                written = export.write(options["format"], fh)
+        self.stderr.write(f"Wrote {written:,} bytes in {time.perf_counter() - started:.1f}s.")
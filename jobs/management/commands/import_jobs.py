@@ -0,0 +1,55 @@
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from companies.models import Company
+from jobs.importers import JobImporter, PARSERS, detect_format
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of job postings into a company with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("company", help="Company id or slug.")
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--format", choices=list(PARSERS), help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=JobImporter.chunk_size)
+        parser.add_argument("--user", help="Email recorded as the actor in the audit log.")
+        parser.add_argument("--no-create-skills", action="store_true",
+                            help="Reject rows naming skills that do not exist yet.")
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(slug=options["company"]).first()
+        if company is None:
+            try:
+                company = Company.objects.get(pk=options["company"])
+            except (Company.DoesNotExist, ValidationError):
+                raise CommandError(f"Company '{options['company']}' not found.")
+        user = None
+        if options["user"]:
+            user = User.objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"User '{options['user']}' not found.")
+
+        fmt = detect_format(options["path"], options["format"])
+        importer = JobImporter(
+            company,
+            user=user,
+            create_skills=not options["no_create_skills"],
+            chunk_size=options["chunk_size"],
+        )
+        started = time.perf_counter()
+        with open(options["path"], encoding="utf-8-sig", newline="") as fh:
+            report = importer.run(PARSERS[fmt](fh))
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"]:
+            self.stderr.write(json.dumps(error, default=str))
+        rate = report["created"] / elapsed * 60 if elapsed else 0
+        self.stdout.write(
+            f"Created {report['created']} jobs, {report['failed']} rows failed "
+            f"in {elapsed:.1f}s ({rate:,.0f} jobs/min)."
+        )
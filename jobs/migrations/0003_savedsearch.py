@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:14
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_created_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('is_active', models.BooleanField(db_index=True, default=True, help_text='Soft-active flag for the record.', verbose_name='active?')),
+                ('name', models.CharField(max_length=100)),
+                ('experience_level', models.CharField(blank=True, choices=[('ENTRY', 'Entry'), ('MID', 'Mid'), ('SENIOR', 'Senior'), ('LEAD', 'Lead')], max_length=50, null=True)),
+                ('location_type', models.CharField(blank=True, choices=[('ONSITE', 'On-site'), ('REMOTE', 'Remote'), ('HYBRID', 'Hybrid')], max_length=50, null=True)),
+                ('country', models.CharField(blank=True, max_length=100, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('min_salary', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_salary', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('skills', models.ManyToManyField(blank=True, help_text='Matches jobs asking for any of these skills.', related_name='saved_searches', to='jobs.skill')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'saved search',
+                'verbose_name_plural': 'saved searches',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'is_active'], name='saved_search_user_active_idx'), models.Index(fields=['updated_at'], name='saved_search_updated_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('min_salary__lte', models.F('max_salary')), ('min_salary__isnull', True), ('max_salary__isnull', True), _connector='OR'), name='saved_search_min_lte_max_salary')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_savedsearch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobcategory',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='jobcategory_name_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='skill_name_ci_idx'),
+        ),
+    ]
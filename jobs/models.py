@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.text import slugify
@@ -20,6 +21,8 @@ class JobCategory(UUIDModel, TimeStampedModel, Activatable):
         verbose_name = "job category"
         verbose_name_plural = "job categories"
         ordering = ["name"]
+        # Serves the autocomplete fallback (see common/autocomplete.py).
+        indexes = [models.Index(Lower("name"), name="jobcategory_name_ci_idx")]
 
     def __str__(self):
         return self.name
@@ -101,6 +104,7 @@ class Job(UUIDModel, TimeStampedModel, Activatable):
         indexes = [
             models.Index(fields=["experience_level", "employment_type"]),
             models.Index(fields=["country", "city"]),
+            models.Index(fields=["-created_at", "-id"], name="job_created_id_idx"),
         ]
         ordering = ["-created_at"]
 
@@ -134,6 +138,8 @@ class Job(UUIDModel, TimeStampedModel, Activatable):
         # Auto-set published_at when activating
         if self.is_active and not self.published_at:
             self.published_at = timezone.now()
+            # Picked up by jobs.signals to percolate the job against saved searches.
+            self._newly_published = True
 
         super().save(*args, **kwargs)
 
@@ -151,6 +157,70 @@ class Skill(UUIDModel, TimeStampedModel):
         verbose_name = "skill"
         verbose_name_plural = "skills"
         ordering = ["name"]
+        # Serves the autocomplete fallback (see common/autocomplete.py).
+        indexes = [models.Index(Lower("name"), name="skill_name_ci_idx")]
+
+    def __str__(self):
+        return self.name
+
+
+class SavedSearch(UUIDModel, TimeStampedModel, Activatable):
+    """A candidate's job alert: every filter left empty matches any job."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="saved_searches"
+    )
+    name = models.CharField(max_length=100)
+    skills = models.ManyToManyField(
+        Skill,
+        related_name="saved_searches",
+        blank=True,
+        help_text="Matches jobs asking for any of these skills."
+    )
+    experience_level = models.CharField(
+        max_length=50,
+        choices=ExperienceLevel.choices,
+        blank=True, null=True
+        )
+    location_type = models.CharField(
+        max_length=50,
+        choices=LocationType.choices,
+        blank=True, null=True
+        )
+    country = models.CharField(max_length=100, blank=True, null=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
+    min_salary = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True
+        )
+    max_salary = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True
+        )
+
+    class Meta:
+        verbose_name = "saved search"
+        verbose_name_plural = "saved searches"
+        ordering = ["-created_at"]
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(min_salary__lte=models.F("max_salary")) |
+                    models.Q(min_salary__isnull=True) |
+                    models.Q(max_salary__isnull=True)
+                ),
+                name="saved_search_min_lte_max_salary"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "is_active"], name="saved_search_user_active_idx"),
+            models.Index(fields=["updated_at"], name="saved_search_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,191 @@
+"""
+Skill-based job recommendations for candidate profiles.
+
+`RecommendationIndex` maps each skill to the active jobs that ask for it, so
+scoring a profile only visits jobs sharing at least one of its skills.
+A job's score blends the IDF-weighted share of its skills the candidate
+has, how close its experience level is to the candidate's, and whether its
+location suits the candidate.
+"""
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.utils import timezone
+
+from common.choices import ExperienceLevel, LocationType
+
+LEVEL_ORDER = [ExperienceLevel.ENTRY, ExperienceLevel.MID, ExperienceLevel.SENIOR, ExperienceLevel.LEAD]
+LEVEL_RANK = {level.value: rank for rank, level in enumerate(LEVEL_ORDER)}
+
+# Years of experience at which a candidate reaches each level.
+LEVEL_YEARS = [(9, ExperienceLevel.LEAD), (5, ExperienceLevel.SENIOR), (2, ExperienceLevel.MID)]
+
+WEIGHTS = {"skills": 0.6, "level": 0.2, "location": 0.2}
+
+
+def level_for_years(years):
+    for threshold, level in LEVEL_YEARS:
+        if years >= threshold:
+            return level.value
+    return ExperienceLevel.ENTRY.value
+
+
+class CandidateFeatures:
+    def __init__(self, skill_ids, years, location):
+        self.skill_ids = {str(s) for s in skill_ids}
+        self.years = years
+        self.level = level_for_years(years)
+        self.location = (location or "").strip().lower()
+
+    @classmethod
+    def for_profile(cls, profile_id, location):
+        from profiles.models import Experience, Profile
+
+        skill_ids = Profile.skills.through.objects.filter(profile_id=profile_id).values_list("skill_id", flat=True)
+        today = date.today()
+        days = sum(
+            ((end or today) - start).days
+            for start, end in Experience.objects.filter(profile_id=profile_id).values_list("start_date", "end_date")
+            if start
+        )
+        return cls(list(skill_ids), max(days, 0) / 365.25, location)
+
+
+class RecommendationIndex:
+    def __init__(self):
+        self.skill_jobs = defaultdict(set)   # skill_id -> {job_id}
+        self.job_skills = {}                 # job_id -> tuple(skill_id)
+        self.job_meta = {}                   # job_id -> (level, location_type, city, country, deadline)
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.job_meta)
+
+    def add(self, job_id, skill_ids, level, location_type, city, country, deadline):
+        job_id = str(job_id)
+        with self.lock:
+            self._remove(job_id)
+            skills = tuple(str(s) for s in skill_ids)
+            for skill_id in skills:
+                self.skill_jobs[skill_id].add(job_id)
+            self.job_skills[job_id] = skills
+            self.job_meta[job_id] = (level, location_type, (city or "").lower(), (country or "").lower(), deadline)
+
+    def remove(self, job_id):
+        with self.lock:
+            self._remove(str(job_id))
+
+    def _remove(self, job_id):
+        for skill_id in self.job_skills.pop(job_id, ()):
+            jobs = self.skill_jobs.get(skill_id)
+            if jobs is not None:
+                jobs.discard(job_id)
+                if not jobs:
+                    del self.skill_jobs[skill_id]
+        self.job_meta.pop(job_id, None)
+
+    def add_jobs(self, queryset):
+        """(Re)index `queryset`; inactive jobs are dropped from the index."""
+        from .models import Job
+
+        rows = list(queryset.order_by().values_list(
+            "id", "is_active", "experience_level", "location_type", "city", "country", "application_deadline"
+        ))
+        skills = defaultdict(list)
+        through = Job.skills.through.objects.filter(job_id__in=[row[0] for row in rows if row[1]])
+        for job_id, skill_id in through.values_list("job_id", "skill_id").iterator(chunk_size=5000):
+            skills[job_id].append(skill_id)
+        for job_id, is_active, *meta in rows:
+            if is_active:
+                self.add(job_id, skills[job_id], *meta)
+            else:
+                self.remove(job_id)
+
+    def idf(self, skill_id):
+        n_jobs = len(self.job_meta) or 1
+        return math.log(1 + n_jobs / (1 + len(self.skill_jobs.get(skill_id, ()))))
+
+    def level_score(self, job_level, candidate_level):
+        if job_level not in LEVEL_RANK:
+            return 0.0
+        distance = abs(LEVEL_RANK[job_level] - LEVEL_RANK[candidate_level])
+        return {0: 1.0, 1: 0.5}.get(distance, 0.0)
+
+    def location_score(self, location_type, city, country, candidate_location):
+        if location_type == LocationType.REMOTE:
+            return 1.0
+        if not candidate_location:
+            return 0.0
+        if city and city in candidate_location:
+            return 1.0
+        if country and country in candidate_location:
+            return 0.5 if location_type == LocationType.ONSITE else 0.75
+        return 0.0
+
+    def recommend(self, features, k=10):
+        """Return `[(job_id, score), ...]` for the best `k` open jobs."""
+        today = timezone.now().date()
+        with self.lock:
+            idf = {skill_id: self.idf(skill_id) for skill_id in features.skill_ids}
+            candidates = set()
+            for skill_id in features.skill_ids:
+                candidates |= self.skill_jobs.get(skill_id, set())
+
+            scored = []
+            for job_id in candidates:
+                level, location_type, city, country, deadline = self.job_meta[job_id]
+                if deadline and deadline < today:
+                    continue
+                job_skills = self.job_skills[job_id]
+                total = sum(idf.get(s) or self.idf(s) for s in job_skills)
+                matched = sum(idf[s] for s in job_skills if s in idf)
+                score = (
+                    WEIGHTS["skills"] * (matched / total if total else 0.0)
+                    + WEIGHTS["level"] * self.level_score(level, features.level)
+                    + WEIGHTS["location"] * self.location_score(location_type, city, country, features.location)
+                )
+                scored.append((job_id, score))
+        return heapq.nlargest(k, scored, key=lambda item: item[1])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def max_age():
+    return getattr(settings, "JOB_RECOMMENDATION_INDEX_MAX_AGE", 300)
+
+
+def get_index():
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age():
+        with _index_lock:
+            if _index is None or time.monotonic() - _index.built_at > max_age():
+                _index = build_index()
+            index = _index
+    return index
+
+
+def get_loaded_index():
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def build_index():
+    from .models import Job
+
+    index = RecommendationIndex()
+    index.add_jobs(Job.objects.filter(is_active=True))
+    return index
@@ -0,0 +1,322 @@
+"""
+In-process full-text search over jobs.
+
+`JobSearchIndex` keeps an inverted index of job title, description, skill
+names and company name and ranks matches with BM25. The signal handlers in
+`jobs.signals` keep it current for writes made in this worker; writes made in
+other workers are picked up by a background `catch_up()` every
+JOB_SEARCH_INDEX_MAX_AGE seconds, and a background rebuild every
+JOB_SEARCH_INDEX_REBUILD_AGE seconds picks up what the watermark cannot see
+(skill and company renames elsewhere). It can be persisted with `dump()` so
+a worker starts from a snapshot instead of re-reading every job.
+"""
+import heapq
+import marshal
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+FORMAT_MAGIC = b"JOBIDX1\n"
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to we with you your our will".split()
+)
+
+# Field boosts: a match in the title says more than one buried in the description.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "skills": 2.0,
+    "company": 1.5,
+    "description": 1.0,
+}
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class JobSearchIndex:
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)   # term -> {job_id: weighted tf}
+        self.doc_terms = {}                  # job_id -> tuple of terms (for removal)
+        self.doc_len = {}                    # job_id -> weighted length
+        self.doc_meta = {}                   # job_id -> (company_id, is_active)
+        self.total_len = 0.0
+        self.watermark = None                # newest Job.updated_at seen, ISO string
+        self.built_at = time.monotonic()
+        self.refreshed_at = self.built_at    # last catch_up()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    # -- building -----------------------------------------------------------
+
+    def add(self, job_id, title, description, skills, company_name, company_id=None, is_active=True, updated_at=None):
+        weighted = Counter()
+        fields = {
+            "title": title,
+            "description": description,
+            "skills": " ".join(skills or ()),
+            "company": company_name,
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                weighted[term] += weight
+
+        job_id = str(job_id)
+        with self.lock:
+            self._remove(job_id)
+            for term, tf in weighted.items():
+                self.postings[term][job_id] = tf
+            length = sum(weighted.values())
+            self.doc_terms[job_id] = tuple(weighted)
+            self.doc_len[job_id] = length
+            self.doc_meta[job_id] = (str(company_id) if company_id else None, bool(is_active))
+            self.total_len += length
+            if updated_at is not None:
+                stamp = updated_at.isoformat()
+                if self.watermark is None or stamp > self.watermark:
+                    self.watermark = stamp
+
+    def remove(self, job_id):
+        with self.lock:
+            self._remove(str(job_id))
+
+    def _remove(self, job_id):
+        terms = self.doc_terms.pop(job_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(job_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(job_id, 0.0)
+        self.doc_meta.pop(job_id, None)
+
+    def add_jobs(self, queryset, chunk_size=2000):
+        """Index every job in `queryset`, fetching skills in one query per chunk."""
+        from .models import Job
+
+        rows = (
+            queryset.order_by()
+            .values_list("id", "title", "description", "company_id", "company__name", "is_active", "updated_at")
+            .iterator(chunk_size=chunk_size)
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                self._add_chunk(Job, chunk)
+                chunk = []
+        if chunk:
+            self._add_chunk(Job, chunk)
+
+    def _add_chunk(self, job_model, rows):
+        skills = defaultdict(list)
+        through = job_model.skills.through.objects.filter(job_id__in=[row[0] for row in rows])
+        for job_id, name in through.values_list("job_id", "skill__name"):
+            skills[job_id].append(name)
+        for job_id, title, description, company_id, company_name, is_active, updated_at in rows:
+            self.add(job_id, title, description, skills[job_id], company_name, company_id, is_active, updated_at)
+
+    # -- querying -----------------------------------------------------------
+
+    def search(self, query, limit=None, company=None, is_active=None):
+        """Return `[(job_id, score), ...]` best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        company = str(company) if company else None
+
+        with self.lock:
+            n_docs = len(self.doc_len)
+            if not n_docs:
+                return []
+            avgdl = self.total_len / n_docs
+            scores = defaultdict(float)
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for job_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_len[job_id] / avgdl)
+                    scores[job_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if company is not None or is_active is not None:
+                meta = self.doc_meta
+                scores = {
+                    job_id: score for job_id, score in scores.items()
+                    if (company is None or meta[job_id][0] == company)
+                    and (is_active is None or meta[job_id][1] == is_active)
+                }
+
+        ranked = scores.items()
+        if limit is None:
+            return sorted(ranked, key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(limit, ranked, key=lambda item: item[1])
+
+    # -- persistence ----------------------------------------------------------
+
+    def dump(self, path):
+        """Write a snapshot atomically. `marshal` keeps loads fast and cannot run code."""
+        os.makedirs(os.path.dirname(os.fspath(path)) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with self.lock, open(tmp_path, "wb") as fh:
+            fh.write(FORMAT_MAGIC)
+            marshal.dump({
+                "watermark": self.watermark,
+                "total_len": self.total_len,
+                "postings": dict(self.postings),
+                "doc_terms": self.doc_terms,
+                "doc_len": self.doc_len,
+                "doc_meta": self.doc_meta,
+            }, fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            if fh.read(len(FORMAT_MAGIC)) != FORMAT_MAGIC:
+                raise ValueError(f"{path} is not a job search index snapshot")
+            payload = marshal.load(fh)
+
+        index = cls()
+        index.watermark = payload["watermark"]
+        index.total_len = payload["total_len"]
+        index.postings = defaultdict(dict, payload["postings"])
+        index.doc_terms = payload["doc_terms"]
+        index.doc_len = payload["doc_len"]
+        index.doc_meta = payload["doc_meta"]
+        return index
+
+    def catch_up(self):
+        """Apply changes made since the snapshot was written, or since the last catch_up()."""
+        from .models import Job
+
+        live_ids = {str(pk) for pk in Job.objects.values_list("id", flat=True)}
+        with self.lock:  # signal handlers may be updating it from request threads
+            indexed = set(self.doc_len)
+        for job_id in indexed - live_ids:
+            self.remove(job_id)
+        changed = Job.objects.all()
+        if self.watermark:
+            changed = changed.filter(updated_at__gt=self.watermark)
+        missing = live_ids - indexed
+        self.add_jobs(changed)
+        if missing:
+            self.add_jobs(Job.objects.filter(id__in=missing))
+
+
+_index = None
+_index_lock = threading.Lock()
+_refreshing = False
+
+
+def index_path():
+    return getattr(settings, "JOB_SEARCH_INDEX_PATH", None)
+
+
+def max_age():
+    return getattr(settings, "JOB_SEARCH_INDEX_MAX_AGE", 60)
+
+
+def rebuild_age():
+    return getattr(settings, "JOB_SEARCH_INDEX_REBUILD_AGE", 3600)
+
+
+def get_index():
+    """
+    Return the process-wide index, loading the snapshot or building it on
+    first use. A stale index keeps answering while it is refreshed.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _load_or_build()
+    index = _index
+    if time.monotonic() - index.refreshed_at > max_age():
+        refresh()
+    return index
+
+
+def refresh(wait=False):
+    """Catch the index up, or rebuild it once it is old, in a background thread unless one is running."""
+    global _refreshing
+    with _index_lock:
+        if _refreshing or _index is None:
+            return
+        _refreshing = True
+        index = _index
+    if wait:
+        _refresh(index)
+    else:
+        threading.Thread(target=_refresh, args=(index,), name="job-search-refresh", daemon=True).start()
+
+
+def _refresh(index):
+    global _index, _refreshing
+    try:
+        if time.monotonic() - index.built_at > rebuild_age():
+            fresh = build_index()
+            with _index_lock:
+                if _index is index:
+                    _index = fresh
+        else:
+            index.catch_up()
+    finally:
+        # Also on failure, so a broken database is retried after max_age, not on every search.
+        index.refreshed_at = time.monotonic()
+        _refreshing = False
+        close_old_connections()
+
+
+def get_loaded_index():
+    """Return the index only if this process has already built it."""
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def build_index():
+    from .models import Job
+
+    index = JobSearchIndex()
+    index.add_jobs(Job.objects.all())
+    if index.watermark is None:
+        index.watermark = timezone.now().isoformat()
+    return index
+
+
+def _load_or_build():
+    path = index_path()
+    if path and os.path.exists(path):
+        try:
+            index = JobSearchIndex.load(path)
+        except (OSError, ValueError, EOFError):
+            return build_index()
+        index.catch_up()
+        return index
+    return build_index()
@@ -1,11 +1,28 @@
+from collections import defaultdict
+from itertools import islice
+
 from rest_framework import serializers
-from .models import Job, JobCategory, Skill
+from .models import Job, JobCategory, SavedSearch, Skill
+from common.serializers import SparseFieldsetMixin
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+class JobCategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobCategory
+        fields = ["id", "name"]
+
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     skills = serializers.PrimaryKeyRelatedField(
         queryset=Skill.objects.all(), many=True, required=False
     )
+    expandable_fields = {
+        "company": ("companies.serializers.CompanySerializer", {}),
+        "category": (JobCategorySerializer, {}),
+        "skills": ("profiles.serializers.SkillSerializer", {"many": True}),
+    }
 
     class Meta:
         model = Job
@@ -39,3 +56,167 @@ class JobSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Remote jobs should not have city or country filled.")
 
         return data
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    skills = serializers.PrimaryKeyRelatedField(
+        queryset=Skill.objects.all(), many=True, required=False
+    )
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            "id", "name", "skills", "experience_level", "location_type",
+            "country", "city", "min_salary", "max_salary", "is_active",
+            "created_at", "updated_at"
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
+
+    def validate(self, data):
+        min_salary = data.get("min_salary")
+        max_salary = data.get("max_salary")
+        if min_salary and max_salary and min_salary > max_salary:
+            raise serializers.ValidationError("Minimum salary cannot be greater than maximum salary.")
+        # Store an unset filter as NULL, whichever way the client left it blank.
+        for name in ("experience_level", "location_type"):
+            if name in data and not data[name]:
+                data[name] = None
+        return data
+
+
+class JobRowSerializer:
+    """
+    Read-only stand-in for `JobSerializer(many=True)` on list pages.
+
+    Serializes `values()` rows instead of model instances and fetches the
+    skills for a batch of jobs in one query rather than one per job. Each
+    field is converted with JobSerializer's own field, so the output is the
+    same; text, choice and boolean columns are passed through untouched.
+    `fields` and `expand` select fields the way they do on JobSerializer;
+    expanded relations are loaded with one query per relation per batch.
+    """
+    source = JobSerializer
+    passthrough_fields = (serializers.CharField, serializers.ChoiceField, serializers.BooleanField)
+    # Always read: keyset pagination orders on them.
+    key_columns = ("id", "created_at")
+    batch_size = 2000
+
+    def __init__(self, fields=None, expand=None):
+        self.selected = fields
+        self.expand = expand
+
+    @cached_property
+    def plan(self):
+        """`[(name, column, convert)]` in JobSerializer's field order; many-to-many fields have no column."""
+        model = self.source.Meta.model
+        plan = []
+        for name, field in self.source(fields=self.selected, expand=self.expand).fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                column = None if isinstance(field, serializers.ListSerializer) else model._meta.get_field(field.source).attname
+                plan.append((name, column, None))
+            elif isinstance(field, serializers.ManyRelatedField):
+                plan.append((name, None, None))
+            elif isinstance(field, serializers.RelatedField):
+                convert = field.pk_field.to_representation if field.pk_field else None
+                plan.append((name, model._meta.get_field(field.source).attname, convert))
+            elif isinstance(field, self.passthrough_fields):
+                plan.append((name, field.source, None))
+            else:
+                plan.append((name, field.source, field.to_representation))
+        return plan
+
+    @cached_property
+    def expanded(self):
+        """`{name: nested serializer}` for the expanded relations."""
+        expanded = {}
+        for name in self.source.expanded(self.expand):
+            if self.selected is None or name in self.selected:
+                serializer_class, _ = self.source.expandable_serializer(name)
+                expanded[name] = serializer_class()
+        return expanded
+
+    @property
+    def columns(self):
+        columns = dict.fromkeys(["pk", *self.key_columns])
+        columns.update(dict.fromkeys(column for _, column, _ in self.plan if column))
+        return list(columns)
+
+    def related_ids(self, name, pks):
+        """`{pk: [related pk, ...]}` for one many-to-many field, in the related model's ordering."""
+        m2m = self.source.Meta.model._meta.get_field(name)
+        source_name, target_name = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+        ordering = [f"{target_name}__{o}" for o in m2m.related_model._meta.ordering]
+        rows = (
+            m2m.remote_field.through.objects.filter(**{f"{source_name}_id__in": pks})
+            .order_by(*ordering)
+            .values_list(f"{source_name}_id", f"{target_name}_id")
+        )
+        related = defaultdict(list)
+        for pk, related_pk in rows:
+            related[pk].append(related_pk)
+        return related
+
+    def nested(self, name, pks):
+        """`{pk: representation}` of the related objects in `pks` for an expanded field."""
+        serializer = self.expanded[name]
+        objects = serializer.Meta.model.objects.in_bulk(pks)
+        return {pk: serializer.to_representation(obj) for pk, obj in objects.items()}
+
+    def serialize_rows(self, rows):
+        """`[(pk, item)]` for `values(*self.columns)` rows."""
+        rows = list(rows)
+        pks = [row["pk"] for row in rows]
+        related = {name: self.related_ids(name, pks) for name, column, _ in self.plan if column is None}
+        nested = {}
+        for name, column, _ in self.plan:
+            if name not in self.expanded:
+                continue
+            if column is None:
+                ids = {pk for related_pks in related[name].values() for pk in related_pks}
+            else:
+                ids = {row[column] for row in rows if row[column] is not None}
+            nested[name] = self.nested(name, ids)
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in self.plan:
+                if column is None:
+                    values = related[name].get(row["pk"], [])
+                    item[name] = [nested[name][pk] for pk in values] if name in nested else values
+                    continue
+                value = row[column]
+                if name in nested:
+                    item[name] = nested[name].get(value)
+                else:
+                    item[name] = value if convert is None or value is None else convert(value)
+            data.append((row["pk"], item))
+        return data
+
+    def serialize(self, rows):
+        """Serialize `values(*self.columns)` rows."""
+        return [item for _, item in self.serialize_rows(rows)]
+
+    def iter_rows(self, queryset):
+        rows = queryset.values(*self.columns).iterator(chunk_size=self.batch_size)
+        for batch in iter(lambda: list(islice(rows, self.batch_size)), []):
+            yield from self.serialize_rows(batch)
+
+    def serialize_queryset(self, queryset):
+        return [item for _, item in self.iter_rows(queryset)]
+
+    def serialize_pks(self, pks):
+        """Serialize the jobs in `pks`, in that order, skipping any that no longer exist."""
+        model = self.source.Meta.model
+        by_pk = {str(pk): item for pk, item in self.iter_rows(model.objects.filter(pk__in=pks))}
+        return [by_pk[str(pk)] for pk in pks if str(pk) in by_pk]
+
+
+job_row_serializer = JobRowSerializer()
+
+
+def job_rows(fields=None, expand=None):
+    """The row serializer for a field selection; the shared one when nothing is selected."""
+    if fields is None and not expand:
+        return job_row_serializer
+    return JobRowSerializer(fields=fields, expand=expand)
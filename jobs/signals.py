@@ -0,0 +1,144 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from common.autocomplete import AUTOCOMPLETE
+from common.cache import job_cache
+from companies.models import Company
+from . import facets, recommendations, search
+from .models import Job, JobCategory, SavedSearch, Skill
+
+AUTOCOMPLETE["skills"].track()
+AUTOCOMPLETE["categories"].track()
+
+
+# In-process job indexes; each exposes get_loaded_index() -> add_jobs()/remove().
+JOB_INDEXES = (search, facets, recommendations)
+
+
+def _reindex(queryset, modules=JOB_INDEXES):
+    for module in modules:
+        index = module.get_loaded_index()
+        if index is not None:
+            transaction.on_commit(lambda index=index: index.add_jobs(queryset))
+
+
+def jobs_published(job_ids):
+    """Queue alerts for newly published jobs once the transaction commits."""
+    from .tasks import percolate_jobs
+
+    job_ids = [str(pk) for pk in job_ids]
+    if job_ids:
+        # robust: a broker outage must not fail the write that published the job.
+        transaction.on_commit(lambda: percolate_jobs.delay(job_ids), robust=True)
+
+
+def jobs_bulk_changed(job_ids):
+    """Do what the per-instance handlers would for jobs written with bulk_create/update."""
+    jobs = Job.objects.filter(pk__in=list(job_ids))
+    _reindex(jobs)
+    job_cache.bump_on_commit()
+
+
+@receiver(post_save, sender=Job)
+def index_job_on_save(sender, instance, **kwargs):
+    _reindex(Job.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Job)
+def percolate_job_on_publish(sender, instance, **kwargs):
+    if getattr(instance, "_newly_published", False):
+        instance._newly_published = False
+        jobs_published([instance.pk])
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job_on_delete(sender, instance, **kwargs):
+    for module in JOB_INDEXES:
+        index = module.get_loaded_index()
+        if index is not None:
+            index.remove(instance.pk)
+
+
+@receiver(post_delete, sender=JobCategory)
+def refacet_on_category_delete(sender, instance, **kwargs):
+    # Job.category is nulled with a bulk UPDATE that sends no Job signals.
+    facets.reset_index()
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def index_job_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # instance is a Skill; remember its jobs before the rows disappear.
+        instance._cleared_job_ids = list(instance.jobs.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        pk_set = getattr(instance, "_cleared_job_ids", None) if action == "post_clear" else pk_set
+        jobs = Job.objects.filter(pk__in=pk_set or ())
+    else:
+        jobs = Job.objects.filter(pk=instance.pk)
+    _reindex(jobs)
+
+
+@receiver(post_save, sender=Skill)
+def index_jobs_on_skill_rename(sender, instance, created, **kwargs):
+    if not created:
+        _reindex(Job.objects.filter(skills=instance), modules=(search,))
+
+
+@receiver(pre_delete, sender=Skill)
+def index_jobs_on_skill_delete(sender, instance, **kwargs):
+    # The through rows go without m2m_changed; reindex the jobs once the delete commits.
+    _reindex(Job.objects.filter(pk__in=list(instance.jobs.values_list("pk", flat=True))))
+
+
+@receiver(post_save, sender=Company)
+def index_jobs_on_company_save(sender, instance, created, **kwargs):
+    if not created:
+        _reindex(Job.objects.filter(company=instance), modules=(search,))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=JobCategory)
+@receiver(post_delete, sender=JobCategory)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def bump_job_cache(sender, **kwargs):
+    job_cache.bump_on_commit()
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def bump_job_cache_on_skills_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        job_cache.bump_on_commit()
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def touch_job_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Keeps updated_at (the conditional GET validator) honest for skill edits.
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # On clear, the jobs were remembered at pre_clear by index_job_on_skills_change.
+        pk_set = getattr(instance, "_cleared_job_ids", None) if action == "post_clear" else pk_set
+        jobs = Job.objects.filter(pk__in=pk_set or ())
+    else:
+        jobs = Job.objects.filter(pk=instance.pk)
+    jobs.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=SavedSearch.skills.through)
+def touch_saved_search_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # The alert index reloads saved searches by updated_at.
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        SavedSearch.objects.filter(skills=instance).update(updated_at=timezone.now())
+    else:
+        SavedSearch.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
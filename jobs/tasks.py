@@ -2,6 +2,8 @@
 from celery import shared_task
 from django.core.mail import send_mail
 
+from .alerts import send_job_alerts
+
 @shared_task
 def send_job_email(user_email, job_title):
     send_mail(
@@ -11,3 +13,9 @@ def send_job_email(user_email, job_title):
         [user_email],
     )
     return f"Email sent to {user_email}"
+
+
+@shared_task
+def percolate_jobs(job_ids):
+    """Send job alerts to the saved searches matching newly published jobs."""
+    return send_job_alerts(job_ids)
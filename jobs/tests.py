@@ -1,3 +1,480 @@
-from django.test import TestCase
+import io
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from auditlog.models import AuditLog
+from common.cache import job_cache
+from common.choices import NotificationType
+from common.testing import assert_query_budget
+from companies.models import Company
+from notifications.models import Notification
+from profiles.models import Experience, Profile
+from . import alerts, facets, recommendations, search, tasks, views
+from .models import Job, JobCategory, SavedSearch, Skill
+from .exports import JobExport
+from .importers import JobImporter, parse_csv
+from .serializers import JobSerializer, job_row_serializer, job_rows
+
+
+def run_percolation_inline():
+    # No broker in tests: run the task in-process when its on_commit hook fires.
+    return mock.patch.object(tasks.percolate_jobs, "delay", side_effect=tasks.percolate_jobs)
+
+
+class JobAlertTests(TransactionTestCase):
+    # Not TestCase: its wrapping transaction would defer on_commit hooks past
+    # the whole request and hide hooks that fire too early.
+
+    def setUp(self):
+        alerts.reset_index()
+        self.recruiter = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.seeker = User.objects.create_user(email="seeker@example.com", password="x")
+        self.company = Company.objects.create(owner=self.recruiter, name="Acme", slug="acme")
+        self.python = Skill.objects.create(name="Python")
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def tearDown(self):
+        alerts.reset_index()
+
+    def job_payload(self, **overrides):
+        payload = {
+            "company": str(self.company.pk),
+            "title": "Backend developer",
+            "description": "Build APIs.",
+            "experience_level": "MID",
+            "employment_type": "FULL_TIME",
+            "location_type": "REMOTE",
+            "application_deadline": (timezone.now() + timedelta(days=30)).date().isoformat(),
+            "skills": [str(self.python.pk)],
+            "is_active": True,
+        }
+        payload.update(overrides)
+        return payload
+
+    def job_alerts(self):
+        return Notification.objects.filter(recipient=self.seeker, type=NotificationType.JOB)
+
+    def test_job_created_through_the_api_alerts_on_its_skills(self):
+        search = SavedSearch.objects.create(user=self.seeker, name="Python jobs")
+        search.skills.add(self.python)
+        with run_percolation_inline():
+            response = self.client.post(reverse("job-list-create"), self.job_payload(), format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.job_alerts().count(), 1)
+
+    def test_blank_choice_filters_match_like_unset_ones(self):
+        response = self.client.post(
+            reverse("saved-search-list-create"),
+            {"name": "Anything", "experience_level": "", "location_type": ""},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        SavedSearch.objects.filter(pk=response.data["id"]).update(user=self.seeker)
+        with run_percolation_inline():
+            self.client.post(reverse("job-list-create"), self.job_payload(), format="json")
+        self.assertEqual(self.job_alerts().count(), 1)
+
+
+class SavedSearchIndexTests(TestCase):
+    def test_blank_filters_are_filed_as_open(self):
+        index = alerts.SavedSearchIndex()
+        index.add("s1", "u1", "Anything", [], "", "", None, None, None, None)
+        self.assertEqual(index.match([], "MID", "REMOTE", None, None, None, None), ["s1"])
+
+
+class FacetIndexTests(TestCase):
+    def test_bulk_load_after_emptying_does_not_reuse_freed_positions(self):
+        index = facets.FacetIndex()
+        index.add("a", {"is_active": "true"})
+        index.remove("a")
+        index._bulk_load([("b", {"is_active": "true"})])
+        index.add("c", {"is_active": "true"})
+        self.assertNotEqual(index.positions["b"], index.positions["c"])
+        total, _ = index.counts({"is_active": {"true"}})
+        self.assertEqual(total, 2)
+
+    def test_invalid_category_is_a_bad_request(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="seeker@example.com", password="x"))
+        response = client.get(reverse("job-facets"), {"category": "not-a-uuid"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(JOB_SEARCH_INDEX_PATH=None)
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        search.reset_index()
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        self.job = Job.objects.create(
+            company=self.company, title="Backend developer", description="Build APIs.",
+            experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+            application_deadline=(timezone.now() + timedelta(days=30)).date(),
+        )
+
+    def tearDown(self):
+        search.reset_index()
+
+    def found(self, query):
+        return [job_id for job_id, _ in search.get_index().search(query)]
+
+    def test_refresh_picks_up_writes_from_other_workers(self):
+        self.assertEqual(self.found("backend"), [str(self.job.pk)])
+        # update() sends no signals, like a write handled by another worker.
+        Job.objects.filter(pk=self.job.pk).update(
+            title="Data engineer", updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        search.refresh(wait=True)
+        self.assertEqual(self.found("backend"), [])
+        self.assertEqual(self.found("engineer"), [str(self.job.pk)])
+
+    def test_deleted_skill_leaves_the_index(self):
+        skill = Skill.objects.create(name="Haskell")
+        self.job.skills.add(skill)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.found("haskell"), [str(self.job.pk)])
+            skill.delete()
+        self.assertEqual(self.found("haskell"), [])
+
+
+class JobRowSerializerTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        deadline = (timezone.now() + timedelta(days=30)).date()
+        category = JobCategory.objects.create(name="Engineering")
+        python, django = Skill.objects.create(name="Python"), Skill.objects.create(name="Django")
+        paid = Job.objects.create(
+            company=company, category=category, title="Backend developer", description="Build APIs.",
+            experience_level="MID", employment_type="FULL_TIME", location_type="ONSITE",
+            country="India", city="Pune", min_salary="50000.00", max_salary="90000.50",
+            application_deadline=deadline,
+        )
+        paid.skills.add(python, django)
+        Job.objects.create(
+            company=company, title="Intern", description="Learn.", experience_level="ENTRY",
+            employment_type="INTERN", location_type="REMOTE", application_deadline=deadline, is_active=False,
+        )
+        self.jobs = Job.objects.order_by("created_at", "id")
+
+    def assertParity(self, rows, fields=None, expand=None):
+        expected = JobSerializer(self.jobs, many=True, fields=fields, expand=expand).data
+        self.assertEqual(rows.serialize_queryset(self.jobs), [dict(item) for item in expected])
+
+    def test_matches_job_serializer(self):
+        self.assertParity(job_row_serializer)
+
+    def test_matches_job_serializer_with_fields_and_expand(self):
+        fields, expand = ["id", "title", "category", "skills", "min_salary"], ["category", "skills"]
+        self.assertParity(job_rows(fields, expand), fields, expand)
+
+
+class JobListQueryBudgetTests(TestCase):
+    def setUp(self):
+        job_cache.bump()  # a cached page would run no queries at all
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        skills = [Skill.objects.create(name=name) for name in ("Python", "Django", "SQL")]
+        category = JobCategory.objects.create(name="Engineering")
+        for i in range(25):
+            job = Job.objects.create(
+                company=company, category=category, title=f"Developer {i}", description="Build APIs.",
+                experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+                application_deadline=(timezone.now() + timedelta(days=30)).date(),
+            )
+            job.skills.add(*skills[:i % 4])
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def test_list_pages_stay_within_budget(self):
+        url = reverse("job-list-create")
+        assert_query_budget(self.client, "get", url)
+        assert_query_budget(self.client, "get", url, {"paginate": "cursor", "size": 10})
+        assert_query_budget(self.client, "get", url, {"expand": "category,skills,company"})
+
+    def test_over_budget_fails(self):
+        with mock.patch.object(views.JobListCreateView, "query_budget", {"GET": 1}):
+            with self.assertRaises(AssertionError):
+                assert_query_budget(self.client, "get", reverse("job-list-create"), {"expand": "skills"})
+
+
+class ExpandedCompanyTests(TestCase):
+    def setUp(self):
+        job_cache.bump()
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        self.job = Job.objects.create(
+            company=self.company, title="Backend developer", description="Build APIs.",
+            experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+            application_deadline=(timezone.now() + timedelta(days=30)).date(),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def test_company_rename_shows_in_expanded_jobs(self):
+        detail = reverse("job-detail", args=[self.job.pk])
+        params = {"expand": "company"}
+        self.assertEqual(self.client.get(detail, params).data["company"]["name"], "Acme")
+        self.assertEqual(self.client.get(reverse("job-list-create"), params).data[0]["company"]["name"], "Acme")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.name = "Acme Labs"
+            self.company.save()
+        # "*" matches whatever ETag the client held; the job itself did not change.
+        response = self.client.get(detail, params, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["company"]["name"], "Acme Labs")
+        self.assertEqual(self.client.get(reverse("job-list-create"), params).data[0]["company"]["name"], "Acme Labs")
+
+    def test_unexpanded_detail_is_still_conditional(self):
+        detail = reverse("job-detail", args=[self.job.pk])
+        etag = self.client.get(detail)["ETag"]
+        self.assertEqual(self.client.get(detail, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class JobSkillsTouchTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        self.job = Job.objects.create(
+            company=company, title="Backend developer", description="Build APIs.",
+            experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+            application_deadline=(timezone.now() + timedelta(days=30)).date(),
+        )
+        self.skill = Skill.objects.create(name="Python")
+
+    def assertTouched(self, change):
+        before = timezone.now() - timedelta(days=1)
+        Job.objects.filter(pk=self.job.pk).update(updated_at=before)
+        change()
+        self.assertGreater(Job.objects.get(pk=self.job.pk).updated_at, before)
+
+    def test_skill_side_changes_touch_the_job(self):
+        self.assertTouched(lambda: self.skill.jobs.add(self.job))
+        self.assertTouched(lambda: self.skill.jobs.clear())
+        self.skill.jobs.add(self.job)
+        self.assertTouched(lambda: self.skill.jobs.remove(self.job))
+
+    def test_job_side_changes_touch_the_job(self):
+        self.assertTouched(lambda: self.job.skills.add(self.skill))
+        self.assertTouched(lambda: self.job.skills.clear())
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "jobs-local"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "jobs-shared"},
+})
+class JobCacheFreshnessTests(TransactionTestCase):
+    # Writes run in autocommit, so every bump_on_commit fires before the next GET.
+    expand = {"expand": "category,skills,company"}
+
+    def setUp(self):
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        self.category = JobCategory.objects.create(name="Engineering")
+        self.python = Skill.objects.create(name="Python")
+        self.job = Job.objects.create(
+            company=self.company, category=self.category, title="Backend developer", description="Build APIs.",
+            experience_level="MID", employment_type="FULL_TIME", location_type="REMOTE",
+            application_deadline=(timezone.now() + timedelta(days=30)).date(),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.listed(), self.detail()  # warm both entries
+
+    def listed(self):
+        return self.client.get(reverse("job-list-create"), self.expand).data[0]
+
+    def detail(self):
+        return self.client.get(reverse("job-detail", args=[self.job.pk]), self.expand).data
+
+    def assertFresh(self, check):
+        check(self.listed())
+        check(self.detail())
+
+    def skill_names(self, payload):
+        return [skill["name"] for skill in payload["skills"]]
+
+    def test_job_save(self):
+        self.job.title = "Data engineer"
+        self.job.save()
+        self.assertFresh(lambda payload: self.assertEqual(payload["title"], "Data engineer"))
+
+    def test_company_save(self):
+        self.company.name = "Acme Labs"
+        self.company.save()
+        self.assertFresh(lambda payload: self.assertEqual(payload["company"]["name"], "Acme Labs"))
+
+    def test_category_save(self):
+        self.category.name = "Data"
+        self.category.save()
+        self.assertFresh(lambda payload: self.assertEqual(payload["category"]["name"], "Data"))
+
+    def test_skill_save(self):
+        self.job.skills.add(self.python)
+        self.python.name = "Python 3"
+        self.python.save()
+        self.assertFresh(lambda payload: self.assertEqual(self.skill_names(payload), ["Python 3"]))
+
+    def test_skills_changed_from_either_side(self):
+        self.job.skills.add(self.python)
+        self.assertFresh(lambda payload: self.assertEqual(self.skill_names(payload), ["Python"]))
+        self.python.jobs.remove(self.job)
+        self.assertFresh(lambda payload: self.assertEqual(self.skill_names(payload), []))
+        self.python.jobs.add(self.job)
+        self.assertFresh(lambda payload: self.assertEqual(self.skill_names(payload), ["Python"]))
+        self.python.jobs.clear()
+        self.assertFresh(lambda payload: self.assertEqual(self.skill_names(payload), []))
+
+
+class JobImportTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        JobCategory.objects.create(name="Engineering")
+        Skill.objects.create(name="Python")
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def upload(self, name, content):
+        return self.client.post(
+            reverse("company-job-import", args=[self.company.pk]),
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart",
+        )
+
+    def test_csv_rows_are_created_or_reported(self):
+        deadline = (timezone.now() + timedelta(days=30)).date().isoformat()
+        common = f"Build APIs.,MID,FULL_TIME,REMOTE,{deadline}"
+        response = self.upload("jobs.csv", "\n".join([
+            "title,description,experience_level,employment_type,location_type,application_deadline,category,skills",
+            f"Backend developer,{common},Engineering,Python;Django",
+            f"Backend developer,{common},,Python",
+            f"Designer,{common},Design,",
+            f",{common},,",
+        ]))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 2))
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertEqual(sorted(errors), [3, 4])
+        self.assertIn("category", errors[3])
+        self.assertIn("title", errors[4])
+
+        jobs = Job.objects.filter(company=self.company).order_by("slug")
+        self.assertEqual(list(jobs.values_list("slug", flat=True)), ["backend-developer", "backend-developer-2"])
+        self.assertEqual(sorted(jobs[0].skills.values_list("name", flat=True)), ["Django", "Python"])
+        self.assertEqual(jobs[0].category.name, "Engineering")
+        self.assertEqual(AuditLog.objects.filter(model_name="Job", action="CREATE").count(), 2)
+
+    def test_ndjson_reports_bad_lines(self):
+        response = self.upload("jobs.ndjson", 'not json\n["a list"]\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["failed"], 2)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        recommendations.reset_index()
+        job_cache.bump()
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        self.python, self.java = Skill.objects.create(name="Python"), Skill.objects.create(name="Java")
+        deadline = (timezone.now() + timedelta(days=30)).date()
+        self.jobs = {}
+        for title, level, location_type, skills in [
+            ("Python lead", "LEAD", "REMOTE", [self.python]),
+            ("Python developer", "MID", "REMOTE", [self.python, self.java]),
+            ("Python onsite", "MID", "ONSITE", [self.python]),
+            ("Java developer", "MID", "REMOTE", [self.java]),
+        ]:
+            job = Job.objects.create(
+                company=company, title=title, description="Build things.", experience_level=level,
+                employment_type="FULL_TIME", location_type=location_type, city="Pune", country="India",
+                application_deadline=deadline,
+            )
+            job.skills.add(*skills)
+            self.jobs[title] = job
+        self.seeker = User.objects.create_user(email="seeker@example.com", password="x")
+        profile = Profile.objects.create(user=self.seeker, location="Pune, India")
+        profile.skills.add(self.python)
+        Experience.objects.create(
+            profile=profile, company="Initech", title="Developer",
+            start_date=timezone.now().date() - timedelta(days=3 * 365),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def tearDown(self):
+        recommendations.reset_index()
+
+    def test_jobs_are_ranked_on_skills_level_and_location(self):
+        response = self.client.get(reverse("job-recommended"))
+        self.assertEqual(response.status_code, 200, response.data)
+        titles = [result["job"]["title"] for result in response.data["results"]]
+        # Three years make a MID candidate. Only jobs sharing a skill are scored: the full
+        # match in the candidate's city first, then the full match at the wrong level,
+        # then the remote job where Python is only part of what it asks for.
+        self.assertEqual(response.data["experience_level"], "MID")
+        self.assertEqual(titles, ["Python onsite", "Python lead", "Python developer"])
+
+    def test_without_a_profile_is_not_found(self):
+        self.client.force_authenticate(User.objects.create_user(email="new@example.com", password="x"))
+        self.assertEqual(self.client.get(reverse("job-recommended")).status_code, 404)
+
+
+class JobExportTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="recruiter@example.com", password="x")
+        self.company = Company.objects.create(owner=owner, name="Acme", slug="acme")
+        category = JobCategory.objects.create(name="Engineering")
+        python, django = Skill.objects.create(name="Python"), Skill.objects.create(name="Django")
+        for i in range(5):
+            job = Job.objects.create(
+                company=self.company, category=category if i % 2 else None, title=f"Developer {i}",
+                description="Build APIs, \"fast\".\nAnd well.", experience_level="MID", employment_type="FULL_TIME",
+                location_type="REMOTE", application_deadline=(timezone.now() + timedelta(days=30)).date(),
+            )
+            job.skills.add(*[python, django][:i % 3])
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email="admin@example.com", password="x", is_staff=True))
+
+    def export(self, output):
+        response = self.client.get(reverse("job-export"), {"output": output})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_imports_back(self):
+        other = Company.objects.create(owner=self.company.owner, name="Globex", slug="globex")
+        report = JobImporter(other).run(parse_csv(io.StringIO(self.export("csv"))))
+        self.assertEqual((report["created"], report["failed"]), (5, 0), report["errors"])
+
+        def summary(company):
+            return sorted(
+                (job.title, job.description, job.category_id, sorted(job.skills.values_list("name", flat=True)))
+                for job in Job.objects.filter(company=company)
+            )
+        self.assertEqual(summary(other), summary(self.company))
+
+    def test_ndjson_rows_resolve_related_names(self):
+        rows = [json.loads(line) for line in self.export("ndjson").splitlines()]
+        self.assertEqual(len(rows), 5)
+        by_title = {row["title"]: row for row in rows}
+        self.assertEqual(by_title["Developer 1"]["company"], "Acme")
+        self.assertEqual(by_title["Developer 1"]["category"], "Engineering")
+        self.assertEqual(by_title["Developer 2"]["skills"], ["Django", "Python"])
+
+    def test_each_chunk_is_one_block(self):
+        blocks = list(JobExport(Job.objects.order_by("pk"), chunk_size=2).stream("csv"))
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(sum(block.count(b"Developer") for block in blocks), 5)
+
+    def test_unknown_format_is_a_bad_request(self):
+        self.assertEqual(self.client.get(reverse("job-export"), {"output": "xml"}).status_code, 400)
@@ -1,8 +1,20 @@
 
 from django.urls import path
-from .views import JobListCreateView, JobDetailView
+from common.views import AutocompleteView
+from .views import (
+    JobListCreateView, JobDetailView, JobFacetView, JobBulkImportView, JobRecommendationView,
+    SavedSearchListCreateView, SavedSearchDetailView, JobExportView,
+)
 
 urlpatterns = [
     path("jobs/", JobListCreateView.as_view(), name="job-list-create"),
+    path("jobs/facets/", JobFacetView.as_view(), name="job-facets"),
+    path("jobs/export/", JobExportView.as_view(), name="job-export"),
+    path("jobs/recommended/", JobRecommendationView.as_view(), name="job-recommended"),
     path("jobs/<uuid:pk>/", JobDetailView.as_view(), name="job-detail"),
+    path("skills/autocomplete/", AutocompleteView.as_view(source="skills"), name="skill-autocomplete"),
+    path("categories/autocomplete/", AutocompleteView.as_view(source="categories"), name="category-autocomplete"),
+    path("saved-searches/", SavedSearchListCreateView.as_view(), name="saved-search-list-create"),
+    path("saved-searches/<uuid:pk>/", SavedSearchDetailView.as_view(), name="saved-search-detail"),
+    path("companies/<uuid:pk>/jobs/import/", JobBulkImportView.as_view(), name="company-job-import"),
 ]
\ No newline at end of file
@@ -1,17 +1,32 @@
+from django.db import transaction
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Job
-from .serializers import JobSerializer
+from .models import Job, SavedSearch
+from .serializers import JobSerializer, SavedSearchSerializer, job_rows
+from . import facets, recommendations, search
+from common.cache import job_cache, request_cache_key
+from common.conditional import conditional_on_updated_at, updated_at_of
+from common.serializers import SPARSE_FIELDSET_PARAMETERS, sparse_cache_key, sparse_fieldset
+from companies.models import Company
+from companies.permissions import (
+    RECRUITER_ROLES, IsCompanyRecruiter, IsCompanyRecruiterOrReadOnly, is_company_member,
+)
+from profiles.models import Profile
+from rest_framework.parsers import MultiPartParser
+from .importers import JobImporter, PARSERS, detect_format, text_stream
+from .exports import JobExport
+from common.exports import EXPORT_FORMATS, export_format
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from job_portal.pagination import SetPagination
+from job_portal.pagination import SetPagination, KeysetPagination
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
 class JobListCreateView(APIView):
 
+    query_budget = {"GET": 8}
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     pagination_class = SetPagination
@@ -21,22 +36,62 @@ class JobListCreateView(APIView):
     ordering = ["-created_at"]
     
 
+    cursor_pagination_class = KeysetPagination
+
     @swagger_auto_schema(
         operation_summary="List all jobs",
+        operation_description="Pass `q` for ranked full-text search over title, description, skills and "
+                              "company name. Pass `paginate=cursor` (or a `cursor` returned by a previous page) "
+                              "for keyset pagination ordered on (created_at, id).",
+        manual_parameters=[
+            openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("paginate", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["cursor"]),
+            openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
         responses={200: JobSerializer(many=True)},
         security=[{"Bearer": []}]
     )
     def get(self, request):
-        qs = Job.objects.all().order_by("-created_at")
+        data = job_cache.get_or_set(request_cache_key(request, "list"), lambda: self.list_payload(request))
+        return Response(data, status=status.HTTP_200_OK)
+
+    def list_payload(self, request):
+        qs = Job.objects.all().order_by("-created_at", "-id")
         is_active = request.query_params.get("is_active")
         company = request.query_params.get("company")
+        query = request.query_params.get("q")
+        rows = job_rows(*sparse_fieldset(request))
+        if query:
+            return self.search_payload(request, rows, query, is_active, company)
         if is_active is not None:
             qs = qs.filter(is_active=is_active.lower() == "true")
         if company:
             qs = qs.filter(company_id=company)
 
-        serializer = JobSerializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if self.wants_cursor_page(request):
+            paginator = self.cursor_pagination_class()
+            page = paginator.paginate_queryset(qs.values(*rows.columns), request, view=self)
+            return paginator.get_paginated_response(rows.serialize(page)).data
+
+        return rows.serialize_queryset(qs)
+
+    def search_payload(self, request, rows, query, is_active, company):
+        ranked = search.get_index().search(
+            query,
+            company=company,
+            is_active=None if is_active is None else is_active.lower() == "true",
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset([job_id for job_id, _ in ranked], request, view=self)
+        return paginator.get_paginated_response(rows.serialize_pks(page)).data
+
+    def wants_cursor_page(self, request):
+        return (
+            request.query_params.get("paginate") == "cursor"
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
 
     @swagger_auto_schema(
         operation_summary="Create a new job",
@@ -47,32 +102,50 @@ class JobListCreateView(APIView):
     def post(self, request):
         serializer = JobSerializer(data=request.data)
         if serializer.is_valid():
-            job = serializer.save()
+            company = serializer.validated_data["company"]
+            if not request.user.is_staff and not is_company_member(request.user, company.pk, RECRUITER_ROLES):
+                return Response({"error": "Not a member of this company"}, status=status.HTTP_403_FORBIDDEN)
+            # The serializer sets skills after saving the job; commit both before
+            # on_commit hooks (alerts, indexes) read them.
+            with transaction.atomic():
+                job = serializer.save()
             return Response(JobSerializer(job).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class JobDetailView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    query_budget = {"GET": 8}
+    permission_classes = [IsCompanyRecruiterOrReadOnly]
+
+    def get_object(self, pk, queryset=None):
+        try:
+            return (queryset if queryset is not None else Job.objects).get(pk=pk)
+        except Job.DoesNotExist:
+            return None
 
     @swagger_auto_schema(
         operation_summary="Retrieve a job",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: JobSerializer},
         security=[{"Bearer": []}]
     )
-    def get_object(self, pk):
-        try:
-            return Job.objects.get(pk=pk)
-        except Job.DoesNotExist:
-            return None
-
+    # Expanded relations change without touching the job, so its updated_at
+    # only validates unexpanded payloads.
+    @conditional_on_updated_at(
+        lambda request, pk: None if sparse_fieldset(request)[1] else updated_at_of(Job.objects.filter(pk=pk))
+    )
     def get(self, request, pk):
-        job = self.get_object(pk)
-        if not job:
+        fields, expand = sparse_fieldset(request)
+        data = job_cache.get_or_set(
+            f"detail:{pk}{sparse_cache_key(fields, expand)}", lambda: self.detail_payload(pk, fields, expand)
+        )
+        if data is None:
             return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
 
-        serializer = JobSerializer(job)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def detail_payload(self, pk, fields=None, expand=None):
+        job = self.get_object(pk, JobSerializer.optimize_queryset(Job.objects.all(), fields, expand))
+        return JobSerializer(job, fields=fields, expand=expand).data if job else None
 
     @swagger_auto_schema(
         operation_summary="Update a job",
@@ -84,10 +157,16 @@ class JobDetailView(APIView):
         job = self.get_object(pk)
         if not job:
             return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        self.check_object_permissions(request, job)
 
         serializer = JobSerializer(job, data=request.data)
         if serializer.is_valid():
-            job = serializer.save()
+            company = serializer.validated_data["company"]
+            if not request.user.is_staff and not is_company_member(request.user, company.pk, RECRUITER_ROLES):
+                # Moving a job needs the same role in the company it moves to.
+                return Response({"error": "Not a member of this company"}, status=status.HTTP_403_FORBIDDEN)
+            with transaction.atomic():
+                job = serializer.save()
             return Response(JobSerializer(job).data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     @swagger_auto_schema(
@@ -101,6 +180,213 @@ class JobDetailView(APIView):
         job = self.get_object(pk)
         if not job:
             return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        self.check_object_permissions(request, job)
 
         job.delete()
         return Response({"message": "Job deleted"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class JobFacetView(APIView):
+    query_budget = {"GET": 8}
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    @swagger_auto_schema(
+        operation_summary="Job facet counts with a page of matching jobs",
+        operation_description="Filter with any of " + ", ".join(facets.FACETS) + " (comma separated or "
+                              "repeated). Each facet is counted with every other selection applied.",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        try:
+            filters = facets.parse_filters(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        total, counts = facets.get_index().counts(filters)
+
+        qs = facets.filter_queryset(Job.objects.all(), filters)
+        rows = job_rows(*sparse_fieldset(request))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(qs.values(*rows.columns), request, view=self)
+        data = paginator.get_paginated_response(rows.serialize(page)).data
+        data["count"] = total
+        data["facets"] = counts
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class JobBulkImportView(APIView):
+    permission_classes = [IsCompanyRecruiter]
+    company_url_kwarg = "pk"
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_summary="Bulk import jobs for a company from CSV or NDJSON",
+        manual_parameters=[
+            openapi.Parameter("file", openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter("format", openapi.IN_FORM, type=openapi.TYPE_STRING, enum=list(PARSERS)),
+        ],
+        responses={201: "Import report", 400: "Import report"},
+        security=[{"Bearer": []}]
+    )
+    def post(self, request, pk):
+        company = Company.objects.filter(pk=pk).first()
+        if not company:
+            return Response({"error": "Company not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "No file uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = detect_format(upload.name, request.data.get("format"))
+        if fmt not in PARSERS:
+            return Response({"error": f"Unsupported format '{fmt}'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = JobImporter(company, user=request.user)
+        report = importer.run(PARSERS[fmt](text_stream(upload.file)))
+        code = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=code)
+
+
+class JobRecommendationView(APIView):
+    query_budget = {"GET": 10}
+    permission_classes = [permissions.IsAuthenticated]
+    default_k = 10
+    max_k = 50
+
+    @swagger_auto_schema(
+        operation_summary="Jobs recommended for the current user's profile",
+        manual_parameters=[
+            openapi.Parameter("k", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        profile = Profile.objects.filter(user=request.user).values("id", "location", "updated_at").first()
+        if not profile:
+            return Response({"error": "Create a profile to get recommendations"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            k = min(max(int(request.query_params.get("k", self.default_k)), 1), self.max_k)
+        except ValueError:
+            k = self.default_k
+
+        fields, expand = sparse_fieldset(request)
+        # Job changes bump the job cache version; profile changes move updated_at.
+        key = f"recommended:{profile['id']}:{profile['updated_at'].isoformat()}:{k}{sparse_cache_key(fields, expand)}"
+        data = job_cache.get_or_set(key, lambda: self.recommendations_payload(profile, k, job_rows(fields, expand)))
+        return Response(data, status=status.HTTP_200_OK)
+
+    def recommendations_payload(self, profile, k, rows):
+        features = recommendations.CandidateFeatures.for_profile(profile["id"], profile["location"])
+        ranked = recommendations.get_index().recommend(features, k=k)
+        jobs = {str(pk): job for pk, job in rows.iter_rows(Job.objects.filter(pk__in=[job_id for job_id, _ in ranked]))}
+        results = [
+            {"score": round(score, 4), "job": jobs[str(job_id)]}
+            for job_id, score in ranked if str(job_id) in jobs
+        ]
+        return {"experience_level": features.level, "results": results}
+
+
+class SavedSearchListCreateView(APIView):
+    query_budget = {"GET": 4}
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="List the current user's saved searches",
+        responses={200: SavedSearchSerializer(many=True)},
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        qs = SavedSearch.objects.filter(user=request.user).prefetch_related("skills")
+        serializer = SavedSearchSerializer(qs, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Save a search and get alerts for new matching jobs",
+        request_body=SavedSearchSerializer,
+        responses={201: SavedSearchSerializer},
+        security=[{"Bearer": []}]
+    )
+    def post(self, request):
+        serializer = SavedSearchSerializer(data=request.data)
+        if serializer.is_valid():
+            saved_search = serializer.save(user=request.user)
+            return Response(SavedSearchSerializer(saved_search).data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SavedSearchDetailView(APIView):
+    query_budget = {"GET": 4}
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self, pk, user):
+        try:
+            return SavedSearch.objects.get(pk=pk, user=user)
+        except SavedSearch.DoesNotExist:
+            return None
+
+    @swagger_auto_schema(
+        operation_summary="Retrieve a saved search",
+        responses={200: SavedSearchSerializer},
+        security=[{"Bearer": []}]
+    )
+    def get(self, request, pk):
+        saved_search = self.get_object(pk, request.user)
+        if not saved_search:
+            return Response({"error": "Saved search not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(SavedSearchSerializer(saved_search).data, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Update a saved search",
+        request_body=SavedSearchSerializer,
+        responses={200: SavedSearchSerializer},
+        security=[{"Bearer": []}]
+    )
+    def put(self, request, pk):
+        saved_search = self.get_object(pk, request.user)
+        if not saved_search:
+            return Response({"error": "Saved search not found"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = SavedSearchSerializer(saved_search, data=request.data)
+        if serializer.is_valid():
+            saved_search = serializer.save()
+            return Response(SavedSearchSerializer(saved_search).data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_summary="Delete a saved search",
+        responses={204: "No Content"},
+        security=[{"Bearer": []}]
+    )
+    def delete(self, request, pk):
+        saved_search = self.get_object(pk, request.user)
+        if not saved_search:
+            return Response({"error": "Saved search not found"}, status=status.HTTP_404_NOT_FOUND)
+        saved_search.delete()
+        return Response({"message": "Saved search deleted"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class JobExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Stream every job as NDJSON or CSV",
+        manual_parameters=[
+            openapi.Parameter("output", openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+            openapi.Parameter("company", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter("is_active", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+        ],
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        fmt = export_format(request)
+        if fmt not in EXPORT_FORMATS:
+            return Response({"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        qs = Job.objects.order_by("pk")
+        is_active = request.query_params.get("is_active")
+        company = request.query_params.get("company")
+        if is_active is not None:
+            qs = qs.filter(is_active=is_active.lower() == "true")
+        if company:
+            qs = qs.filter(company_id=company)
+        return JobExport(qs).response(fmt, "jobs")
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from .models import Notification
+from common.serializers import SparseFieldsetMixin
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = [
@@ -10,8 +10,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 from job_portal.pagination import SetPagination
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from common.conditional import conditional_on_updated_at, updated_at_of
+from common.serializers import SPARSE_FIELDSET_PARAMETERS, sparse_fieldset
 
 class NotificationListCreateView(APIView):
+    query_budget = {"GET": 4}
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ["is_read", "created_at"]
@@ -21,6 +24,7 @@ class NotificationListCreateView(APIView):
     ordering = ["-created_at"]
     @swagger_auto_schema(
         operation_summary="List all notifications",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: NotificationSerializer(many=True)},
         security=[{"Bearer": []}]
     )
@@ -30,7 +34,9 @@ class NotificationListCreateView(APIView):
         qs = Notification.objects.filter(recipient=request.user).order_by("-created_at")
         if is_read is not None:
             qs = qs.filter(is_read=is_read.lower() == "true")
-        serializer = NotificationSerializer(qs, many=True)
+        fields, expand = sparse_fieldset(request)
+        qs = NotificationSerializer.optimize_queryset(qs, fields, expand)
+        serializer = NotificationSerializer(qs, many=True, fields=fields, expand=expand)
         return Response(serializer.data, status=status.HTTP_200_OK)
     @swagger_auto_schema(
         operation_summary="Create a new notification",
@@ -51,10 +57,12 @@ class NotificationListCreateView(APIView):
 
 
 class NotificationDetailView(APIView):
+    query_budget = {"GET": 4}
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
         operation_summary="Retrieve a notification",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: NotificationSerializer},
         security=[{"Bearer": []}]
     )
@@ -64,11 +72,15 @@ class NotificationDetailView(APIView):
         except Notification.DoesNotExist:
             return None
 
+    @conditional_on_updated_at(
+        lambda request, pk: updated_at_of(Notification.objects.filter(pk=pk, recipient=request.user))
+    )
     def get(self, request, pk):
+        fields, expand = sparse_fieldset(request)
         notification = self.get_object(pk, request.user)
         if not notification:
             return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = NotificationSerializer(notification)
+        serializer = NotificationSerializer(notification, fields=fields, expand=expand)
         return Response(serializer.data)
     @swagger_auto_schema(
         operation_summary="Update a notification",
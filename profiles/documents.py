@@ -0,0 +1,114 @@
+"""
+Materialized profile documents.
+
+A `ProfileDocument` holds a profile's ProfileSerializer output, so reading a
+profile is one row lookup instead of four queries and nested serialization.
+`invalidate()` marks documents stale whenever a profile, its experience,
+education or skills change (see profiles.signals) and queues `rebuild()` on
+Celery. Readers serialize stale or missing documents live, so an edit shows
+up immediately. Every invalidation bumps the document's version and a
+rebuild only stores its result if the version it started from is still
+current, so a slow rebuild never overwrites a newer edit. The
+rebuild_profile_documents command backfills missing documents and retries
+stale ones whose rebuild never ran.
+"""
+import json
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from common.exports import chunked
+
+REBUILD_BATCH_SIZE = 200
+
+
+def queue_rebuild(profile_ids):
+    from .tasks import rebuild_profile_documents
+
+    for batch in chunked([str(pk) for pk in profile_ids], REBUILD_BATCH_SIZE):
+        # robust: a broker outage must not fail the edit; readers fall back to live data.
+        transaction.on_commit(lambda batch=batch: rebuild_profile_documents.delay(batch), robust=True)
+
+
+def invalidate(profile_ids):
+    from .models import ProfileDocument
+
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+    # One UPDATE for the whole batch; the documents themselves are never loaded.
+    ProfileDocument.objects.filter(profile_id__in=profile_ids).update(
+        stale=True, version=F("version") + 1, updated_at=timezone.now()
+    )
+    queue_rebuild(profile_ids)
+
+
+def serialize(profiles):
+    """`{profile_id: document}` for a Profile queryset, with its relations prefetched."""
+    from .serializers import ProfileSerializer
+
+    renderer = JSONRenderer()
+    return {
+        str(profile.pk): (profile.user_id, json.loads(renderer.render(ProfileSerializer(profile).data)))
+        for profile in ProfileSerializer.optimize_queryset(profiles)
+    }
+
+
+def rebuild(profile_ids):
+    """Store fresh documents for `profile_ids`; returns how many were written."""
+    from .models import Profile, ProfileDocument
+
+    versions = {
+        str(pk): version
+        for pk, version in ProfileDocument.objects.filter(profile_id__in=profile_ids).values_list("profile_id", "version")
+    }
+    documents = serialize(Profile.objects.filter(pk__in=profile_ids))
+    now = timezone.now()
+    written = 0
+    for profile_id, (user_id, data) in documents.items():
+        if profile_id in versions:
+            written += ProfileDocument.objects.filter(profile_id=profile_id, version=versions[profile_id]).update(
+                data=data, stale=False, updated_at=now
+            )
+    missing = [
+        ProfileDocument(profile_id=profile_id, user_id=user_id, data=data)
+        for profile_id, (user_id, data) in documents.items() if profile_id not in versions
+    ]
+    # A concurrent rebuild may have created some already; either copy is current.
+    ProfileDocument.objects.bulk_create(missing, ignore_conflicts=True)
+    return written + len(missing)
+
+
+def _select(fields, document):
+    if fields is None:
+        return document
+    keep = set(fields)
+    return {name: value for name, value in document.items() if name in keep}
+
+
+def documents_for_users(user_ids, fields=None):
+    """
+    `{user_id: document}` for the users' profiles: one lookup for the
+    current documents, plus live serialization of any stale or missing ones.
+    """
+    from .models import Profile, ProfileDocument
+
+    user_ids = [str(pk) for pk in user_ids]
+    found, stale = {}, set()
+    for user_id, data, is_stale in ProfileDocument.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "data", "stale"
+    ):
+        if is_stale:
+            stale.add(str(user_id))
+        else:
+            found[str(user_id)] = _select(fields, data)
+    absent = [pk for pk in user_ids if pk not in found]
+    if absent:
+        live = serialize(Profile.objects.filter(user_id__in=absent))
+        for profile_id, (user_id, data) in live.items():
+            found[str(user_id)] = _select(fields, data)
+        # Profiles that predate documents get theirs now; stale ones are already queued.
+        queue_rebuild(profile_id for profile_id, (user_id, _) in live.items() if str(user_id) not in stale)
+    return found
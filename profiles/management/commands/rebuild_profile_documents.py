@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from common.exports import chunked
+from profiles.documents import REBUILD_BATCH_SIZE, rebuild
+from profiles.models import Profile, ProfileDocument
+
+
+class Command(BaseCommand):
+    help = "Build stored profile documents: missing and stale ones by default, or all of them with --all."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild current documents too.")
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.all()
+        if not options["all"]:
+            current = ProfileDocument.objects.filter(stale=False).values("profile_id")
+            profiles = profiles.exclude(pk__in=current)
+        written = 0
+        for batch in chunked(profiles.values_list("pk", flat=True).iterator(chunk_size=5000), options["batch_size"]):
+            written += rebuild(batch)
+        self.stdout.write(f"Wrote {written:,} profile documents.")
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import common.storage
+import common.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='resume',
+            field=models.FileField(blank=True, help_text='Upload CV (PDF/DOCX, max 5 MB).', null=True, storage=common.storage.resume_storage, upload_to='resumes/%Y/%m/', validators=[common.validators.MaxFileSizeValidator(5), common.validators.AllowedExtensionsValidator(('pdf', 'docx'))]),
+        ),
+    ]
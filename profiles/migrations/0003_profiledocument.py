@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_alter_profile_resume'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileDocument',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='When the record was created.', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the record was last updated.', verbose_name='updated at')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Stable public UUID identifier.', primary_key=True, serialize=False, verbose_name='public id')),
+                ('data', models.JSONField(default=dict)),
+                ('stale', models.BooleanField(default=False, help_text='Set when the profile changes; readers serialize it live until the rebuild clears it.')),
+                ('version', models.PositiveIntegerField(default=0, help_text='Bumped by every invalidation; a rebuild only stores its result if the version is unchanged.')),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='document', to='profiles.profile')),
+                ('user', models.OneToOneField(help_text="The profile's user, so a read by user is a single lookup.", on_delete=django.db.models.deletion.CASCADE, related_name='profile_document', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'profile document',
+                'verbose_name_plural': 'profile documents',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import URLValidator
 from common.models import UUIDModel, TimeStampedModel
+from common.storage import resume_storage
 from common.validators import max_file_size_mb, allowed_extensions, phone_validator
 from accounts.models import User
 from jobs.models import Skill
@@ -40,6 +41,7 @@ class Profile(UUIDModel, TimeStampedModel):
         validators=[phone_validator])
     resume = models.FileField(
         upload_to="resumes/%Y/%m/",
+        storage=resume_storage,
         validators=[max_file_size_mb(5), allowed_extensions("pdf", "docx")],
         blank=True, null=True, help_text="Upload CV (PDF/DOCX, max 5 MB).")
     skills = models.ManyToManyField(
@@ -86,3 +88,27 @@ class Education(UUIDModel, TimeStampedModel):
         verbose_name = "education"
         verbose_name_plural = "education histories"
         indexes = [models.Index(fields=["profile", "start_year"], name="edu_profile_start_idx")]
+
+
+class ProfileDocument(UUIDModel, TimeStampedModel):
+    """A profile's ProfileSerializer output, kept current by profiles.documents."""
+    profile = models.OneToOneField(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name="document")
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="profile_document",
+        help_text="The profile's user, so a read by user is a single lookup.")
+    data = models.JSONField(default=dict)
+    stale = models.BooleanField(
+        default=False,
+        help_text="Set when the profile changes; readers serialize it live until the rebuild clears it.")
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped by every invalidation; a rebuild only stores its result if the version is unchanged.")
+
+    class Meta:
+        verbose_name = "profile document"
+        verbose_name_plural = "profile documents"
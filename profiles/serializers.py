@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Profile, Experience, Education
 from jobs.models import Skill
+from common.serializers import SparseFieldsetMixin
 
 
 class ExperienceSerializer(serializers.ModelSerializer):
@@ -41,7 +42,7 @@ class SkillSerializer(serializers.ModelSerializer):
         fields = ["id", "name"] 
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     experiences = ExperienceSerializer(many=True, read_only=True)
     education = EducationSerializer(many=True, read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
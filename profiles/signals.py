@@ -0,0 +1,59 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from common.storage import track_references
+from jobs.models import Skill
+from . import documents
+from .models import Education, Experience, Profile
+
+track_references(Profile, "resume")
+
+
+def touch_profile(profile_id):
+    # Nested rows are part of the profile representation, so its updated_at
+    # (the conditional GET validator) and its stored document move with them.
+    Profile.objects.filter(pk=profile_id).update(updated_at=timezone.now())
+    documents.invalidate([profile_id])
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_document_on_profile_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        documents.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+@receiver(post_save, sender=Education)
+@receiver(post_delete, sender=Education)
+def touch_profile_on_history_change(sender, instance, **kwargs):
+    touch_profile(instance.profile_id)
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def touch_profile_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # instance is a Skill; remember its profiles before the rows disappear.
+        instance._cleared_profile_ids = list(instance.profiles.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        pk_set = getattr(instance, "_cleared_profile_ids", None) if action == "post_clear" else pk_set
+        Profile.objects.filter(pk__in=pk_set or ()).update(updated_at=timezone.now())
+        documents.invalidate(pk_set or ())
+    else:
+        touch_profile(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+def invalidate_documents_on_skill_rename(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw):
+        documents.invalidate(Profile.objects.filter(skills=instance).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Skill)
+def invalidate_documents_on_skill_delete(sender, instance, **kwargs):
+    # The through rows go without m2m_changed; the rebuild runs after the delete commits.
+    documents.invalidate(Profile.objects.filter(skills=instance).values_list("pk", flat=True))
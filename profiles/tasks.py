@@ -7,3 +7,10 @@ def send_welcome_email(user_id):
     time.sleep(5)
     print("Email sent ✅")
     return f"Email sent to user {user_id}"
+
+
+@shared_task
+def rebuild_profile_documents(profile_ids):
+    from .documents import rebuild
+
+    return rebuild(profile_ids)
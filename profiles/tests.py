@@ -1,3 +1,59 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.models import Skill
+from . import documents
+from .models import Profile, ProfileDocument
+
+
+class ProfileDocumentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="seeker@example.com", password="x")
+        self.profile = Profile.objects.create(user=self.user, headline="Backend developer")
+        self.python = Skill.objects.create(name="Python")
+        self.profile.skills.add(self.python)
+        documents.rebuild([self.profile.pk])
+
+    def document(self):
+        return ProfileDocument.objects.get(profile=self.profile)
+
+    def test_rebuild_stores_the_serialized_profile(self):
+        document = self.document()
+        self.assertFalse(document.stale)
+        self.assertEqual(document.data["headline"], "Backend developer")
+        self.assertEqual(documents.documents_for_users([self.user.pk])[str(self.user.pk)], document.data)
+
+    def test_stale_document_is_served_live(self):
+        Profile.objects.filter(pk=self.profile.pk).update(headline="Data engineer")
+        documents.invalidate([self.profile.pk])
+        found = documents.documents_for_users([self.user.pk], fields=["headline"])
+        self.assertEqual(found, {str(self.user.pk): {"headline": "Data engineer"}})
+
+    def test_rebuild_does_not_overwrite_a_newer_edit(self):
+        serialize = documents.serialize
+
+        def edited_meanwhile(profiles):
+            data = serialize(profiles)
+            Profile.objects.filter(pk=self.profile.pk).update(headline="Data engineer")
+            documents.invalidate([self.profile.pk])
+            return data
+
+        documents.invalidate([self.profile.pk])
+        with mock.patch.object(documents, "serialize", side_effect=edited_meanwhile):
+            self.assertEqual(documents.rebuild([self.profile.pk]), 0)
+        self.assertTrue(self.document().stale)
+        documents.rebuild([self.profile.pk])
+        self.assertEqual(self.document().data["headline"], "Data engineer")
 
-# Create your tests here.
+    def test_clearing_a_skill_from_its_side_invalidates_the_profile(self):
+        before = timezone.now() - timedelta(days=1)
+        Profile.objects.filter(pk=self.profile.pk).update(updated_at=before)
+        version = self.document().version
+        self.python.profiles.clear()
+        self.assertGreater(Profile.objects.get(pk=self.profile.pk).updated_at, before)
+        self.assertTrue(self.document().stale)
+        self.assertEqual(self.document().version, version + 1)
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import ProfileAPIView, ExperienceAPIView, EducationAPIView
+from .views import ProfileAPIView, ProfileBulkView, ExperienceAPIView, EducationAPIView
 
 urlpatterns = [
     path("profile/", ProfileAPIView.as_view(), name="profile"),
+    path("profiles/bulk/", ProfileBulkView.as_view(), name="profile-bulk"),
     path("experience/", ExperienceAPIView.as_view(), name="add-experience"),
     path("experience/<uuid:pk>/", ExperienceAPIView.as_view(), name="update-delete-experience"),
     path("education/", EducationAPIView.as_view(), name="add-education"),
@@ -13,12 +13,18 @@ from django.conf import settings
 from django.db import transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from common.conditional import conditional_on_updated_at, updated_at_of
+from common.serializers import SPARSE_FIELDSET_PARAMETERS, sparse_fieldset
+from companies.permissions import RECRUITER_ROLES, member_company_ids
+from .documents import documents_for_users
+import uuid
 
 class ProfileAPIView(APIView):
-    permission_classes = [permissions.IsAuthenticated,filters.SearchFilter, filters.OrderingFilter]
+    query_budget = {"GET": 8}
+    permission_classes = [permissions.IsAuthenticated]
     users = Profile.objects.all()
     serializer_class = ProfileSerializer
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ["user", "bio", "location"]
     search_fields = ["user__username", "bio", "location"]
     ordering_fields = ["created_at", "user__username"]
@@ -26,14 +32,19 @@ class ProfileAPIView(APIView):
     pagination_class = SetPagination
     @swagger_auto_schema(
         operation_summary="Retrieve user profile",
+        manual_parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: ProfileSerializer},
         security=[{"Bearer": []}]
     )
 
+    @conditional_on_updated_at(lambda request: updated_at_of(Profile.objects.filter(user=request.user)))
     def get(self, request):
-        profile = get_object_or_404(Profile, user=request.user)
-        serializer = ProfileSerializer(profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Served from the stored document; a stale or missing one is serialized live.
+        fields, _ = sparse_fieldset(request)
+        document = documents_for_users([request.user.pk], fields).get(str(request.user.pk))
+        if document is None:
+            return Response({"detail": "No Profile matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(document, status=status.HTTP_200_OK)
     @swagger_auto_schema(
         operation_summary="Create a new user profile",
         request_body=ProfileSerializer,
@@ -88,6 +99,56 @@ class ProfileAPIView(APIView):
         profile = get_object_or_404(Profile, user=request.user)
         profile.delete()
         return Response({"message": "Profile deleted"}, status=status.HTTP_204_NO_CONTENT)
+class ProfileBulkView(APIView):
+    """Profiles of several users at once, for recruiters reviewing applicants."""
+    query_budget = {"GET": 8}
+    permission_classes = [permissions.IsAuthenticated]
+    max_users = 100
+
+    @swagger_auto_schema(
+        operation_summary="Retrieve several users' profiles",
+        operation_description=(
+            "Staff see any profile; recruiters see the profiles of users who applied to their companies' jobs. "
+            "Users without a visible profile are listed under `missing`."
+        ),
+        manual_parameters=[
+            openapi.Parameter("users", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description="Comma-separated user ids"),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses={200: ProfileSerializer(many=True)},
+        security=[{"Bearer": []}]
+    )
+    def get(self, request):
+        raw = [pk.strip() for pk in request.query_params.get("users", "").split(",") if pk.strip()]
+        if not raw:
+            return Response({"error": "users is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw) > self.max_users:
+            return Response({"error": f"At most {self.max_users} users per request"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            requested = list(dict.fromkeys(str(uuid.UUID(pk)) for pk in raw))
+        except ValueError:
+            return Response({"error": "users must be user ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_ids = requested
+        if not request.user.is_staff:
+            from applications.models import Application
+
+            visible = Application.objects.filter(
+                applicant_id__in=user_ids,
+                job__company_id__in=member_company_ids(request.user, RECRUITER_ROLES),
+            ).values_list("applicant_id", flat=True).distinct()
+            visible = {str(pk) for pk in visible}
+            user_ids = [pk for pk in user_ids if pk in visible]
+
+        fields, _ = sparse_fieldset(request)
+        found = documents_for_users(user_ids, fields) if user_ids else {}
+        return Response({
+            "results": [found[pk] for pk in user_ids if pk in found],
+            "missing": [pk for pk in requested if pk not in found],
+        }, status=status.HTTP_200_OK)
+
+
 class ExperienceAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 